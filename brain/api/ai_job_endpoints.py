@@ -4,16 +4,16 @@ import json
 import logging
 import os
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
 from django.urls import path
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView
 
-from ..models import BrainRun, BrainRunEvent
+from ..models import BrainRun, BrainRunEvent, UploadSession
 from ..serializers import BrainRunSerializer
 from brain.cognitive_pipeline.graph import create_ai_job_workflow, ProductRoadmapGraph
 
@@ -26,8 +26,10 @@ class StartAIJobView(APIView):
     
     Start a new AI job for document processing and roadmap generation.
     Supports file uploads and URL processing with framework selection.
+    Large files can be sent beforehand through the resumable upload API and
+    referenced here by their upload ids in `file_ids`.
     """
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
@@ -53,6 +55,17 @@ class StartAIJobView(APIView):
                     file_path = self._save_uploaded_file(file)
                     uploaded_files.append(file_path)
             
+            # Files committed through the resumable upload API
+            file_ids = self._get_file_ids(request)
+            if file_ids:
+                committed_files, missing_ids = self._resolve_committed_uploads(request, file_ids)
+                if missing_ids:
+                    return Response({
+                        'error': 'Unknown or uncommitted file_ids',
+                        'file_ids': missing_ids
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                uploaded_files.extend(committed_files)
+            
             # Validate inputs
             if not uploaded_files and not links:
                 return Response({
@@ -71,6 +84,7 @@ class StartAIJobView(APIView):
                     'product_context': product_context,
                     'file_count': len(uploaded_files),
                     'link_count': len(links),
+                    'upload_ids': file_ids,
                     'user_id': request.user.id
                 }
             )
@@ -102,6 +116,7 @@ class StartAIJobView(APIView):
                     'results': {
                         'documents_processed': len(final_state.parsed_documents or []),
                         'successful_documents': sum(1 for doc in (final_state.parsed_documents or []) if getattr(doc.validation_result, 'is_valid', False)),
+                        'partial_documents': sum(1 for doc in (final_state.parsed_documents or []) if getattr(doc.validation_result, 'partial', False)),
                         'framework': framework,
                         'processing_summary': self._create_processing_summary(final_state)
                     }
@@ -142,6 +157,43 @@ class StartAIJobView(APIView):
         
         return file_path
     
+    def _get_file_ids(self, request) -> List[str]:
+        """file_ids as a JSON list, a JSON-encoded string or repeated form fields."""
+        if hasattr(request.data, 'getlist'):
+            file_ids = request.data.getlist('file_ids')
+            if len(file_ids) == 1:
+                file_ids = file_ids[0]
+        else:
+            file_ids = request.data.get('file_ids', [])
+        if isinstance(file_ids, str):
+            try:
+                file_ids = json.loads(file_ids)
+            except json.JSONDecodeError:
+                file_ids = [file_ids] if file_ids else []
+        if not isinstance(file_ids, list):
+            file_ids = [file_ids]
+        return [str(file_id) for file_id in file_ids]
+    
+    def _resolve_committed_uploads(self, request, file_ids: List[str]) -> Tuple[List[str], List[str]]:
+        """File paths of the user's committed uploads in file_ids order, and the ids that are not."""
+        valid_ids = {}
+        for file_id in file_ids:
+            try:
+                valid_ids[file_id] = uuid.UUID(file_id)
+            except ValueError:
+                pass
+        sessions = UploadSession.objects.filter(
+            id__in=valid_ids.values(),
+            organization=getattr(request.user, 'organization', None),
+            created_by=request.user,
+            status=UploadSession.Status.COMMITTED
+        )
+        paths = {session.id: session.file_path for session in sessions}
+        missing = [file_id for file_id in file_ids if paths.get(valid_ids.get(file_id)) is None]
+        if missing:
+            return [], missing
+        return [paths[valid_ids[file_id]] for file_id in file_ids], []
+    
     def _create_processing_summary(self, state) -> Dict[str, Any]:
         """Create a summary of processing results."""
         if not state.parsed_documents:
@@ -0,0 +1,260 @@
+# brain/api/upload_endpoints.py
+
+import logging
+import os
+import re
+
+from decouple import config
+from django.db import transaction
+from django.urls import path
+from rest_framework import status
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import UploadSession
+from ..serializers import UploadSessionSerializer
+from ..utils.chunked_upload import committed_path, discard_part, file_sha256, finalize_part, write_chunk
+from brain.cognitive_pipeline.utils.file_validators import FileValidator
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE_MB', default=8, cast=int) * 1024 * 1024
+UPLOAD_SESSION_TTL_HOURS = config('UPLOAD_SESSION_TTL_HOURS', default=24, cast=int)
+UPLOAD_CHUNK_LEASE_SECONDS = config('UPLOAD_CHUNK_LEASE_SECONDS', default=600, cast=int)
+SHA256_RE = re.compile(r'^[0-9a-fA-F]{64}$')
+
+
+def _get_session(request, upload_id, for_update: bool = False):
+    """Upload session of the requesting user, or None."""
+    sessions = UploadSession.objects.filter(
+        id=upload_id,
+        organization=getattr(request.user, 'organization', None),
+        created_by=request.user
+    )
+    if for_update:
+        sessions = sessions.select_for_update()
+    return sessions.first()
+
+
+def _session_response(session, status_code=status.HTTP_200_OK, **extra):
+    response = Response({**UploadSessionSerializer(session).data, **extra}, status=status_code)
+    response['Upload-Offset'] = str(session.received_bytes)
+    return response
+
+
+def _not_found():
+    return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+
+
+class UploadSessionCreateView(APIView):
+    """
+    POST /api/brain/uploads/
+
+    Start a resumable upload. Body: file_name, total_size (bytes) and sha256 (hex digest of the
+    whole file). Chunks are then sent with PATCH to the returned upload and committed with
+    POST .../commit/; the upload_id of a committed upload can be passed as file_ids to start_job.
+    """
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        organization = getattr(request.user, 'organization', None)
+        if organization is None:
+            return Response({
+                'error': 'Uploads require an organization'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        file_name = os.path.basename(str(request.data.get('file_name', '')).strip())
+        sha256 = str(request.data.get('sha256', '')).strip()
+        try:
+            total_size = int(request.data.get('total_size'))
+        except (TypeError, ValueError):
+            total_size = None
+
+        errors = []
+        if not file_name:
+            errors.append("file_name is required")
+        elif os.path.splitext(file_name)[1].lower() in FileValidator.SECURITY_EXTENSIONS_BLOCKED:
+            errors.append(f"File type not allowed for security reasons: {os.path.splitext(file_name)[1].lower()}")
+        if total_size is None:
+            errors.append("total_size must be an integer number of bytes")
+        elif total_size > FileValidator.MAX_FILE_SIZE:
+            errors.append(f"File too large: {total_size} bytes (max: {FileValidator.MAX_FILE_SIZE})")
+        elif total_size < FileValidator.MIN_FILE_SIZE:
+            errors.append(f"File too small: {total_size} bytes (min: {FileValidator.MIN_FILE_SIZE})")
+        if not SHA256_RE.match(sha256):
+            errors.append("sha256 must be a 64 character hex digest")
+        if errors:
+            return Response({'error': 'Invalid upload', 'details': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Stale sessions are swept here rather than by a scheduled job
+        expired = UploadSession.expire_stale()
+        if expired:
+            logger.info(f"Expired {expired} stale upload session(s)")
+
+        session = UploadSession.start(organization, request.user, file_name, total_size, sha256, UPLOAD_SESSION_TTL_HOURS)
+        response = _session_response(session, status.HTTP_201_CREATED, chunk_size=UPLOAD_CHUNK_SIZE)
+        response['Location'] = request.build_absolute_uri(f"{session.id}/")
+        return response
+
+
+class UploadSessionView(APIView):
+    """
+    GET|HEAD /api/brain/uploads/{upload_id}/    current offset, to resume after a failure
+    PATCH    /api/brain/uploads/{upload_id}/    append a chunk (raw body, Upload-Offset header)
+    DELETE   /api/brain/uploads/{upload_id}/    abort the upload
+
+    The chunk body is streamed to storage as it arrives instead of being parsed by DRF, so
+    requests should use Content-Type application/octet-stream. Upload-Offset must equal the
+    session's current offset; a mismatch returns 409 with the offset to resume from, as does
+    a chunk sent while another one for the same upload is still streaming.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        session = _get_session(request, upload_id)
+        if session is None:
+            return _not_found()
+        return _session_response(session)
+
+    def patch(self, request, upload_id):
+        try:
+            offset = int(request.META['HTTP_UPLOAD_OFFSET'])
+        except (KeyError, ValueError):
+            return Response({
+                'error': 'Upload-Offset header is required'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or '')
+        except ValueError:
+            return Response({
+                'error': 'Content-Length header is required'
+            }, status=status.HTTP_411_LENGTH_REQUIRED)
+
+        # The row lock is held only to claim the offset and to advance it; the chunk itself
+        # is streamed outside any transaction, so a slow client does not pin a lock
+        with transaction.atomic():
+            session = _get_session(request, upload_id, for_update=True)
+            if session is None:
+                return _not_found()
+            if session.is_expired or session.status == UploadSession.Status.EXPIRED:
+                return _session_response(session, status.HTTP_410_GONE, error='Upload session expired')
+            if session.status != UploadSession.Status.OPEN:
+                return _session_response(session, status.HTTP_409_CONFLICT, error=f'Upload is {session.status}')
+            if session.write_in_progress:
+                return _session_response(session, status.HTTP_409_CONFLICT, error='Another chunk is being written')
+            if offset != session.received_bytes:
+                return _session_response(session, status.HTTP_409_CONFLICT, error='Offset mismatch')
+            if length > session.total_size - offset:
+                return _session_response(
+                    session, status.HTTP_400_BAD_REQUEST, error='Chunk extends past the declared total_size'
+                )
+            token = session.claim_write(UPLOAD_CHUNK_LEASE_SECONDS)
+
+        written = None
+        try:
+            written = write_chunk(session.part_path, offset, request.stream, length) if length else 0
+        finally:
+            with transaction.atomic():
+                session = _get_session(request, upload_id, for_update=True)
+                lease_held = (
+                    session is not None
+                    and session.status == UploadSession.Status.OPEN
+                    and session.write_token == token
+                )
+                if lease_held:
+                    session.release_write(offset + written if written is not None else None)
+
+        if session is None:
+            return _not_found()
+        if not lease_held:
+            # Aborted, expired or taken over by another writer while this chunk was streaming
+            logger.warning(f"Upload {session.id}: chunk at {offset} lost its write lease")
+            if session.status != UploadSession.Status.OPEN:
+                discard_part(session.part_path)
+            return _session_response(session, status.HTTP_409_CONFLICT, error='Chunk write lease was lost')
+        if written < length:
+            logger.warning(f"Upload {session.id}: chunk at {offset} ended after {written} of {length} bytes")
+            return _session_response(session, status.HTTP_400_BAD_REQUEST, error='Incomplete chunk')
+        return _session_response(session)
+
+    def delete(self, request, upload_id):
+        session = _get_session(request, upload_id)
+        if session is None:
+            return _not_found()
+        if session.status == UploadSession.Status.OPEN:
+            discard_part(session.part_path)
+            session.mark_aborted()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadCommitView(APIView):
+    """
+    POST /api/brain/uploads/{upload_id}/commit/
+
+    Verify that all bytes arrived and that their SHA-256 matches the one declared at
+    creation, then move the file into the job input directory. A hash mismatch fails
+    the upload; the client has to start a new one.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        # The file is hashed outside any transaction, so a large upload does not pin the row
+        # lock; the session is then re-checked under the lock before the digest is acted on
+        with transaction.atomic():
+            session = _get_session(request, upload_id, for_update=True)
+            refused = self._refuse_commit(session)
+            if refused is not None:
+                return refused
+
+        try:
+            digest, read_error = file_sha256(session.part_path), None
+        except OSError as e:
+            digest, read_error = None, e
+
+        with transaction.atomic():
+            session = _get_session(request, upload_id, for_update=True)
+            refused = self._refuse_commit(session)
+            if refused is not None:
+                return refused
+            if read_error is not None:
+                logger.error(f"Upload {session.id}: cannot read uploaded data: {read_error}")
+                session.mark_failed(f"Uploaded data is missing: {read_error}")
+                return _session_response(session, status.HTTP_409_CONFLICT, error='Uploaded data is missing')
+            if digest != session.sha256:
+                discard_part(session.part_path)
+                session.mark_failed(f"SHA-256 mismatch: expected {session.sha256}, received {digest}")
+                return _session_response(session, status.HTTP_400_BAD_REQUEST, error='SHA-256 mismatch')
+
+            file_path = finalize_part(session.part_path, committed_path(session.id, session.file_name))
+            session.mark_committed(file_path)
+
+        logger.info(f"Upload {session.id} committed: {session.file_name} ({session.total_size} bytes)")
+        return _session_response(session)
+
+    @staticmethod
+    def _refuse_commit(session):
+        """Response for a session that cannot be committed (or already is), None if it can."""
+        if session is None:
+            return _not_found()
+        if session.status == UploadSession.Status.COMMITTED:
+            return _session_response(session)
+        if session.is_expired or session.status == UploadSession.Status.EXPIRED:
+            return _session_response(session, status.HTTP_410_GONE, error='Upload session expired')
+        if session.status != UploadSession.Status.OPEN:
+            return _session_response(session, status.HTTP_409_CONFLICT, error=f'Upload is {session.status}')
+        if session.write_in_progress:
+            return _session_response(session, status.HTTP_409_CONFLICT, error='Another chunk is being written')
+        if not session.is_complete:
+            return _session_response(session, status.HTTP_409_CONFLICT, error='Upload is incomplete')
+        return None
+
+
+# URL patterns for these views
+upload_urlpatterns = [
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload_session_create'),
+    path('uploads/<uuid:upload_id>/', UploadSessionView.as_view(), name='upload_session'),
+    path('uploads/<uuid:upload_id>/commit/', UploadCommitView.as_view(), name='upload_commit'),
+]
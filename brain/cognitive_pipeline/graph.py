@@ -66,13 +66,21 @@ class ProductRoadmapGraph:
 		Returns:
 			Final GraphState with all processing results
 		"""
-		from brain.cognitive_pipeline.utils.llm_utils import llm_fn_openai
+		from decouple import config
+		from brain.cognitive_pipeline.utils.llm_batch import BatchLLMFn
+		from brain.cognitive_pipeline.utils.llm_gateway import GatewayLLMFn
 		try:
 			if not initial_state.context:
 				initial_state.context = {}
 			initial_state.context["run"] = run
 			# ✅ Inject the functions directly onto the run object
-			initial_state.context["llm_fn"] = llm_fn_openai
+			# Batches prompts through the shared async gateway (concurrency caps, rate limits),
+			# or through provider batch APIs for bulk re-processing (LLM_BATCH_MODE); prompts whose
+			# batch outlasts LLM_BATCH_MAX_WAIT_HOURS go through the gateway instead of blocking the run
+			if config('LLM_BATCH_MODE', default=False, cast=bool):
+				initial_state.context["llm_fn"] = BatchLLMFn("openai", fallback=GatewayLLMFn("openai"))
+			else:
+				initial_state.context["llm_fn"] = GatewayLLMFn("openai")
 			initial_state.context["log_fn"] = logger.info
 
 			# Invoke the graph with the initial state
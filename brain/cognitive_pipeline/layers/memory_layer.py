@@ -3,6 +3,8 @@
 from brain.cognitive_pipeline.schema import GraphState
 from brain.models.runs import BrainRun
 from brain.cognitive_pipeline.utils.utils import log_node_io, handle_errors
+from brain.cognitive_pipeline.utils.compression import compression_summary
+from brain.utils.telemetry import log_info_event
 
 @handle_errors(raise_on_error=False)
 @log_node_io(node_name="memory_layer")
@@ -14,15 +16,26 @@ def memory_layer(run: BrainRun, state: GraphState) -> GraphState:
 	"""
 	from brain.models.memory import EpisodicMemoryEntry, SemanticMemoryEntry
 
-	# Persist episodic memory for each parsed document
+	# Persist episodic memory for each parsed document, compressed
 	if state.parsed_documents:
-		for doc in state.parsed_documents:
-			EpisodicMemoryEntry.objects.create(
+		entries = [
+			EpisodicMemoryEntry.build_compressed(
 				run=run,
 				event_type="document_parsed",
 				content=doc.content,
+				tables=doc.tables,
 				step="perception_layer"
 			)
+			for doc in state.parsed_documents
+		]
+		EpisodicMemoryEntry.objects.bulk_create(entries)
+		log_info_event(run, "memory_layer", "Parsed documents stored in episodic memory", {
+			"document_count": len(entries),
+			"compression": compression_summary(
+				sum(entry.raw_size for entry in entries),
+				sum(entry.stored_size for entry in entries)
+			)
+		})
 
 	# Persist semantic memory for each extracted entity
 	if state.extracted_entities:
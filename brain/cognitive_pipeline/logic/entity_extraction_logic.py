@@ -4,6 +4,10 @@ from brain.models.memory import EpisodicMemoryEvent
 
 from typing import List, Any, Dict, Optional
 from ..schema import ExtractedEntity
+from ..utils.document_sectioner import section_at
+from ..utils.llm_batch import LLMBatchPending
+from ..utils.llm_gateway import CHARS_PER_TOKEN
+from concurrent.futures import Future, ThreadPoolExecutor
 from difflib import SequenceMatcher
 import datetime
 import json
@@ -13,6 +17,10 @@ import yaml
 import time
 from brain.prompts.entity_extraction_prompts import ENTITY_EXTRACTION_PROMPT
 from brain.prompts.relationship_inference_prompts import RELATIONSHIP_INFERENCE_PROMPT
+from decouple import config
+
+# LLM calls per document; sections past the cap are keyword-extracted
+MAX_LLM_CHUNKS_PER_DOCUMENT = config('LLM_EXTRACTION_MAX_CHUNKS_PER_DOCUMENT', default=12, cast=int)
 
 def infer_entity_relationships(entities, world_model=None, llm_fn=None, use_llm=True, log_fn=None) -> List[Dict[str, Any]]:
     """
@@ -208,13 +216,25 @@ def log_extraction_event(entity, run_id=None, log_fn=None):
 # --- Step 4: LLM-Based Extraction Logic ---
 
 
-def llm_extract_entities(parsed_documents : list, world_model, prior_entities, llm_fn, max_tokens=2048, log_fn=None, max_attempts=2):
+def llm_extract_entities(parsed_documents : list, world_model, prior_entities, llm_fn, max_tokens=2048, log_fn=None, max_attempts=2,
+                         max_chunks_per_document=None):
     """
     Use an LLM to extract entities from parsed documents. Handles prompt construction, output validation, and error handling.
-    llm_fn: function that takes a prompt and returns a string (LLM output)
+    llm_fn: function that takes a prompt and returns a string (LLM output). If it also has a
+        batch(prompts) method (see llm_gateway.GatewayLLMFn), all chunks of a round are sent
+        through it concurrently; otherwise they are called one after another.
+    max_tokens: size of the document window of one prompt; consecutive sections are packed
+        into chunks of about this many tokens (see _document_chunks)
     max_attempts: number of LLM retry attempts before fallback (default 2)
+    max_chunks_per_document: LLM calls allowed per document (default MAX_LLM_CHUNKS_PER_DOCUMENT);
+        chunks past the cap get keyword extraction
+    Chunks whose provider batch is still running (LLMBatchPending) are not retried, since a
+    retry would wait on the same batch again; they fall back to keyword extraction at once
+    and the batch's answers are picked up from the response cache on a later run.
     """
-    results = []
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if max_chunks_per_document is None:
+        max_chunks_per_document = MAX_LLM_CHUNKS_PER_DOCUMENT
     world_model_str = json.dumps(world_model, default=str) if world_model else "{}"
     prior_entities_str = json.dumps([
         {"entity_type": e.entity_type, "value": e.value} for e in (prior_entities or [])
@@ -222,42 +242,66 @@ def llm_extract_entities(parsed_documents : list, world_model, prior_entities, l
     # Load and format the relationship schema for prompt injection
     from brain.prompts.entity_extraction_prompts import load_relationship_schema
     relationship_schema_str = load_relationship_schema()
+    # Entities per (document, offset), so results keep document order whatever order calls finish in
+    chunk_results: Dict[tuple, List[ExtractedEntity]] = {}
+    pending = []
+    over_budget = []
+    for doc_idx, doc in enumerate(parsed_documents):
+        content = doc.content if hasattr(doc, "content") else str(doc)
+        section_entities = getattr(doc, "section_entities", None)
+        for section in getattr(doc, "sections", None) or []:
+            if section_entities is not None and section.section_id in section_entities:
+                # Section unchanged from a near-duplicate document processed before (see perception_node)
+                chunk_results[(doc_idx, section.start)] = _entities_from_dicts(
+                    section_entities[section.section_id], doc, [section], content[section.start:section.end],
+                    section.start, origin="near_duplicate"
+                )
+        chunks = _document_chunks(doc, max_chars)
+        if len(chunks) > max_chunks_per_document:
+            over_budget.extend((doc_idx, doc, *chunk) for chunk in chunks[max_chunks_per_document:])
+            if log_fn:
+                log_fn({
+                    "event_type": "llm_extraction_budget_exceeded",
+                    "doc_id": getattr(doc, "file_path", None),
+                    "chunk_count": len(chunks),
+                    "max_chunks_per_document": max_chunks_per_document
+                })
+        for sections, start, end in chunks[:max_chunks_per_document]:
+            text = content[start:end]
+            prompt = ENTITY_EXTRACTION_PROMPT.format(
+                world_model=world_model_str,
+                prior_entities=prior_entities_str,
+                document=text[:max_chars],
+                relationship_schema=relationship_schema_str
+            )
+            pending.append(((doc_idx, start), doc, sections, start, text, prompt))
     # log_fn and max_attempts are now explicit arguments
-    for doc in parsed_documents:
-        text = doc.content if hasattr(doc, "content") else str(doc)
-        prompt = ENTITY_EXTRACTION_PROMPT.format(
-            world_model=world_model_str,
-            prior_entities=prior_entities_str,
-            document=text[:max_tokens],
-            relationship_schema=relationship_schema_str
-        )
-        attempt = 0
-        success = False
-        while attempt < max_attempts and not success:
+    deferred = []
+    for attempt in range(max_attempts):
+        if not pending:
+            break
+        outputs = _run_prompts(llm_fn, [chunk[5] for chunk in pending])
+        failed = []
+        for chunk, llm_output in zip(pending, outputs):
+            key, doc, sections, offset, text, prompt = chunk
+            if isinstance(llm_output, LLMBatchPending):
+                deferred.append((chunk, llm_output))
+                continue
             try:
-                llm_output = llm_fn(prompt)
+                if isinstance(llm_output, Exception):
+                    raise llm_output
                 entities = json.loads(llm_output)
                 if not isinstance(entities, list):
                     raise ValueError("LLM output is not a list")
-                for ent in entities:
-                    if not ent.get("entity_type") or not ent.get("value"):
-                        continue
-                    entity = ExtractedEntity(
-                        entity_type=ent["entity_type"],
-                        value=ent["value"],
-                        confidence=ent.get("confidence", 0.85),
-                        extraction_method="llm",
-                        step="entity_extraction",
-                        relationships=ent.get("relationships"),
-                        source_document_id=getattr(doc, "file_path", None),
-                        source_text_excerpt=text[:200],
-                        origin=ent.get("origin", None)
-                    )
-                    # Schema hardening: validate instance
-                    if not isinstance(entity, ExtractedEntity):
-                        raise ValueError("LLM extraction did not return ExtractedEntity instance")
-                    results.append(entity)
-                success = True
+                entities = [ent for ent in entities if ent.get("entity_type") and ent.get("value")]
+                chunk_results[key] = _entities_from_dicts(entities, doc, sections, text, offset)
+                section_entities = getattr(doc, "section_entities", None)
+                if sections and section_entities is not None:
+                    # Kept per section so the document's fingerprint can hand them to later near-duplicates
+                    for section in sections:
+                        section_entities[section.section_id] = []
+                    for ent in entities:
+                        section_entities[_section_of(ent, sections, text, offset).section_id].append(ent)
             except Exception as e:
                 if log_fn:
                     log_fn({
@@ -265,23 +309,159 @@ def llm_extract_entities(parsed_documents : list, world_model, prior_entities, l
                         "error": str(e),
                         "prompt_excerpt": prompt[:200],
                         "doc_id": getattr(doc, "file_path", None),
+                        "section_ids": [section.section_id for section in sections],
                         "attempt": attempt + 1
                     })
-                attempt += 1
-        if not success:
-            # Fallback to keyword extraction for this doc
-            if log_fn:
-                log_fn({
-                    "event_type": "llm_extraction_fallback",
-                    "reason": f"LLM failed after {max_attempts} attempts, using keyword extraction",
-                    "doc_id": getattr(doc, "file_path", None)
-                })
-            # Use a single-doc list for keyword extraction
-            fallback_entities = keyword_extract_entities([doc], world_model, prior_entities)
-            results.extend(fallback_entities)
+                failed.append(chunk)
+        pending = failed
+    fallbacks = [(chunk, f"LLM failed after {max_attempts} attempts, using keyword extraction") for chunk in pending]
+    fallbacks += [(chunk, f"{e}, using keyword extraction") for chunk, e in deferred]
+    for (key, doc, sections, offset, text, prompt), reason in fallbacks:
+        # Fallback to keyword extraction for this chunk
+        if log_fn:
+            log_fn({
+                "event_type": "llm_extraction_fallback",
+                "reason": reason,
+                "doc_id": getattr(doc, "file_path", None),
+                "section_ids": [section.section_id for section in sections]
+            })
+        chunk_results[key] = _keyword_extract_text(doc, text, offset)
+    for doc_idx, doc, sections, start, end in over_budget:
+        content = doc.content if hasattr(doc, "content") else str(doc)
+        chunk_results[(doc_idx, start)] = _keyword_extract_text(doc, content[start:end], start)
+
+    return [entity for key in sorted(chunk_results) for entity in chunk_results[key]]
+
+def _run_prompts(llm_fn, prompts):
+    """LLM output for each prompt in order, or the exception its call raised."""
+    batch = getattr(llm_fn, "batch", None)
+    if batch is not None:
+        return batch(prompts)
+    outputs = []
+    for prompt in prompts:
+        try:
+            outputs.append(llm_fn(prompt))
+        except Exception as e:
+            outputs.append(e)
+    return outputs
 
+def _entities_from_dicts(entities, doc, sections, text, offset, origin=None):
+    """Build ExtractedEntity objects for one chunk (text at offset of doc.content) from LLM output dicts."""
+    results = []
+    for ent in entities:
+        section = _section_of(ent, sections, text, offset) if sections else None
+        entity = ExtractedEntity(
+            entity_type=ent["entity_type"],
+            value=ent["value"],
+            confidence=ent.get("confidence", 0.85),
+            extraction_method="llm",
+            step="entity_extraction",
+            relationships=ent.get("relationships"),
+            source_document_id=getattr(doc, "file_path", None),
+            source_text_excerpt=_excerpt(ent, text),
+            source_section_id=section.section_id if section else None,
+            origin=origin or ent.get("origin", None)
+        )
+        # Schema hardening: validate instance
+        if not isinstance(entity, ExtractedEntity):
+            raise ValueError("LLM extraction did not return ExtractedEntity instance")
+        results.append(entity)
     return results
 
+def _section_of(ent, sections, text, offset):
+    """The section of a packed chunk an entity came from: where its value occurs, else the chunk's first."""
+    position = text.lower().find(str(ent["value"]).lower())
+    if position != -1:
+        for section in sections:
+            if section.start <= offset + position < section.end:
+                return section
+    return sections[0]
+
+def _excerpt(ent, text):
+    position = text.lower().find(str(ent["value"]).lower())
+    if position == -1:
+        return text[:200]
+    return text[max(0, position - 80):position + 120]
+
+def _document_chunks(doc, max_chars):
+    """
+    Split a document into (sections, start, end) chunks of doc.content for LLM extraction.
+
+    Consecutive DocumentSections are packed into one chunk while it stays within max_chars,
+    so a long document costs a few calls instead of one per section; each chunk keeps its
+    sections for provenance. Sections already answered from a near-duplicate are skipped and
+    end the current chunk. Documents without sections are one chunk.
+    """
+    sections = getattr(doc, "sections", None)
+    if not sections:
+        content = doc.content if hasattr(doc, "content") else str(doc)
+        return [([], 0, len(content))]
+    section_entities = getattr(doc, "section_entities", None) or {}
+    chunks = []
+    run = []
+    for section in sections:
+        if run and (section.section_id in section_entities or section.end - run[0].start > max_chars):
+            chunks.append((run, run[0].start, run[-1].end))
+            run = []
+        if section.section_id not in section_entities:
+            run.append(section)
+    if run:
+        chunks.append((run, run[0].start, run[-1].end))
+    return chunks
+
+class LLMExtractionPrefetcher:
+    """
+    Starts LLM entity extraction for each document as soon as it is parsed, so the
+    extraction stage overlaps with parsing of the remaining files.
+
+    extract() has the llm_extract_fn signature used by entity_extraction_logic:
+    prefetched documents return their (already running) results, anything else
+    is extracted inline. Prefetched results use the world model and prior
+    entities given at construction time.
+    """
+
+    def __init__(self, world_model, prior_entities, llm_fn, max_workers=4, log_fn=None):
+        self.world_model = world_model
+        self.prior_entities = prior_entities
+        self.llm_fn = llm_fn
+        self.log_fn = log_fn
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-extract")
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, doc) -> None:
+        doc_id = getattr(doc, "file_path", None)
+        if doc_id is None or doc_id in self._futures:
+            return
+        self._futures[doc_id] = self._executor.submit(
+            llm_extract_entities, [doc], self.world_model, self.prior_entities, self.llm_fn, log_fn=self.log_fn
+        )
+
+    def extract(self, parsed_documents, world_model, prior_entities) -> List[ExtractedEntity]:
+        futures = {}
+        remaining = []
+        for doc in parsed_documents:
+            future = self._futures.pop(getattr(doc, "file_path", None), None)
+            if future is not None:
+                futures[id(doc)] = future
+            else:
+                remaining.append(doc)
+        # Documents that weren't prefetched go out in one call, so a batching llm_fn runs them concurrently
+        extracted: Dict[Any, List[ExtractedEntity]] = {}
+        if remaining:
+            for entity in llm_extract_entities(remaining, world_model, prior_entities, self.llm_fn, log_fn=self.log_fn):
+                extracted.setdefault(entity.source_document_id, []).append(entity)
+        results = []
+        for doc in parsed_documents:
+            future = futures.get(id(doc))
+            if future is not None:
+                results.extend(future.result())
+            else:
+                results.extend(extracted.pop(getattr(doc, "file_path", None), []))
+        return results
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 # --- Step 2: Deduplication Logic (Semantic & Episodic Memory aware) ---
 
 def is_duplicate_entity(new_entity, prior_entity, threshold=0.85):
@@ -378,22 +558,30 @@ def keyword_extract_entities(parsed_documents, world_model, prior_entities):
     results = []
     for doc in parsed_documents:
         text = doc.content if hasattr(doc, "content") else str(doc)
-        for entity_type, patterns in ENTITY_PATTERNS.items():
-            for pattern in patterns:
-                for match in re.finditer(pattern, text, re.IGNORECASE):
-                    value = match.group(1).strip()
-                    if value:
-                        entity = ExtractedEntity(
-                            entity_type=entity_type,
-                            value=value,
-                            confidence=0.7,  # Heuristic: keyword matches are medium confidence
-                            extraction_method="keyword",
-                            step="entity_extraction",
-                            source_document_id=getattr(doc, "file_path", None),
-                            source_text_excerpt=text[max(0, match.start()-40):match.end()+40],
-                            origin=getattr(doc, "origin", None)
-                        )
-                        results.append(entity)
+        results.extend(_keyword_extract_text(doc, text))
+    return results
+
+def _keyword_extract_text(doc, text, offset=0):
+    """Keyword extraction over text, which starts at character offset of doc.content."""
+    results = []
+    for entity_type, patterns in ENTITY_PATTERNS.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                value = match.group(1).strip()
+                if value:
+                    section = section_at(doc, offset + match.start()) if getattr(doc, "sections", None) else None
+                    entity = ExtractedEntity(
+                        entity_type=entity_type,
+                        value=value,
+                        confidence=0.7,  # Heuristic: keyword matches are medium confidence
+                        extraction_method="keyword",
+                        step="entity_extraction",
+                        source_document_id=getattr(doc, "file_path", None),
+                        source_text_excerpt=text[max(0, match.start()-40):match.end()+40],
+                        source_section_id=section.section_id if section else None,
+                        origin=getattr(doc, "origin", None)
+                    )
+                    results.append(entity)
     return results
 
 
@@ -408,12 +596,16 @@ def entity_extraction_logic(
     llm_extract_fn,
     deduplicate_fn,
     enrich_fn,
-    log_event_fn=None
+    log_event_fn=None,
+    relationship_llm_fn=None,
+    log_fn=None
 ) -> tuple[List[ExtractedEntity], List[dict]]:
     """
     Extracts entities from parsed documents, using both keyword/heuristic and LLM-based methods.
     Incorporates semantic and episodic memory for continuity and enrichment.
     Process includes: keyword extraction, LLM-based extraction, deduplication, enrichment, and relationship inference.
+    relationship_llm_fn: LLM function for relationship inference (heuristics only when None)
+    log_fn: telemetry event logger for relationship inference errors
     Returns a tuple: (list of enriched ExtractedEntity, list of inferred relationships).
     """
     # 1. Read from semantic memory to prevent duplicates and enrich context
@@ -431,9 +623,9 @@ def entity_extraction_logic(
     inferred_relationships = infer_entity_relationships(
         enriched_entities,
         world_model=world_model,
-        llm_fn=None,  # Pass LLM function if available in your context
+        llm_fn=relationship_llm_fn,
         use_llm=True,
-        log_fn=log_event_fn
+        log_fn=log_fn
     )
     # 7. Optionally log extraction events to episodic memory
     if log_event_fn:
@@ -11,6 +11,10 @@ def validate_inputs(state: GraphState):
     return True
 
 
+def _ignore_document(doc) -> None:
+    pass
+
+
 def parse_documents_logic(
     run: Any,  # Should be a context object, not Django-dependent
     state: GraphState,
@@ -19,12 +23,17 @@ def parse_documents_logic(
     process_links,
     validate_processing_results,
     log_info_event,
-    log_validation_event
+    log_validation_event,
+    on_document=None
 ) -> GraphState:
     """
     Pure logic for document ingestion, LLM usage, and validation summary.
     All dependencies are injected for testability.
+    on_document, if given, is called with each ParsedDocument as soon as it is parsed;
+    process_files receives it and must call it for every file document.
     """
+    if on_document is None:
+        on_document = _ignore_document
     log_info_event(run, "parse_documents", "Starting hybrid document parsing", {
         "file_count": len(state.uploaded_files),
         "link_count": len(state.links),
@@ -39,11 +48,14 @@ def parse_documents_logic(
     if state.uploaded_files:
         processor, processing_method = select_processor()
         llm_used = processing_method == "hybrid_llm"
-        docs, stats = process_files(processor, state.uploaded_files, run, processing_method)
+        docs, stats = process_files(processor, state.uploaded_files, run, processing_method, on_document=on_document)
         parsed_documents.extend(docs)
     # Process links
     if state.links:
-        parsed_documents.extend(process_links(run, state.links))
+        link_docs = process_links(run, state.links)
+        for doc in link_docs:
+            on_document(doc)
+        parsed_documents.extend(link_docs)
     # Validate overall processing results
     validation_summary_dict = validate_processing_results(run, parsed_documents)
     validation_summary = DocumentValidationSummary(
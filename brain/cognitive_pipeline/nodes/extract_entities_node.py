@@ -2,6 +2,12 @@
 
 from brain.cognitive_pipeline.schema import GraphState
 from brain.models.runs import BrainRun
+from brain.models.fingerprints import DocumentFingerprint
+from brain.cognitive_pipeline.utils.incremental_parse import logical_document_name
+from brain.cognitive_pipeline.utils.llm_cache import llm_cache_stats
+from brain.cognitive_pipeline.utils.llm_gateway import get_llm_gateway
+from brain.cognitive_pipeline.utils.llm_http import llm_http_stats
+from brain.cognitive_pipeline.utils.llm_utils import llm_coalescing_stats
 from brain.cognitive_pipeline.utils.utils import log_node_io, handle_errors
 
 @handle_errors(raise_on_error=False)
@@ -43,9 +49,15 @@ def extract_entities_node(run: BrainRun, state: GraphState, llm_fn = None, log_f
     world_model = getattr(state, "business_profile", None) or {}
     parsed_documents = getattr(state, "parsed_documents", None) or []
 
+    # LLM extraction may already be running per document since parsing (see perception_node)
+    prefetcher = state.context.pop("llm_extraction_prefetcher", None) if state.context else None
+
     # Wrap LLM extraction to ensure robust parsing/validation
     def safe_llm_extract(parsed_docs, world_model, prior_entities):
-        raw = llm_extract_entities(parsed_docs, world_model, prior_entities, llm_fn)
+        if prefetcher is not None:
+            raw = prefetcher.extract(parsed_docs, world_model, prior_entities)
+        else:
+            raw = llm_extract_entities(parsed_docs, world_model, prior_entities, llm_fn)
         # Validate and coerce to ExtractedEntity list
         results = []
         for ent in raw:
@@ -63,17 +75,24 @@ def extract_entities_node(run: BrainRun, state: GraphState, llm_fn = None, log_f
         log_fn({"event_type": "entity_extraction_batch_start", "count": len(parsed_documents)})
 
     # Run extraction logic (now returns both entities and relationships)
-    extracted_entities, inferred_relationships = entity_extraction_logic(
-        parsed_documents=parsed_documents,
-        world_model=world_model,
-        semantic_memory=semantic_memory,
-        episodic_memory=episodic_memory,
-        keyword_extract_fn=keyword_extract_entities,
-        llm_extract_fn=safe_llm_extract,
-        deduplicate_fn=deduplicate_entities,
-        enrich_fn=enrich_entities,
-        log_event_fn=(lambda ent: log_extraction_event(ent, run_id=getattr(run, "id", None), log_fn=log_fn)) if log_fn else None
-    )
+    try:
+        extracted_entities, inferred_relationships = entity_extraction_logic(
+            parsed_documents=parsed_documents,
+            world_model=world_model,
+            semantic_memory=semantic_memory,
+            episodic_memory=episodic_memory,
+            keyword_extract_fn=keyword_extract_entities,
+            llm_extract_fn=safe_llm_extract,
+            deduplicate_fn=deduplicate_entities,
+            enrich_fn=enrich_entities,
+            log_event_fn=(lambda ent: log_extraction_event(ent, run_id=getattr(run, "id", None), log_fn=log_fn)) if log_fn else None,
+            relationship_llm_fn=llm_fn,
+            log_fn=log_fn
+        )
+    finally:
+        if prefetcher is not None:
+            prefetcher.shutdown()
+    _record_document_fingerprints(run, parsed_documents, log_fn)
     # Ensure inferred_relationships is always a list
     if inferred_relationships is None:
         inferred_relationships = []
@@ -82,9 +101,33 @@ def extract_entities_node(run: BrainRun, state: GraphState, llm_fn = None, log_f
         log_fn({
             "event_type": "entity_extraction_complete",
             "entity_count": len(extracted_entities),
-            "relationship_count": len(inferred_relationships)
+            "relationship_count": len(inferred_relationships),
+            "llm_http": llm_http_stats(),
+            "llm_gateway": get_llm_gateway().stats(),
+            "llm_cache": llm_cache_stats(),
+            "llm_coalescing": llm_coalescing_stats()
         })
         log_fn({"event_type": "relationship_inference_batch_end", "count": len(inferred_relationships)})
     state.extracted_entities = extracted_entities
     state.inferred_relationships = inferred_relationships
     return state
+
+
+def _record_document_fingerprints(run: BrainRun, parsed_documents, log_fn=None) -> None:
+    """Index each document's SimHash with its per-section LLM entities so later near-duplicates can reuse them."""
+    recorded = 0
+    for doc in parsed_documents:
+        fingerprint = getattr(doc, "simhash", None)
+        section_entities = getattr(doc, "section_entities", None)
+        if not fingerprint or not section_entities:
+            continue
+        try:
+            DocumentFingerprint.record(
+                run.organization_id, run, logical_document_name(doc.file_path), fingerprint, section_entities
+            )
+            recorded += 1
+        except Exception as e:
+            if log_fn:
+                log_fn({"event_type": "document_fingerprint_error", "doc_id": doc.file_path, "error": str(e)})
+    if log_fn and recorded:
+        log_fn({"event_type": "document_fingerprints_recorded", "count": recorded})
@@ -1,16 +1,24 @@
 # brain/cognitive_pipeline/nodes/perception_node.py
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+import os
 
 
 from ...models.runs import BrainRun
+from ...models.fingerprints import DocumentFingerprint, FingerprintIndex
 from ...utils.telemetry import log_info_event, log_validation_event
 from ..utils.document_processor import DocumentProcessor, DocumentProcessingError
 from ..utils.llm_document_processor import LLMDocumentProcessor
 from ..utils.file_validators import FileValidator
+from ..utils.parse_cache import ParseCache
+from ..utils.link_fetcher import LinkFetcher, LinkResponseCache, build_link_document
+from ..utils.document_sectioner import section_document
+from ..utils.simhash import hamming_distance, simhash
+from ..utils.incremental_parse import logical_document_name
 from ..schema import GraphState, ParsedDocument, DocumentMetadata, DocumentParsingValidationResult
 from ..logic.perception_logic import parse_documents_logic
+from ..logic.entity_extraction_logic import LLMExtractionPrefetcher
 
 logger = logging.getLogger(__name__)
 
@@ -22,36 +30,66 @@ def _select_processor():
     openai_key_raw = str(config('OPENAI_API_KEY', default=''))
     anthropic_key: Optional[str] = anthropic_key_raw if anthropic_key_raw else None
     openai_key: Optional[str] = openai_key_raw if openai_key_raw else None
+    # 0 = one parsing worker per CPU
+    max_workers: Optional[int] = config('DOCUMENT_PROCESSING_WORKERS', default=0, cast=int) or None
+    # Empty PARSE_CACHE_DIR disables the parse cache
+    cache_dir = str(config('PARSE_CACHE_DIR', default=os.path.join('media', 'cache', 'parsed_documents')))
+    cache_max_mb = config('PARSE_CACHE_MAX_MB', default=512, cast=int)
+    cache = ParseCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024) if cache_dir else None
+    # Per-file parsing budgets (0 disables a limit) and page/sheet-level re-parsing of edited uploads
+    budgets = {
+        'time_budget_seconds': config('DOCUMENT_TIME_BUDGET_SECONDS', default=DocumentProcessor.FILE_TIME_BUDGET_SECONDS, cast=float),
+        'memory_budget_bytes': config('DOCUMENT_MEMORY_BUDGET_MB', default=1024, cast=int) * 1024 * 1024,
+        'incremental': config('INCREMENTAL_REPARSE', default=True, cast=bool)
+    }
     if anthropic_key or openai_key:
         return LLMDocumentProcessor(
             anthropic_api_key=anthropic_key,
-            openai_api_key=openai_key
+            openai_api_key=openai_key,
+            max_workers=max_workers,
+            cache=cache,
+            llm_concurrency=config('LLM_ENHANCEMENT_CONCURRENCY', default=LLMDocumentProcessor.LLM_ENHANCEMENT_CONCURRENCY, cast=int),
+            **budgets
         ), "hybrid_llm"
     else:
         logger.warning("No LLM API keys found, using traditional processing only")
-        return DocumentProcessor(), "traditional_only"
+        return DocumentProcessor(max_workers=max_workers, cache=cache, **budgets), "traditional_only"
 
 
-def _process_files(processor : DocumentProcessor | LLMDocumentProcessor, file_paths : list[str], run : BrainRun, processing_method : str):
-    validation_result = FileValidator.validate_file_paths(file_paths)
+def _process_files(processor : DocumentProcessor | LLMDocumentProcessor, file_paths : list[str], run : BrainRun, processing_method : str, on_document):
+    # Earlier versions of a document are only reused for incremental parsing within its organization
+    processor.organization_id = str(run.organization_id) if run.organization_id is not None else None
+    # One stat + header read per file, shared by validation and parsing
+    probes = FileValidator.probe_file_paths(file_paths)
+    # ZIP bundles are parsed member by member straight from the archive; members that
+    # fail validation become failed documents instead of failing the whole job
+    file_paths, probes, rejected_members = FileValidator.expand_archives(file_paths, probes)
+    document_paths = [path for path in file_paths if path not in rejected_members]
+    validation_result = FileValidator.validate_file_paths(document_paths or file_paths, probes)
     log_validation_event(run, "parse_documents", {
         "is_valid": validation_result.is_valid,
         "errors": validation_result.errors,
         "warnings": validation_result.warnings,
         "details": validation_result.details,
+        "rejected_archive_members": rejected_members,
         "processing_method": processing_method
     })
     if not validation_result.is_valid:
         raise DocumentProcessingError(f"File validation failed: {'; '.join(validation_result.errors)}")
-    documents = processor.process_files(file_paths)
-    parsed_documents = []
-    for doc in documents:
+    parsed_documents = [
+        processor._create_failed_document(path, f"Skipped archive member: {'; '.join(errors)}")
+        for path, errors in rejected_members.items()
+    ]
+    # One query for the organization's fingerprints instead of one per parsed document
+    fingerprint_index = _load_fingerprint_index(run)
+    # Documents stream in as they finish so on_document consumers overlap with parsing
+    for doc in processor.process_files_iter(document_paths, probes):
         if isinstance(doc, ParsedDocument):
-            parsed_documents.append(doc)
+            parsed_doc = doc
         elif isinstance(doc, dict):
-            parsed_documents.append(ParsedDocument(**doc))
+            parsed_doc = ParsedDocument(**doc)
         else:
-            parsed_documents.append(ParsedDocument(
+            parsed_doc = ParsedDocument(
                 file_path=getattr(doc, 'file_path', '') or '',
                 content=getattr(doc, 'content', ''),
                 metadata=getattr(doc, 'metadata', None) or DocumentMetadata(
@@ -62,16 +100,72 @@ def _process_files(processor : DocumentProcessor | LLMDocumentProcessor, file_pa
                 ),
                 file_type=getattr(doc, 'file_type', '') or '',
                 validation_result=getattr(doc, 'validation_result', None) or DocumentParsingValidationResult(is_valid=True, quality_score=0.0)
-            ))
+            )
+        # Sectioned before on_document so prefetched extraction can work per section
+        parsed_doc.sections = section_document(parsed_doc)
+        _attach_near_duplicate(run, parsed_doc, fingerprint_index)
+        parsed_documents.append(parsed_doc)
+        on_document(parsed_doc)
+    # Downstream stages expect input order
+    input_order = {file_path: idx for idx, file_path in enumerate(file_paths)}
+    parsed_documents.sort(key=lambda doc: input_order.get(doc.file_path, len(input_order)))
     stats = processor.get_processing_stats()
     log_info_event(run, "parse_documents", "File processing completed", {
         "processing_stats": stats,
         "documents_created": len(parsed_documents),
+        "archive_members_rejected": len(rejected_members),
         "processing_method": processing_method
     })
     return parsed_documents, stats
 
 
+def _load_fingerprint_index(run: BrainRun) -> Optional[FingerprintIndex]:
+    try:
+        return DocumentFingerprint.index_for(run.organization_id)
+    except Exception as e:
+        # The index is an optimisation; extraction simply runs on every section without it
+        logger.warning(f"Near-duplicate index unavailable: {e}")
+        return None
+
+
+def _attach_near_duplicate(run: BrainRun, parsed_doc: ParsedDocument, fingerprint_index: Optional[FingerprintIndex]) -> None:
+    """
+    Fingerprint the document and, if the organization has processed a near-duplicate
+    or an earlier version (same upload name) before, pre-fill section_entities for
+    the sections the two share so extraction only re-runs the sections that differ.
+    """
+    parsed_doc.simhash = simhash(parsed_doc.content) or None
+    if parsed_doc.simhash is None or not parsed_doc.sections or fingerprint_index is None:
+        return
+    try:
+        match = fingerprint_index.find_near_duplicate(parsed_doc.simhash)
+        if match is None:
+            previous = fingerprint_index.latest_version(logical_document_name(parsed_doc.file_path))
+            if previous is not None:
+                match = previous, hamming_distance(previous.fingerprint, parsed_doc.simhash)
+    except Exception as e:
+        # The index is an optimisation; extraction simply runs on every section without it
+        logger.warning(f"Near-duplicate lookup failed for {parsed_doc.file_path}: {e}")
+        return
+    if match is None:
+        return
+    fingerprint, distance = match
+    reused = {
+        section.section_id: fingerprint.section_entities[section.section_id]
+        for section in parsed_doc.sections
+        if section.section_id in fingerprint.section_entities
+    }
+    parsed_doc.near_duplicate_of = fingerprint.file_name
+    parsed_doc.section_entities = reused
+    log_info_event(run, "parse_documents", "Near-duplicate or earlier version of document detected", {
+        "file_path": parsed_doc.file_path,
+        "near_duplicate_of": fingerprint.file_name,
+        "hamming_distance": distance,
+        "sections_reused": len(reused),
+        "sections_total": len(parsed_doc.sections)
+    })
+
+
 def parse_documents_node(run: BrainRun, state: GraphState) -> GraphState:
     """
     Layer 1: Perception Layer - Hybrid document parsing with LLM enhancement
@@ -88,6 +182,10 @@ def parse_documents_node(run: BrainRun, state: GraphState) -> GraphState:
     Returns:
         Updated GraphState with parsed_documents populated
     """
+    # Start LLM entity extraction per document while the remaining files are still parsing
+    prefetcher = _build_extraction_prefetcher(state)
+    if prefetcher is not None and state.context is not None:
+        state.context["llm_extraction_prefetcher"] = prefetcher
     # Thin wrapper: delegate to pure logic, passing all dependencies
     try:
         return parse_documents_logic(
@@ -98,9 +196,12 @@ def parse_documents_node(run: BrainRun, state: GraphState) -> GraphState:
             process_links=_process_links,
             validate_processing_results=_validate_processing_results,
             log_info_event=log_info_event,
-            log_validation_event=log_validation_event
+            log_validation_event=log_validation_event,
+            on_document=prefetcher.submit if prefetcher is not None else None
         )
     except Exception as e:
+        if prefetcher is not None:
+            prefetcher.shutdown()
         error_msg = f"Hybrid document parsing failed: {str(e)}"
         logger.error(error_msg, exc_info=True)
         run.mark_failed("parse_documents_error", error_msg)
@@ -109,33 +210,48 @@ def parse_documents_node(run: BrainRun, state: GraphState) -> GraphState:
 
 
 
+def _build_extraction_prefetcher(state: GraphState) -> Optional[LLMExtractionPrefetcher]:
+    """Prefetch LLM extraction only when the workflow has injected an llm_fn that answers promptly."""
+    llm_fn = state.context.get("llm_fn") if state.context else None
+    # Batch-mode llm_fns (llm_batch.BatchLLMFn) would submit one provider batch per document
+    if llm_fn is None or getattr(llm_fn, "deferred", False):
+        return None
+    return LLMExtractionPrefetcher(
+        world_model=getattr(state, "business_profile", None) or {},
+        prior_entities=getattr(state, "extracted_entities", None) or [],
+        llm_fn=llm_fn,
+        # Same log_fn the extraction node uses, so prefetched failures and fallbacks are reported
+        log_fn=state.context.get("log_fn") or logger.info
+    )
+
+
 def _process_links(run: BrainRun, links: list[str]) -> list[ParsedDocument]:
-    """Process web links (enhanced placeholder for Week 1)."""
-    log_info_event(run, "parse_documents", "Processing links (enhanced placeholder)", {
+    """Fetch web links concurrently and parse them into ParsedDocuments (input order)."""
+    from decouple import config
+    # Empty LINK_CACHE_DIR disables conditional-GET caching of responses
+    cache_dir = str(config('LINK_CACHE_DIR', default=os.path.join('media', 'cache', 'links')))
+    cache_max_mb = config('LINK_CACHE_MAX_MB', default=256, cast=int)
+    fetcher = LinkFetcher(
+        cache=LinkResponseCache(cache_dir, max_bytes=cache_max_mb * 1024 * 1024) if cache_dir else None,
+        max_connections=config('LINK_FETCH_MAX_CONNECTIONS', default=LinkFetcher.MAX_CONNECTIONS, cast=int),
+        per_host_limit=config('LINK_FETCH_PER_HOST', default=LinkFetcher.PER_HOST_LIMIT, cast=int),
+        timeout_seconds=config('LINK_FETCH_TIMEOUT_SECONDS', default=LinkFetcher.TIMEOUT_SECONDS, cast=float)
+    )
+    log_info_event(run, "parse_documents", "Fetching links", {"link_count": len(links)})
+    # Linked PDF/DOCX/XLSX files are small in number; parse them in-process
+    processor = DocumentProcessor(max_workers=1, pdf_shard_workers=1)
+    link_documents = []
+    for fetched in fetcher.fetch_all(links):
+        link_doc = build_link_document(fetched, processor)
+        link_doc.sections = section_document(link_doc)
+        _attach_near_duplicate(run, link_doc)
+        link_documents.append(link_doc)
+    log_info_event(run, "parse_documents", "Link processing completed", {
         "link_count": len(links),
-        "status": "placeholder_with_llm_ready"
+        "documents_created": sum(1 for doc in link_documents if doc.file_type != "failed"),
+        "fetch_stats": fetcher.stats
     })
-    
-    # TODO: Implement link processing with LLM analysis in Week 2
-    # For now, create enhanced placeholder documents
-    placeholder_documents = []
-    
-    for i, link in enumerate(links):
-        placeholder_doc = ParsedDocument(
-            file_path=link,
-            content=f"[ENHANCED PLACEHOLDER] URL content from: {link}\n\nThis will be processed with LLM-based web scraping in Week 2.",
-            metadata=DocumentMetadata(
-                file_path=link,
-                file_size=0,
-                file_type="url",
-                quality_score=0.0
-            ),
-            file_type="url",
-            validation_result=DocumentParsingValidationResult(is_valid=True, quality_score=0.0)
-        )
-        placeholder_documents.append(placeholder_doc)
-    
-    return placeholder_documents
+    return link_documents
 
 
 def _validate_processing_results(run: BrainRun, documents: list[ParsedDocument]) -> Dict[str, Any]:
@@ -136,6 +136,7 @@ class ExtractedEntity(BaseModel):
     relationships: Optional[Dict[str, Any]] = None  # e.g. {'related_to': 'ProductInitiative', ...}
     source_document_id: Optional[str] = None  # For traceability
     source_text_excerpt: Optional[str] = None  # For traceability
+    source_section_id: Optional[str] = None  # DocumentSection the entity was found in
     created_at: Optional[str] = None  # ISO timestamp, if available
     updated_at: Optional[str] = None  # ISO timestamp, if available
     origin: Optional[str] = None  # New field to track origin of extraction
@@ -256,6 +257,19 @@ class DocumentParsingValidationResult(BaseModel):
 	warnings: List[str] = []
 	details: Dict[str, Any] = {}
 	processing_method: str = "traditional"  # traditional, hybrid_llm, llm_fallback
+	partial: bool = False  # Parsing stopped early on a time or memory budget
+
+class DocumentSection(BaseModel):
+	"""A contiguous slice of ParsedDocument.content with its structural provenance"""
+	section_id: str  # Stable: derived from the section's text and heading path, not its page
+	index: int  # Position within the document
+	start: int  # Character offsets into ParsedDocument.content, end exclusive
+	end: int
+	char_count: int
+	kind: str  # page, sheet, heading or text - the marker that opened the section
+	page: Optional[int] = None
+	sheet: Optional[str] = None
+	heading: Optional[str] = None
 
 class ParsedDocument(BaseModel):
 	"""Processed document with extracted content and metadata"""
@@ -265,6 +279,14 @@ class ParsedDocument(BaseModel):
 	tables: List[Dict[str, Any]] = []
 	metadata: DocumentMetadata
 	validation_result: DocumentParsingValidationResult
+	sections: List[DocumentSection] = []
+	simhash: Optional[int] = None  # 64-bit SimHash of content, for near-duplicate detection
+	near_duplicate_of: Optional[str] = None  # File name of the previously processed near-duplicate
+	# section_id -> LLM-extracted entity dicts; pre-filled from a near-duplicate, those sections are not re-extracted
+	section_entities: Dict[str, List[Dict[str, Any]]] = {}
+
+	def section_text(self, section: DocumentSection) -> str:
+		return self.content[section.start:section.end]
 
 
 #-----GraphState-----
@@ -0,0 +1,128 @@
+# brain/cognitive_pipeline/utils/archive_reader.py
+
+"""
+Read documents straight out of uploaded ZIP bundles.
+
+Bundle members are addressed as `<archive path>!/<member name>` so they flow
+through validation, the parse cache and the process pool like any other file
+path; nothing is extracted to disk. Probing and hashing stream the member
+through the archive's decompressor. Parsers that need random access (PDF, and
+the ZIP-based DOCX/XLSX) get the member decompressed into memory, bounded by
+the per-file size limit.
+"""
+
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+MEMBER_SEPARATOR = '!/'
+ARCHIVE_MIME_TYPE = 'application/zip'
+
+MAX_ARCHIVE_MEMBERS = 500
+MAX_ARCHIVE_TOTAL_SIZE = 1024 * 1024 * 1024  # 1GB uncompressed
+MAX_COMPRESSION_RATIO = 100  # Above this a member is treated as a decompression bomb
+COMPRESSION_RATIO_MIN_SIZE = 1024 * 1024  # Small members may legitimately compress very well
+
+
+class ArchiveError(Exception):
+    """Archive cannot be listed or a member cannot be read"""
+    pass
+
+
+def member_path(archive_path: str, name: str) -> str:
+    return f"{archive_path}{MEMBER_SEPARATOR}{name}"
+
+
+def split_member_path(file_path: str) -> Optional[Tuple[str, str]]:
+    """(archive path, member name) of a bundle member path, None for regular paths."""
+    archive_path, separator, name = file_path.partition(MEMBER_SEPARATOR)
+    if not separator or not name:
+        return None
+    return archive_path, name
+
+
+def list_archive_members(archive_path: str) -> List[str]:
+    """Member paths of the documents in a bundle, in archive order; folders and OS metadata are skipped."""
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            infos = [info for info in archive.infolist() if _is_document_member(info)]
+    except (zipfile.BadZipFile, OSError) as e:
+        raise ArchiveError(f"Cannot read archive: {e}")
+    if len(infos) > MAX_ARCHIVE_MEMBERS:
+        raise ArchiveError(f"Archive has too many files: {len(infos)} (max: {MAX_ARCHIVE_MEMBERS})")
+    total_size = sum(info.file_size for info in infos)
+    if total_size > MAX_ARCHIVE_TOTAL_SIZE:
+        raise ArchiveError(f"Archive too large when uncompressed: {total_size} bytes (max: {MAX_ARCHIVE_TOTAL_SIZE})")
+    return [member_path(archive_path, info.filename) for info in infos]
+
+
+def member_info(file_path: str) -> zipfile.ZipInfo:
+    archive_path, name = _require_member(file_path)
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            return archive.getinfo(name)
+    except KeyError:
+        raise FileNotFoundError(f"No member {name} in {archive_path}")
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Cannot read archive: {e}")
+
+
+def member_error(info: zipfile.ZipInfo) -> Optional[str]:
+    """Why a member must not be decompressed, if anything."""
+    if info.flag_bits & 0x1:
+        return "Encrypted archive members are not supported"
+    if (info.file_size >= COMPRESSION_RATIO_MIN_SIZE
+            and info.file_size > MAX_COMPRESSION_RATIO * max(info.compress_size, 1)):
+        return f"Suspicious compression ratio ({info.file_size} bytes from {info.compress_size})"
+    return None
+
+
+@contextmanager
+def open_source(file_path: str) -> Iterator[BinaryIO]:
+    """Binary stream of a regular file or, decompressed on the fly, of a bundle member."""
+    split = split_member_path(file_path)
+    if split is None:
+        with open(file_path, 'rb') as f:
+            yield f
+        return
+    archive_path, name = split
+    try:
+        with zipfile.ZipFile(archive_path) as archive, archive.open(name) as member:
+            yield member
+    except KeyError:
+        raise FileNotFoundError(f"No member {name} in {archive_path}")
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"Cannot read archive: {e}")
+
+
+def read_archive_member(file_path: str, max_bytes: int) -> bytes:
+    """Decompress a member into memory, refusing more than max_bytes whatever its header claims."""
+    with open_source(file_path) as member:
+        data = member.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ArchiveError(f"Archive member larger than {max_bytes} bytes")
+    return data
+
+
+def open_document_source(file_path: str, max_bytes: int) -> Union[str, io.BytesIO]:
+    """What parsers should open: the path itself for regular files, an in-memory copy for bundle members."""
+    if split_member_path(file_path) is None:
+        return file_path
+    return io.BytesIO(read_archive_member(file_path, max_bytes))
+
+
+def _require_member(file_path: str) -> Tuple[str, str]:
+    split = split_member_path(file_path)
+    if split is None:
+        raise ValueError(f"Not an archive member path: {file_path}")
+    return split
+
+
+def _is_document_member(info: zipfile.ZipInfo) -> bool:
+    if info.is_dir():
+        return False
+    parts = info.filename.split('/')
+    # macOS resource forks and dotfiles (.DS_Store etc.) are never documents
+    return parts[0] != '__MACOSX' and not os.path.basename(info.filename).startswith('.')
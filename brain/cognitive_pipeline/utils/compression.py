@@ -0,0 +1,56 @@
+# brain/cognitive_pipeline/utils/compression.py
+
+"""
+zstd compression for parsed document content and tables at rest.
+
+Parsed text and table JSON compress very well (typically 4-10x), so the parse
+cache and EpisodicMemoryEntry store them compressed. Payloads below
+MIN_COMPRESS_BYTES are kept raw because the frame overhead isn't worth it;
+readers tell the two apart by the zstd frame magic.
+"""
+
+import json
+from typing import Any, Dict
+
+import zstandard
+
+ZSTD_LEVEL = 3
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+MIN_COMPRESS_BYTES = 256
+
+
+def compress_bytes(data: bytes) -> bytes:
+    """zstd-compress data, or return it unchanged when it is too small to benefit."""
+    if len(data) < MIN_COMPRESS_BYTES:
+        return data
+    compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return compressed if len(compressed) < len(data) else data
+
+
+def decompress_bytes(data: bytes) -> bytes:
+    """Inverse of compress_bytes; raw payloads pass through. A corrupt or truncated frame raises ValueError."""
+    if data[:4] != ZSTD_MAGIC:
+        return data
+    try:
+        # Frames written by compress() carry their content size, so no max_output_size is needed
+        return zstandard.ZstdDecompressor().decompress(data)
+    except zstandard.ZstdError as e:
+        # ZstdError is not a ValueError; callers treat unreadable payloads like malformed JSON
+        raise ValueError(f"corrupt zstd payload: {e}") from e
+
+
+def decompress_text(data: bytes) -> str:
+    return decompress_bytes(bytes(data)).decode('utf-8')
+
+
+def decompress_json(data: bytes) -> Any:
+    return json.loads(decompress_bytes(bytes(data)))
+
+
+def compression_summary(raw_bytes: int, stored_bytes: int) -> Dict[str, Any]:
+    return {
+        "raw_bytes": raw_bytes,
+        "stored_bytes": stored_bytes,
+        "bytes_saved": raw_bytes - stored_bytes,
+        "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else None
+    }
@@ -0,0 +1,57 @@
+# brain/cognitive_pipeline/utils/content_metrics.py
+
+"""
+Single-pass content quality metrics for extracted text.
+
+Character classes are counted with C-level primitives instead of a Python loop
+per character: content is UTF-8 encoded once, its ASCII characters are counted
+with bytes.translate deletion tables, and only the non-ASCII characters go
+through regexes whose classes match str.isalnum/str.isspace exactly. Words and
+lines are split once and reused for every count.
+"""
+
+import re
+from typing import Any, Dict
+
+ASCII_BYTES = bytes(range(0x80))
+NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+# Bytes for which chr(b).isalnum() or chr(b).isspace()
+ASCII_TEXT_BYTES = bytes(b for b in range(128) if chr(b).isalnum() or chr(b).isspace())
+# Control characters other than whitespace: C0, DEL and C1 controls
+CONTROL_CHARS = "".join(chr(c) for c in [*range(0x00, 0x09), 0x0e, 0x0f, *range(0x10, 0x1c), *range(0x7f, 0xa0)])
+ASCII_NON_CONTROL_BYTES = bytes(b for b in range(128) if chr(b) not in CONTROL_CHARS)
+# sre's \w is isalnum() or '_' and \s is isspace(), so what this leaves behind is exactly the special characters
+TEXT_RUN_RE = re.compile(r'[^\W_]+|\s+')
+# U+FFFD marks bytes that failed to decode
+NON_PRINTABLE_RE = re.compile(f"[{re.escape(CONTROL_CHARS)}\ufffd]")
+
+
+def content_metrics(content: str) -> Dict[str, Any]:
+    """Length, word, character-class and repetition metrics of content."""
+    length = len(content)
+    encoded = content.encode('utf-8', 'surrogatepass')
+    # In UTF-8 every non-ASCII character is encoded with bytes >= 0x80 only
+    data = encoded if len(encoded) == length else encoded.translate(None, NON_ASCII_BYTES)
+    special_chars = len(data.translate(None, ASCII_TEXT_BYTES))
+    non_printable = len(data.translate(None, ASCII_NON_CONTROL_BYTES))
+    if len(data) < length:
+        # Dropping the ASCII bytes leaves whole multi-byte sequences: the non-ASCII characters in order
+        other = encoded.translate(None, ASCII_BYTES).decode('utf-8', 'surrogatepass')
+        special_chars += len(TEXT_RUN_RE.sub('', other))
+        non_printable += len(NON_PRINTABLE_RE.findall(other))
+
+    words = content.split()
+    unique_words = len(set(words))
+    lines = [line for line in map(str.strip, content.splitlines()) if line]
+    return {
+        'content_length': length,
+        'stripped_length': len(content.strip()),
+        'word_count': len(words),
+        'unique_words': unique_words,
+        'line_count': len(lines),
+        'special_char_ratio': special_chars / length if length else 0.0,
+        'printable_ratio': 1 - non_printable / length if length else 1.0,
+        'unique_word_ratio': unique_words / len(words) if words else 1.0,
+        # Share of non-blank lines that repeat an earlier one (page headers, footers, extraction loops)
+        'repeated_line_ratio': 1 - len(set(lines)) / len(lines) if lines else 0.0
+    }
@@ -1,17 +1,44 @@
 # brain/services/document_processor.py
 
+import codecs
+import io
+import logging
+import mmap
 import os
+import sys
 import time
-from typing import List, Dict, Any
-import mimetypes
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, BinaryIO, Callable, Iterator, Optional, Union
 
 # Document processing libraries
+import charset_normalizer
 import pdfplumber
 from docx import Document as DocxDocument
 from openpyxl import load_workbook
 
 # Local imports
 from brain.cognitive_pipeline.schema import ParsedDocument, DocumentMetadata, DocumentParsingValidationResult
+from .archive_reader import ArchiveError, open_document_source
+from .compression import compression_summary
+from .content_metrics import content_metrics
+from .docx_reader import DocxFastPathUnsupported, read_docx
+from .file_probe import FileProbe
+from .incremental_parse import document_identity, pdf_page_fingerprint, xlsx_sheet_fingerprints
+from .parse_cache import ParseCache
+from .parsing_budget import ParsingBudget
+
+logger = logging.getLogger(__name__)
+
+TEXT_SAMPLE_SIZE = 64 * 1024
+TEXT_DECODE_CHUNK_SIZE = 4 * 1024 * 1024
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+TEXT_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
 
 
 class DocumentProcessingError(Exception):
@@ -23,6 +50,9 @@ class DocumentProcessor:
     """
     Core document processing service for the Perception Layer.
     Handles PDF, DOCX, and XLSX files with comprehensive error handling.
+    
+    Paths may also name members of ZIP bundles (archive_reader member paths);
+    each is read from the archive by the worker that parses it.
     """
     
     SUPPORTED_MIME_TYPES = {
@@ -36,129 +66,336 @@ class DocumentProcessor:
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
     MAX_PAGES_PDF = 500
     MAX_SHEETS_XLSX = 100
+    PDF_SHARD_MIN_PAGES = 40  # Below this, pool startup costs more than sharding saves
+    XLSX_MAX_RETAINED_ROWS = 1000  # Per sheet, in streaming mode
+    FILE_TIME_BUDGET_SECONDS = 300
+    FILE_MEMORY_BUDGET_BYTES = 1024 * 1024 * 1024  # 1GB of RSS growth per file
+    BUDGET_CHECK_INTERVAL = 500  # Rows / DOCX body elements between budget checks
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, pdf_shard_workers: Optional[int] = None,
+                 cache: Optional[ParseCache] = None, xlsx_streaming: bool = True,
+                 time_budget_seconds: Optional[float] = None, memory_budget_bytes: Optional[int] = None,
+                 incremental: bool = True, organization_id: Optional[str] = None):
+        """
+        Args:
+            max_workers: Size of the process pool used by process_files.
+                None uses one worker per CPU; 1 parses files in-process.
+            pdf_shard_workers: Processes used to split a large PDF's pages.
+                None uses one per CPU; 1 disables page sharding.
+            cache: Optional parse cache; byte-identical files are served from it.
+            xlsx_streaming: Read spreadsheets row by row from a read-only workbook
+                (typed values, bounded rows per table) instead of loading them fully.
+            time_budget_seconds: Wall-clock limit per file; parsing stops and the
+                document is returned partial once exceeded. None uses
+                FILE_TIME_BUDGET_SECONDS, 0 disables the limit.
+            memory_budget_bytes: Resident memory growth allowed while parsing one
+                file. None uses FILE_MEMORY_BUDGET_BYTES, 0 disables the limit.
+            incremental: With a cache, re-parse only the PDF pages and (streamed)
+                XLSX sheets that changed since the last stored version of a
+                document with the same upload name; the rest are merged from it.
+            organization_id: Owner of the files; stored versions are only
+                reused within one organization, so incremental parsing is off
+                without it. Can also be set on the instance before parsing.
+        """
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.pdf_shard_workers = max(1, pdf_shard_workers or os.cpu_count() or 1)
+        self.cache = cache
+        self.xlsx_streaming = xlsx_streaming
+        self.time_budget_seconds = self.FILE_TIME_BUDGET_SECONDS if time_budget_seconds is None else time_budget_seconds
+        self.memory_budget_bytes = self.FILE_MEMORY_BUDGET_BYTES if memory_budget_bytes is None else memory_budget_bytes
+        self.incremental = incremental
+        self.organization_id = organization_id
         self.stats = {
             'files_processed': 0,
             'total_pages': 0,
             'total_tables': 0,
             'processing_time': 0.0,
-            'errors': []
+            'errors': [],
+            'file_timings_ms': {},
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'table_scan_skipped_pages': 0,
+            'partial_documents': 0,
+            'cache_raw_bytes': 0,
+            'cache_stored_bytes': 0,
+            'reused_pages': 0,
+            'reused_sheets': 0
         }
     
-    def process_files(self, file_paths: List[str]) -> List[ParsedDocument]:
+    def process_files(self, file_paths: List[str], probes: Optional[Dict[str, FileProbe]] = None) -> List[ParsedDocument]:
         """
         Process multiple files with comprehensive error handling.
         
+        Files are parsed concurrently in a process pool when more than one
+        worker is available; results are always returned in input order.
+        
         Args:
             file_paths: List of absolute file paths to process
+            probes: Optional FileProbes (e.g. from FileValidator.probe_file_paths)
+                so files validated upstream aren't stat'ed and sniffed again
             
         Returns:
             List of ParsedDocument objects with metadata and validation results
         """
+        processed_documents: List[Optional[ParsedDocument]] = [None] * len(file_paths)
+        for idx, document in self._iter_processed(file_paths, probes):
+            processed_documents[idx] = document
+        return [doc for doc in processed_documents if doc is not None]
+    
+    def process_files_iter(self, file_paths: List[str], probes: Optional[Dict[str, FileProbe]] = None) -> Iterator[ParsedDocument]:
+        """
+        Yield ParsedDocuments as each file finishes parsing.
+        
+        Documents arrive in completion order, not input order, so consumers can
+        start on fast files while slow ones are still being parsed.
+        """
+        for _, document in self._iter_processed(file_paths, probes):
+            yield document
+    
+    def _iter_processed(self, file_paths: List[str], probes: Optional[Dict[str, FileProbe]] = None) -> Iterator[tuple[int, ParsedDocument]]:
+        """Yield (input index, document) pairs in completion order and record total wall time."""
         start_time = time.perf_counter()
-        processed_documents = []
+        workers = min(self.max_workers, len(file_paths))
+        probes = probes or {}
         
-        for file_path in file_paths:
-            try:
-                document = self._process_single_file(file_path)
-                processed_documents.append(document)
-                self.stats['files_processed'] += 1
-                
-            except DocumentProcessingError as e:
-                # Create failed document with error details
-                failed_doc = self._create_failed_document(file_path, str(e))
-                processed_documents.append(failed_doc)
-                self.stats['errors'].append(f"{file_path}: {e}")
-                
-            except Exception as e:
-                # Unexpected error - log and create failed document
-                error_msg = f"Unexpected error processing {file_path}: {e}"
-                failed_doc = self._create_failed_document(file_path, error_msg)
-                processed_documents.append(failed_doc)
-                self.stats['errors'].append(error_msg)
-        
-        self.stats['processing_time'] = time.perf_counter() - start_time
-        return processed_documents
-    
-    def _process_single_file(self, file_path: str) -> ParsedDocument:
-        """Process a single file based on its type."""
-        # Validate file exists and get basic info
-        if not os.path.exists(file_path):
+        try:
+            if workers > 1:
+                yield from self._iter_processed_parallel(file_paths, workers, probes)
+            else:
+                for idx, file_path in enumerate(file_paths):
+                    yield idx, self._process_file_safely(file_path, probes.get(file_path))
+        finally:
+            self.stats['processing_time'] = time.perf_counter() - start_time
+    
+    def _iter_processed_parallel(self, file_paths: List[str], workers: int,
+                                 probes: Dict[str, FileProbe]) -> Iterator[tuple[int, ParsedDocument]]:
+        """Parse files in a process pool and merge each worker's stats into self.stats."""
+        options = self._worker_options()
+        
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable, parsing sequentially: {e}")
+            for idx, file_path in enumerate(file_paths):
+                yield idx, self._process_file_safely(file_path, probes.get(file_path))
+            return
+        
+        try:
+            futures = {
+                executor.submit(_process_file_in_worker, options, file_path, probes.get(file_path)): idx
+                for idx, file_path in enumerate(file_paths)
+            }
+            for future in as_completed(futures):
+                idx = futures[future]
+                file_path = file_paths[idx]
+                try:
+                    document, worker_stats = future.result()
+                    self._merge_stats(worker_stats)
+                except Exception as e:
+                    # Worker died (e.g. OOM-killed) - report it like any other failure
+                    error_msg = f"Unexpected error processing {file_path}: {e}"
+                    document = self._create_failed_document(file_path, error_msg)
+                    self.stats['errors'].append(error_msg)
+                    self.stats['files_processed'] += 1
+                yield idx, document
+        finally:
+            # Consumer may stop early; don't start files nobody will read
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _process_file_safely(self, file_path: str, probe: Optional[FileProbe] = None) -> ParsedDocument:
+        """Process one file, converting failures into failed documents and recording timing."""
+        start_time = time.perf_counter()
+        try:
+            document = self._process_single_file_cached(file_path, probe)
+            if document.validation_result.partial:
+                self.stats['partial_documents'] += 1
+                logger.warning(f"Parsing budget exceeded for {file_path}, returning partial content")
+            
+        except DocumentProcessingError as e:
+            # Create failed document with error details
+            document = self._create_failed_document(file_path, str(e))
+            self.stats['errors'].append(f"{file_path}: {e}")
+            
+        except Exception as e:
+            # Unexpected error - log and create failed document
+            error_msg = f"Unexpected error processing {file_path}: {e}"
+            document = self._create_failed_document(file_path, error_msg)
+            self.stats['errors'].append(error_msg)
+        
+        # Failed documents count too, so files_processed matches the documents returned
+        self.stats['files_processed'] += 1
+        self.stats['file_timings_ms'][file_path] = int((time.perf_counter() - start_time) * 1000)
+        return document
+    
+    def _process_single_file_cached(self, file_path: str, probe: Optional[FileProbe] = None) -> ParsedDocument:
+        """Serve a byte-identical file from the parse cache, parsing and storing it on a miss."""
+        if self.cache is None:
+            return self._process_single_file(file_path, probe)
+        
+        digest = probe.content_digest if probe is not None else None
+        key = self.cache.key_for(file_path, self._cache_namespace(), digest)
+        cached = self.cache.get(key, file_path)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            self.stats['total_pages'] += cached.metadata.details.get('page_count', 0)
+            self.stats['total_tables'] += len(cached.tables)
+            return cached
+        
+        self.stats['cache_misses'] += 1
+        document = self._process_single_file(file_path, probe)
+        # A budget-truncated parse depends on load, not just on the bytes
+        if not document.validation_result.partial:
+            self._record_cache_write(*self.cache.set(key, document))
+        return document
+    
+    def _record_cache_write(self, raw_bytes: int, stored_bytes: int) -> None:
+        self.stats['cache_raw_bytes'] += raw_bytes
+        self.stats['cache_stored_bytes'] += stored_bytes
+    
+    def _cache_namespace(self) -> str:
+        """Cache key prefix; must change whenever processor options change the parsed output."""
+        return "traditional:xlsx_stream" if self.xlsx_streaming else "traditional"
+    
+    def _worker_options(self) -> Dict[str, Any]:
+        """Constructor kwargs for the per-file processor built inside each pool worker."""
+        # Files are already spread across processes, so don't shard pages as well
+        return {
+            'max_workers': 1,
+            'pdf_shard_workers': 1,
+            'cache': self.cache,
+            'xlsx_streaming': self.xlsx_streaming,
+            'time_budget_seconds': self.time_budget_seconds,
+            'memory_budget_bytes': self.memory_budget_bytes,
+            'incremental': self.incremental,
+            'organization_id': self.organization_id
+        }
+    
+    def _incremental_enabled(self) -> bool:
+        return self.incremental and self.cache is not None and self.organization_id is not None
+    
+    def _parts_key(self, file_path: str) -> str:
+        return self.cache.parts_key_for(str(self.organization_id), document_identity(file_path), self._cache_namespace())
+    
+    def _load_parts(self, file_path: str) -> Dict[str, Dict[str, Any]]:
+        """Parsed parts of the last stored version of this document, by fingerprint."""
+        return self.cache.get_parts(self._parts_key(file_path))
+    
+    def _store_parts(self, file_path: str, parts: Dict[str, Dict[str, Any]]) -> None:
+        """Make parts the stored version of this document for the next incremental parse."""
+        self._record_cache_write(*self.cache.set_parts(self._parts_key(file_path), parts))
+    
+    def _new_budget(self) -> ParsingBudget:
+        """Start the per-file time and memory budget."""
+        return ParsingBudget(self.time_budget_seconds or None, self.memory_budget_bytes or None)
+    
+    def _merge_stats(self, other: Dict[str, Any]) -> None:
+        """Fold a worker's stats dict into self.stats (counters add, lists extend, dicts update)."""
+        for key, value in other.items():
+            if key == 'processing_time':
+                continue  # Wall-clock time is measured by the caller of process_files
+            current = self.stats.get(key)
+            if isinstance(value, list):
+                self.stats.setdefault(key, []).extend(value)
+            elif isinstance(value, dict):
+                self.stats.setdefault(key, {}).update(value)
+            elif isinstance(value, (int, float)) and isinstance(current, (int, float)):
+                self.stats[key] = current + value
+            else:
+                self.stats[key] = value
+    
+    def _process_single_file(self, file_path: str, probe: Optional[FileProbe] = None) -> ParsedDocument:
+        """Process a single file based on its (content-sniffed) type."""
+        # Reuse the validation probe when available: one stat and one header read per file
+        probe = probe or FileProbe.probe(file_path)
+        if not probe.exists:
             raise DocumentProcessingError(f"File not found: {file_path}")
         
-        file_size = os.path.getsize(file_path)
+        file_size = probe.size
         if file_size > self.MAX_FILE_SIZE:
             raise DocumentProcessingError(f"File too large: {file_size} bytes (max: {self.MAX_FILE_SIZE})")
         
         # Determine file type
-        mime_type, _ = mimetypes.guess_type(file_path)
+        mime_type = probe.mime_type
         file_type = self.SUPPORTED_MIME_TYPES.get(mime_type or "")
         
         if not file_type:
             raise DocumentProcessingError(f"Unsupported file type: {mime_type}")
         
+        # Bundle members are decompressed into memory; regular files are opened by path
+        try:
+            source = open_document_source(file_path, self.MAX_FILE_SIZE)
+        except (ArchiveError, OSError) as e:
+            raise DocumentProcessingError(f"Cannot read archive member: {e}")
+        
         # Process based on file type
         if file_type == 'pdf':
-            return self._process_pdf(file_path)
+            return self._process_pdf(file_path, probe, source)
         elif file_type == 'docx':
-            return self._process_docx(file_path)
+            return self._process_docx(file_path, probe, source)
         elif file_type == 'xlsx':
-            return self._process_xlsx(file_path)
+            return self._process_xlsx(file_path, probe, source)
         elif file_type == 'txt':
-            return self._process_txt(file_path)
+            return self._process_txt(file_path, probe, source)
         else:
             raise DocumentProcessingError(f"Handler not implemented for file type: {file_type}")
     
-    def _process_pdf(self, file_path: str) -> ParsedDocument:
+    def _process_pdf(self, file_path: str, probe: FileProbe, source: Union[str, BinaryIO]) -> ParsedDocument:
         """Extract text, tables, and metadata from PDF files."""
         start_time = time.perf_counter()
-        content_parts = []
-        tables = []
+        budget = self._new_budget()
         page_count = 0
+        shard_count = 1
+        fingerprints: Dict[int, str] = {}
+        reused: Dict[int, Dict[str, Any]] = {}
         
         try:
-            with pdfplumber.open(file_path) as pdf:
+            with pdfplumber.open(source) as pdf:
                 page_count = len(pdf.pages)
                 
                 if page_count > self.MAX_PAGES_PDF:
                     raise DocumentProcessingError(f"PDF too large: {page_count} pages (max: {self.MAX_PAGES_PDF})")
                 
-                for page_num, page in enumerate(pdf.pages, 1):
-                    # Extract text
-                    page_text = page.extract_text()
-                    if page_text:
-                        content_parts.append(f"--- Page {page_num} ---\n{page_text.strip()}")
-                    
-                    # Extract tables
-                    page_tables = page.extract_tables()
-                    for table_idx, table in enumerate(page_tables):
-                        if table and len(table) > 1:  # Skip empty or single-row tables
-                            tables.append({
-                                'page': page_num,
-                                'table_index': table_idx,
-                                'headers': table[0] if table else [],
-                                'rows': table[1:] if len(table) > 1 else [],
-                                'row_count': len(table) - 1
-                            })
+                if self._incremental_enabled():
+                    fingerprints, reused = self._match_pdf_pages(file_path, pdf.pages)
+                pending = [page for page in pdf.pages if page.page_number not in reused]
+                use_shards = self.pdf_shard_workers > 1 and len(pending) >= self.PDF_SHARD_MIN_PAGES
+                if not use_shards:
+                    extracted = _extract_pdf_pages(pending, budget)
+                pending_numbers = [page.page_number for page in pending]
+            
+            # Shards reopen the file in their own processes, so run them after closing ours
+            if use_shards:
+                extracted, shard_count = self._extract_pdf_sharded(file_path, pending_numbers, budget)
                 
         except Exception as e:
             raise DocumentProcessingError(f"PDF processing failed: {e}")
         
+        page_records = {**reused, **{record['page']: record for record in extracted['pages']}}
+        content_parts, tables = _assemble_pdf_pages(page_records)
+        pages_parsed = extracted['pages_parsed'] + len(reused)
+        table_scan_skipped_pages = sum(record['table_scan_skipped'] for record in extracted['pages'])
+        stopped_reason = extracted['stopped_reason']
+        if fingerprints and not stopped_reason:
+            self._store_parts(file_path, {
+                fingerprints[number]: record for number, record in page_records.items()
+                if fingerprints.get(number) is not None
+            })
         processing_time = time.perf_counter() - start_time
         content = "\n\n".join(content_parts)
         
         # Validate extraction quality and build details
+        if stopped_reason:
+            stopped_reason += f" after {pages_parsed} of {page_count} pages"
         validation = self._validate_extraction(content, tables, {
-            "file_size": os.path.getsize(file_path),
+            "file_size": probe.size,
             "processing_time_ms": int(processing_time * 1000),
             "page_count": page_count,
             "table_count": len(tables),
             "extracted_text_length": len(content)
-        })
+        }, partial_reason=stopped_reason)
         metadata = DocumentMetadata(
             file_path=file_path,
-            file_size=os.path.getsize(file_path),
+            file_size=probe.size,
             file_type="pdf",
             quality_score=validation.quality_score,
             errors=validation.errors,
@@ -167,11 +404,17 @@ class DocumentProcessor:
                 "page_count": page_count,
                 "table_count": len(tables),
                 "processing_time_ms": int(processing_time * 1000),
-                "extracted_text_length": len(content)
+                "extracted_text_length": len(content),
+                "page_shards": shard_count,
+                "table_scan_skipped_pages": table_scan_skipped_pages,
+                "pages_parsed": pages_parsed,
+                "pages_reused": len(reused)
             },
             processing_method="traditional"
         )
         self.stats['total_pages'] += page_count
+        self.stats['table_scan_skipped_pages'] += table_scan_skipped_pages
+        self.stats['reused_pages'] += len(reused)
         self.stats['total_tables'] += len(tables)
         return ParsedDocument(
             file_path=file_path,
@@ -182,41 +425,59 @@ class DocumentProcessor:
             validation_result=validation
         )
     
-    def _process_docx(self, file_path: str) -> ParsedDocument:
+    def _match_pdf_pages(self, file_path: str, pages) -> tuple[Dict[int, str], Dict[int, Dict[str, Any]]]:
+        """Fingerprint every page; return fingerprints and the stored records of unchanged pages, by page number."""
+        try:
+            fingerprints = {page.page_number: pdf_page_fingerprint(page) for page in pages}
+        except Exception as e:
+            logger.debug(f"PDF page fingerprinting failed for {file_path} ({e}), parsing every page")
+            return {}, {}
+        previous = self._load_parts(file_path)
+        # Records are stored without page numbers; pages may have moved since.
+        # Pages without a fingerprint (too deeply nested to hash) are always parsed
+        reused = {
+            number: {**previous[fingerprint], 'page': number}
+            for number, fingerprint in fingerprints.items() if fingerprint is not None and fingerprint in previous
+        }
+        return fingerprints, reused
+    
+    def _extract_pdf_sharded(self, file_path: str, page_numbers: List[int], budget: ParsingBudget) -> tuple[Dict[str, Any], int]:
+        """Split the pages across worker processes and reassemble results in page order."""
+        workers = min(self.pdf_shard_workers, len(page_numbers))
+        # Twice as many shards as workers so one slow (table-heavy) shard doesn't leave the rest idle
+        shard_count = min(workers * 2, len(page_numbers))
+        shard_size = -(-len(page_numbers) // shard_count)
+        shards = [page_numbers[i:i + shard_size] for i in range(0, len(page_numbers), shard_size)]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shard_results = list(executor.map(
+                _extract_pdf_page_numbers,
+                [file_path] * len(shards),
+                shards,
+                [budget] * len(shards)
+            ))
+        
+        extracted: Dict[str, Any] = {'pages': [], 'pages_parsed': 0, 'stopped_reason': None}
+        for shard in shard_results:
+            extracted['pages'].extend(shard['pages'])
+            extracted['pages_parsed'] += shard['pages_parsed']
+            extracted['stopped_reason'] = extracted['stopped_reason'] or shard['stopped_reason']
+        return extracted, len(shards)
+    
+    def _process_docx(self, file_path: str, probe: FileProbe, source: Union[str, BinaryIO]) -> ParsedDocument:
         """Extract structured content from Word documents."""
         start_time = time.perf_counter()
-        content_parts = []
-        tables = []
+        budget = self._new_budget()
+        should_stop = _every(self.BUDGET_CHECK_INTERVAL, budget.exceeded)
         
         try:
-            doc = DocxDocument(file_path)
-            
-            # Extract paragraphs and maintain structure
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if text:
-                    # Preserve heading styles if available
-                    style = para.style.name if para.style else "Normal"
-                    if style and "Heading" in style:
-                        content_parts.append(f"\n## {text}\n")
-                    else:
-                        content_parts.append(text)
-            
-            # Extract tables
-            for table_idx, table in enumerate(doc.tables):
-                table_data = []
-                for row in table.rows:
-                    row_data = [cell.text.strip() for cell in row.cells]
-                    table_data.append(row_data)
-                
-                if table_data:
-                    tables.append({
-                        'table_index': table_idx,
-                        'headers': table_data[0] if table_data else [],
-                        'rows': table_data[1:] if len(table_data) > 1 else [],
-                        'row_count': len(table_data) - 1
-                    })
-                    
+            try:
+                content_parts, tables = read_docx(source, should_stop)
+                parser = "lxml"
+            except DocxFastPathUnsupported as e:
+                logger.debug(f"DOCX fast path unavailable for {file_path} ({e}), using python-docx")
+                content_parts, tables = _read_docx_object_model(source, should_stop)
+                parser = "python-docx"
         except Exception as e:
             raise DocumentProcessingError(f"DOCX processing failed: {e}")
         
@@ -225,15 +486,15 @@ class DocumentProcessor:
         
         # Validate extraction quality and build details
         validation = self._validate_extraction(content, tables, {
-            "file_size": os.path.getsize(file_path),
+            "file_size": probe.size,
             "processing_time_ms": int(processing_time * 1000),
             "page_count": 1,
             "table_count": len(tables),
             "extracted_text_length": len(content)
-        })
+        }, partial_reason=budget.exceeded_reason)
         metadata = DocumentMetadata(
             file_path=file_path,
-            file_size=os.path.getsize(file_path),
+            file_size=probe.size,
             file_type="docx",
             quality_score=validation.quality_score,
             errors=validation.errors,
@@ -242,7 +503,8 @@ class DocumentProcessor:
                 "page_count": 1,
                 "table_count": len(tables),
                 "processing_time_ms": int(processing_time * 1000),
-                "extracted_text_length": len(content)
+                "extracted_text_length": len(content),
+                "parser": parser
             },
             processing_method="traditional"
         )
@@ -257,52 +519,17 @@ class DocumentProcessor:
             validation_result=validation
         )
     
-    def _process_xlsx(self, file_path: str) -> ParsedDocument:
+    def _process_xlsx(self, file_path: str, probe: FileProbe, source: Union[str, BinaryIO]) -> ParsedDocument:
         """Parse spreadsheet data with sheet detection."""
         start_time = time.perf_counter()
-        content_parts = []
-        tables = []
+        budget = self._new_budget()
         
         try:
-            workbook = load_workbook(file_path, data_only=True)
-            sheet_count = len(workbook.worksheets)
-            
-            if sheet_count > self.MAX_SHEETS_XLSX:
-                raise DocumentProcessingError(f"Excel file too large: {sheet_count} sheets (max: {self.MAX_SHEETS_XLSX})")
-            
-            for sheet_idx, worksheet in enumerate(workbook.worksheets):
-                sheet_name = worksheet.title
-                content_parts.append(f"\n--- Sheet: {sheet_name} ---")
-                
-                # Get all data from sheet
-                sheet_data = []
-                for row in worksheet.iter_rows(values_only=True):
-                    # Filter out completely empty rows
-                    if any(cell is not None and str(cell).strip() for cell in row):
-                        sheet_data.append([str(cell) if cell is not None else "" for cell in row])
-                
-                if sheet_data:
-                    # Create table representation
-                    tables.append({
-                        'sheet_name': sheet_name,
-                        'sheet_index': sheet_idx,
-                        'headers': sheet_data[0] if sheet_data else [],
-                        'rows': sheet_data[1:] if len(sheet_data) > 1 else [],
-                        'row_count': len(sheet_data) - 1,
-                        'col_count': len(sheet_data[0]) if sheet_data else 0
-                    })
-                    
-                    # Add summary to content
-                    row_count = len(sheet_data)
-                    col_count = len(sheet_data[0]) if sheet_data else 0
-                    content_parts.append(f"Data: {row_count} rows × {col_count} columns")
-                    
-                    # Add first few rows as sample
-                    if len(sheet_data) > 0:
-                        content_parts.append("Sample data:")
-                        for i, row in enumerate(sheet_data[:5]):  # First 5 rows
-                            content_parts.append(f"  Row {i+1}: {', '.join(row[:10])}")  # First 10 columns
-                            
+            if self.xlsx_streaming:
+                content_parts, tables, sheet_count, sheets_reused = self._read_xlsx_streaming(file_path, source, budget)
+            else:
+                content_parts, tables, sheet_count = self._read_xlsx_full(source, budget)
+                sheets_reused = 0
         except Exception as e:
             raise DocumentProcessingError(f"XLSX processing failed: {e}")
         
@@ -311,15 +538,15 @@ class DocumentProcessor:
         
         # Validate extraction quality and build details
         validation = self._validate_extraction(content, tables, {
-            "file_size": os.path.getsize(file_path),
+            "file_size": probe.size,
             "processing_time_ms": int(processing_time * 1000),
             "page_count": sheet_count,
             "table_count": len(tables),
             "extracted_text_length": len(content)
-        })
+        }, partial_reason=budget.exceeded_reason)
         metadata = DocumentMetadata(
             file_path=file_path,
-            file_size=os.path.getsize(file_path),
+            file_size=probe.size,
             file_type="xlsx",
             quality_score=validation.quality_score,
             errors=validation.errors,
@@ -328,11 +555,15 @@ class DocumentProcessor:
                 "page_count": sheet_count,
                 "table_count": len(tables),
                 "processing_time_ms": int(processing_time * 1000),
-                "extracted_text_length": len(content)
+                "extracted_text_length": len(content),
+                "streaming": self.xlsx_streaming,
+                "peak_rss_bytes": _peak_rss_bytes(),
+                "sheets_reused": sheets_reused
             },
             processing_method="traditional"
         )
         self.stats['total_pages'] += sheet_count
+        self.stats['reused_sheets'] += sheets_reused
         self.stats['total_tables'] += len(tables)
         return ParsedDocument(
             file_path=file_path,
@@ -343,38 +574,183 @@ class DocumentProcessor:
             validation_result=validation
         )
     
-    def _process_txt(self, file_path: str) -> ParsedDocument:
+    def _read_xlsx_full(self, source: Union[str, BinaryIO], budget: ParsingBudget) -> tuple[List[str], List[Dict[str, Any]], int]:
+        """Load the whole workbook and stringify every non-empty row of every sheet."""
+        content_parts = []
+        tables = []
+        
+        workbook = load_workbook(source, data_only=True)
+        sheet_count = len(workbook.worksheets)
+            
+        if sheet_count > self.MAX_SHEETS_XLSX:
+            raise DocumentProcessingError(f"Excel file too large: {sheet_count} sheets (max: {self.MAX_SHEETS_XLSX})")
+            
+        for sheet_idx, worksheet in enumerate(workbook.worksheets):
+            if budget.exceeded():
+                break
+            sheet_name = worksheet.title
+            content_parts.append(f"\n--- Sheet: {sheet_name} ---")
+                
+            # Get all data from sheet
+            sheet_data = []
+            for row_idx, row in enumerate(worksheet.iter_rows(values_only=True)):
+                if row_idx % self.BUDGET_CHECK_INTERVAL == 0 and budget.exceeded():
+                    break
+                # Filter out completely empty rows
+                if any(cell is not None and str(cell).strip() for cell in row):
+                    sheet_data.append([str(cell) if cell is not None else "" for cell in row])
+                
+            if sheet_data:
+                # Create table representation
+                tables.append({
+                    'sheet_name': sheet_name,
+                    'sheet_index': sheet_idx,
+                    'headers': sheet_data[0] if sheet_data else [],
+                    'rows': sheet_data[1:] if len(sheet_data) > 1 else [],
+                    'row_count': len(sheet_data) - 1,
+                    'col_count': len(sheet_data[0]) if sheet_data else 0
+                })
+                    
+                # Add summary to content
+                row_count = len(sheet_data)
+                col_count = len(sheet_data[0]) if sheet_data else 0
+                content_parts.append(f"Data: {row_count} rows × {col_count} columns")
+                    
+                # Add first few rows as sample
+                if len(sheet_data) > 0:
+                    content_parts.append("Sample data:")
+                    for i, row in enumerate(sheet_data[:5]):  # First 5 rows
+                        content_parts.append(f"  Row {i+1}: {', '.join(row[:10])}")  # First 10 columns
+        
+        return content_parts, tables, sheet_count
+    
+    def _read_xlsx_streaming(self, file_path: str, source: Union[str, BinaryIO],
+                             budget: ParsingBudget) -> tuple[List[str], List[Dict[str, Any]], int, int]:
+        """
+        Stream rows from a read-only workbook, keeping typed cell values.
+        
+        Only the first XLSX_MAX_RETAINED_ROWS data rows per sheet are kept in
+        the table; row_count still reflects every non-empty row. In incremental
+        mode sheets unchanged since the stored version are merged from it
+        without reading their rows; the last element is their count.
+        """
+        content_parts = []
+        tables = []
+        fingerprints: Dict[str, str] = {}
+        if self._incremental_enabled():
+            try:
+                fingerprints = xlsx_sheet_fingerprints(source)
+            except Exception as e:
+                logger.debug(f"XLSX sheet fingerprinting failed for {file_path} ({e}), parsing every sheet")
+        previous = self._load_parts(file_path) if fingerprints else {}
+        parts: Dict[str, Dict[str, Any]] = {}
+        sheets_reused = 0
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        
+        try:
+            sheet_count = len(workbook.worksheets)
+            
+            if sheet_count > self.MAX_SHEETS_XLSX:
+                raise DocumentProcessingError(f"Excel file too large: {sheet_count} sheets (max: {self.MAX_SHEETS_XLSX})")
+            
+            for sheet_idx, worksheet in enumerate(workbook.worksheets):
+                if budget.exceeded():
+                    break
+                fingerprint = fingerprints.get(worksheet.title)
+                if fingerprint in previous:
+                    sheet = previous[fingerprint]
+                    sheets_reused += 1
+                else:
+                    sheet = self._read_xlsx_sheet_streaming(worksheet, budget)
+                content_parts.extend(sheet['content_parts'])
+                if sheet['table'] is not None:
+                    # Sheets may have been reordered since the stored version
+                    tables.append({**sheet['table'], 'sheet_index': sheet_idx})
+                if fingerprint is not None:
+                    parts[fingerprint] = sheet
+        finally:
+            # Read-only workbooks hold the file open until closed
+            workbook.close()
+        
+        if fingerprints and budget.exceeded_reason is None:
+            self._store_parts(file_path, parts)
+        return content_parts, tables, sheet_count, sheets_reused
+    
+    def _read_xlsx_sheet_streaming(self, worksheet, budget: ParsingBudget) -> Dict[str, Any]:
+        """Content lines and table (None for an empty sheet) of one read-only worksheet."""
+        sheet_name = worksheet.title
+        content_parts = [f"\n--- Sheet: {sheet_name} ---"]
+        
+        headers: Optional[List[Any]] = None
+        rows: List[List[Any]] = []
+        sample: List[List[Any]] = []
+        row_count = 0
+        
+        for row_idx, row in enumerate(worksheet.iter_rows(values_only=True)):
+            if row_idx % self.BUDGET_CHECK_INTERVAL == 0 and budget.exceeded():
+                break
+            # Filter out completely empty rows
+            if not any(cell is not None and (not isinstance(cell, str) or cell.strip()) for cell in row):
+                continue
+            values = ["" if cell is None else cell for cell in row]
+            if len(sample) < 5:
+                sample.append(values)
+            if headers is None:
+                headers = values
+                continue
+            row_count += 1
+            if len(rows) < self.XLSX_MAX_RETAINED_ROWS:
+                rows.append(values)
+        
+        if headers is None:
+            return {'content_parts': content_parts, 'table': None}
+        col_count = len(headers)
+        table = {
+            'sheet_name': sheet_name,
+            'sheet_index': None,
+            'headers': headers,
+            'rows': rows,
+            'row_count': row_count,
+            'col_count': col_count,
+            'rows_truncated': row_count > len(rows) or budget.exceeded_reason is not None
+        }
+        
+        # Add summary to content
+        content_parts.append(f"Data: {row_count + 1} rows × {col_count} columns")
+        content_parts.append("Sample data:")
+        for i, values in enumerate(sample):
+            content_parts.append(f"  Row {i+1}: {', '.join(str(cell) for cell in values[:10])}")
+        return {'content_parts': content_parts, 'table': table}
+    
+    def _process_txt(self, file_path: str, probe: FileProbe, source: Union[str, io.BytesIO]) -> ParsedDocument:
         """Process plain text files."""
         start_time = time.perf_counter()
+        budget = self._new_budget()
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            try:
-                with open(file_path, 'r', encoding='latin-1') as f:
-                    content = f.read()
-            except Exception as e:
-                raise DocumentProcessingError(f"Text file encoding error: {e}")
+            content, encoding = _read_text_file(source, probe.size, budget.exceeded)
+        except (UnicodeDecodeError, LookupError) as e:
+            raise DocumentProcessingError(f"Text file encoding error: {e}")
         except Exception as e:
             raise DocumentProcessingError(f"Text file processing failed: {e}")
         
         processing_time = time.perf_counter() - start_time
+        line_count = content.count('\n') + 1
+        self.stats['total_pages'] += 1
         
         # Validate extraction quality and build details
         validation = self._validate_extraction(content, [], {
-            "file_size": os.path.getsize(file_path),
+            "file_size": probe.size,
             "processing_time_ms": int(processing_time * 1000),
             "page_count": 1,
             "table_count": 0,
             "extracted_text_length": len(content),
-            "encoding": "utf-8",
-            "line_count": content.count('\n') + 1
-        })
+            "encoding": encoding,
+            "line_count": line_count
+        }, partial_reason=budget.exceeded_reason)
         metadata = DocumentMetadata(
             file_path=file_path,
-            file_size=os.path.getsize(file_path),
+            file_size=probe.size,
             file_type="txt",
             quality_score=validation.quality_score,
             errors=validation.errors,
@@ -384,8 +760,8 @@ class DocumentProcessor:
                 "table_count": 0,
                 "processing_time_ms": int(processing_time * 1000),
                 "extracted_text_length": len(content),
-                "encoding": "utf-8",
-                "line_count": content.count('\n') + 1
+                "encoding": encoding,
+                "line_count": line_count
             },
             processing_method="traditional"
         )
@@ -398,29 +774,33 @@ class DocumentProcessor:
             validation_result=validation
         )
     
-    def _validate_extraction(self, content: str, tables: List[Dict], meta: dict) -> DocumentParsingValidationResult:
-        """Validate the quality of extraction results."""
+    def _validate_extraction(self, content: str, tables: List[Dict], meta: dict,
+                             partial_reason: Optional[str] = None) -> DocumentParsingValidationResult:
+        """Validate the quality of extraction results; partial_reason marks a budget-truncated parse."""
         errors = []
         warnings = []
         quality_score = 1.0
         file_size = meta.get("file_size", 1)
         processing_time_ms = meta.get("processing_time_ms", 0)
         file_type = meta.get("file_type", None)
+        metrics = content_metrics(content)
         # Content validation
-        if not content.strip():
+        if metrics['stripped_length'] == 0:
             errors.append("No text content extracted")
             quality_score *= 0.0
-        elif len(content.strip()) < 50:
+        elif metrics['stripped_length'] < 50:
             warnings.append("Very little text content extracted")
             quality_score *= 0.7
         # File size vs content ratio check
-        content_ratio = len(content) / max(file_size, 1)
+        content_ratio = metrics['content_length'] / max(file_size, 1)
         if content_ratio < 0.001:  # Less than 0.1% conversion rate
             warnings.append("Low text extraction ratio - file may contain mostly images or formatting")
             quality_score *= 0.8
         # Processing time check
         if processing_time_ms > 30000:  # 30 seconds
             warnings.append("Processing took longer than expected")
+        if partial_reason:
+            warnings.append(f"Parsing stopped early ({partial_reason}); content is partial")
         # Table validation
         if file_type in ['xlsx', 'pdf'] and not tables:
             warnings.append("No tables found - this may be expected or indicate parsing issues")
@@ -431,12 +811,13 @@ class DocumentProcessor:
             errors=errors,
             warnings=warnings,
             details={
-                "content_length": len(content),
+                **metrics,
                 "content_ratio": content_ratio,
                 **meta,
                 "table_count": len(tables)
             },
-            processing_method="traditional"
+            processing_method="traditional",
+            partial=partial_reason is not None
         )
     
     def _create_failed_document(self, file_path: str, error_message: str) -> ParsedDocument:
@@ -471,8 +852,218 @@ class DocumentProcessor:
     
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get processing statistics for monitoring and debugging."""
+        cache_lookups = self.stats['cache_hits'] + self.stats['cache_misses']
         return {
             **self.stats,
             'success_rate': (self.stats['files_processed'] - len(self.stats['errors'])) / max(self.stats['files_processed'], 1),
-            'avg_processing_time': self.stats['processing_time'] / max(self.stats['files_processed'], 1) if self.stats['files_processed'] > 0 else 0
+            'avg_processing_time': self.stats['processing_time'] / max(self.stats['files_processed'], 1) if self.stats['files_processed'] > 0 else 0,
+            'cache_hit_rate': self.stats['cache_hits'] / cache_lookups if cache_lookups else 0.0,
+            'cache_compression': compression_summary(self.stats['cache_raw_bytes'], self.stats['cache_stored_bytes'])
+        }
+
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """High-water mark of this process's resident memory, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _page_may_contain_table(page) -> bool:
+    """
+    Cheap pre-check before page.extract_tables().
+    
+    With the default ("lines") table settings pdfplumber builds cells only from
+    ruling edges, which come from line, rect and curve objects. A page needs at
+    least one horizontal and one vertical rule (a rect provides both) to form a
+    cell, so pure-prose pages can skip the expensive table search.
+    """
+    objects = page.objects
+    if objects.get('rect') or objects.get('curve'):
+        return True
+    lines = objects.get('line', [])
+    has_horizontal = any(abs(line['top'] - line['bottom']) < 1 for line in lines)
+    has_vertical = any(abs(line['x0'] - line['x1']) < 1 for line in lines)
+    return has_horizontal and has_vertical
+
+
+def _detect_text_encoding(sample: bytes) -> str:
+    """Pick a codec for a text file from a sample of its first bytes."""
+    for bom, encoding in TEXT_BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # final=False tolerates a multi-byte character cut off at the end of the sample
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    best = charset_normalizer.from_bytes(sample).best()
+    return best.encoding if best else 'latin-1'
+
+
+def _every(interval: int, check: Callable[[], bool]) -> Callable[[], bool]:
+    """Wrap a check so it only runs on every interval-th call; it stays True once it has fired."""
+    calls = 0
+    fired = False
+    
+    def throttled() -> bool:
+        nonlocal calls, fired
+        calls += 1
+        if not fired and calls % interval == 0:
+            fired = check()
+        return fired
+    return throttled
+
+
+def _read_text_file(source: Union[str, io.BytesIO], size: int,
+                    should_stop: Optional[Callable[[], bool]] = None) -> tuple[str, str]:
+    """
+    Decode a text file through a memory map in bounded chunks.
+    
+    The file is mapped once, the encoding is detected from its first
+    TEXT_SAMPLE_SIZE bytes, and only one chunk of raw bytes is copied out at a
+    time. Returns (content, encoding) with newlines normalised like open('r');
+    should_stop is checked between chunks and truncates the content. An
+    in-memory source (bundle member) is decoded the same way from its buffer.
+    """
+    if size == 0:
+        return "", "utf-8"
+    if not isinstance(source, str):
+        return _decode_text(source.getvalue(), should_stop)
+    with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return _decode_text(mapped, should_stop)
+
+
+def _decode_text(mapped: Union[mmap.mmap, bytes], should_stop: Optional[Callable[[], bool]] = None) -> tuple[str, str]:
+    encoding = _detect_text_encoding(mapped[:TEXT_SAMPLE_SIZE])
+    try:
+        return _decode_mapped(mapped, encoding, should_stop), encoding
+    except UnicodeDecodeError:
+        # The sample was clean but later bytes aren't; latin-1 decodes anything
+        return _decode_mapped(mapped, 'latin-1', should_stop), 'latin-1'
+
+
+def _decode_mapped(mapped: Union[mmap.mmap, bytes], encoding: str, should_stop: Optional[Callable[[], bool]] = None) -> str:
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    parts = []
+    for offset in range(0, len(mapped), TEXT_DECODE_CHUNK_SIZE):
+        if should_stop and should_stop():
+            return "".join(parts)
+        parts.append(decoder.decode(mapped[offset:offset + TEXT_DECODE_CHUNK_SIZE]))
+    parts.append(decoder.decode(b'', final=True))
+    return "".join(parts)
+
+
+def _read_docx_object_model(source: Union[str, BinaryIO], should_stop: Optional[Callable[[], bool]] = None
+                            ) -> tuple[List[str], List[Dict[str, Any]]]:
+    """Extract paragraphs and tables through python-docx; the reference behaviour for read_docx."""
+    content_parts = []
+    tables = []
+    doc = DocxDocument(source)
+    
+    # Extract paragraphs and maintain structure
+    for para in doc.paragraphs:
+        if should_stop and should_stop():
+            return content_parts, tables
+        text = para.text.strip()
+        if text:
+            # Preserve heading styles if available
+            style = para.style.name if para.style else "Normal"
+            if style and "Heading" in style:
+                content_parts.append(f"\n## {text}\n")
+            else:
+                content_parts.append(text)
+    
+    # Extract tables
+    for table_idx, table in enumerate(doc.tables):
+        table_data = []
+        for row in table.rows:
+            if should_stop and should_stop():
+                break
+            row_data = [cell.text.strip() for cell in row.cells]
+            table_data.append(row_data)
+        
+        if table_data:
+            tables.append({
+                'table_index': table_idx,
+                'headers': table_data[0] if table_data else [],
+                'rows': table_data[1:] if len(table_data) > 1 else [],
+                'row_count': len(table_data) - 1
+            })
+    return content_parts, tables
+
+
+def _extract_pdf_pages(pages, budget: Optional[ParsingBudget] = None) -> Dict[str, Any]:
+    """
+    Extract page text and tables from an iterable of pdfplumber pages, stopping when the budget runs out.
+    
+    Returns one record per parsed page ({'page', 'text', 'tables', 'table_scan_skipped'});
+    _assemble_pdf_pages turns records into document content.
+    """
+    records = []
+    
+    for page in pages:
+        if budget and budget.exceeded():
+            break
+        page_text = page.extract_text()
+        record = {
+            'page': page.page_number,
+            'text': page_text.strip() if page_text else None,
+            'tables': [],
+            'table_scan_skipped': False
         }
+        records.append(record)
+        
+        # Extract tables
+        if not _page_may_contain_table(page):
+            record['table_scan_skipped'] = True
+            continue
+        page_tables = page.extract_tables()
+        for table_idx, table in enumerate(page_tables):
+            if table and len(table) > 1:  # Skip empty or single-row tables
+                record['tables'].append({
+                    'page': page.page_number,
+                    'table_index': table_idx,
+                    'headers': table[0] if table else [],
+                    'rows': table[1:] if len(table) > 1 else [],
+                    'row_count': len(table) - 1
+                })
+    
+    return {
+        'pages': records,
+        'pages_parsed': len(records),
+        'stopped_reason': budget.exceeded_reason if budget else None
+    }
+
+
+def _assemble_pdf_pages(records: Dict[int, Dict[str, Any]]) -> tuple[List[str], List[Dict[str, Any]]]:
+    """Content parts and tables of page records, in page order."""
+    content_parts = []
+    tables = []
+    for page_num in sorted(records):
+        record = records[page_num]
+        if record['text'] is not None:
+            content_parts.append(f"--- Page {page_num} ---\n{record['text']}")
+        tables.extend({**table, 'page': page_num} for table in record['tables'])
+    return content_parts, tables
+
+
+def _extract_pdf_page_numbers(file_path: str, page_numbers: List[int],
+                              budget: Optional[ParsingBudget] = None) -> Dict[str, Any]:
+    """Process-pool entry point: extract the given (1-based) pages."""
+    with pdfplumber.open(open_document_source(file_path, DocumentProcessor.MAX_FILE_SIZE), pages=page_numbers) as pdf:
+        return _extract_pdf_pages(pdf.pages, budget.rebased() if budget else None)
+
+
+def _process_file_in_worker(options: Dict[str, Any], file_path: str,
+                            probe: Optional[FileProbe]) -> tuple[ParsedDocument, Dict[str, Any]]:
+    """Process-pool entry point: parse one file with a fresh processor and return its stats."""
+    processor = DocumentProcessor(**options)
+    document = processor._process_file_safely(file_path, probe)
+    return document, processor.stats
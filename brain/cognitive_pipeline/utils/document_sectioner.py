@@ -0,0 +1,112 @@
+# brain/cognitive_pipeline/utils/document_sectioner.py
+
+"""
+Split ParsedDocument.content into sections with offsets and provenance.
+
+The parsers mark structure inline: "--- Page N ---" for PDF pages,
+"--- Sheet: name ---" for spreadsheet sheets and "## heading" for DOCX
+headings. Each marker opens a new section; sections longer than max_chars
+are cut at paragraph, line or word boundaries. Section IDs are derived from
+the heading path (sheet and heading) and the section text, so re-parsing the
+same content yields the same IDs. Page numbers are kept as metadata only:
+inserting a page must not change the IDs of every later section.
+"""
+
+import bisect
+import re
+from typing import List, Optional
+
+import xxhash
+
+from brain.cognitive_pipeline.schema import DocumentSection, ParsedDocument
+
+DEFAULT_MAX_SECTION_CHARS = 2000
+
+MARKER_RE = re.compile(
+    r'^--- Page (?P<page>\d+) ---$'
+    r'|^--- Sheet: (?P<sheet>.*) ---$'
+    r'|^## (?P<heading>.+)$',
+    re.MULTILINE
+)
+PAGE_MARKER_RE = re.compile(r'^--- Page \d+ ---$\n?', re.MULTILINE)
+
+
+def section_document(doc: ParsedDocument, max_chars: int = DEFAULT_MAX_SECTION_CHARS) -> List[DocumentSection]:
+    """Return the sections of doc.content in document order; they never overlap."""
+    content = doc.content
+    sections: List[DocumentSection] = []
+    seen_ids: dict = {}
+    provenance = {'kind': 'text', 'page': None, 'sheet': None, 'heading': None}
+
+    def add_segment(start: int, end: int) -> None:
+        for chunk_start, chunk_end in _split(content, start, end, max_chars):
+            # The page marker line carries the page number, so it is left out of the identity too
+            text = PAGE_MARKER_RE.sub('', content[chunk_start:chunk_end])
+            base_id = xxhash.xxh3_64(
+                f"{provenance['kind']}|{provenance['sheet']}|{provenance['heading']}|{text}"
+            ).hexdigest()
+            # Repeated boilerplate gets the same hash; number the repeats in order
+            occurrence = seen_ids.get(base_id, 0)
+            seen_ids[base_id] = occurrence + 1
+            sections.append(DocumentSection(
+                section_id=f"sec_{base_id}" if occurrence == 0 else f"sec_{base_id}_{occurrence}",
+                index=len(sections),
+                start=chunk_start,
+                end=chunk_end,
+                char_count=chunk_end - chunk_start,
+                **provenance
+            ))
+
+    segment_start = 0
+    for match in MARKER_RE.finditer(content):
+        add_segment(segment_start, match.start())
+        segment_start = match.start()
+        if match.group('page') is not None:
+            provenance = {'kind': 'page', 'page': int(match.group('page')), 'sheet': None, 'heading': None}
+        elif match.group('sheet') is not None:
+            provenance = {'kind': 'sheet', 'page': None, 'sheet': match.group('sheet'), 'heading': None}
+        else:
+            provenance = {**provenance, 'kind': 'heading', 'heading': match.group('heading').strip()}
+    add_segment(segment_start, len(content))
+    return sections
+
+
+def section_at(doc: ParsedDocument, offset: int) -> Optional[DocumentSection]:
+    """The section containing a character offset of doc.content, if any."""
+    idx = bisect.bisect_right(doc.sections, offset, key=lambda section: section.start) - 1
+    if idx >= 0 and offset < doc.sections[idx].end:
+        return doc.sections[idx]
+    return None
+
+
+def _split(content: str, start: int, end: int, max_chars: int) -> List[tuple[int, int]]:
+    """Trim [start, end) of surrounding whitespace and cut it into pieces of at most max_chars."""
+    pieces = []
+    while True:
+        start, end = _trim(content, start, end)
+        if start >= end:
+            return pieces
+        if end - start <= max_chars:
+            pieces.append((start, end))
+            return pieces
+        cut = _cut_point(content, start, start + max_chars)
+        pieces.append(_trim(content, start, cut))
+        start = cut
+
+
+def _cut_point(content: str, start: int, limit: int) -> int:
+    # Prefer the last paragraph break, then line break, then space in the second half of the window
+    floor = start + (limit - start) // 2
+    for separator in ('\n\n', '\n', ' '):
+        idx = content.rfind(separator, floor, limit)
+        if idx != -1:
+            return idx + len(separator)
+    return limit
+
+
+def _trim(content: str, start: int, end: int) -> tuple[int, int]:
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return start, end
@@ -0,0 +1,237 @@
+# brain/cognitive_pipeline/utils/docx_reader.py
+
+"""
+Streaming DOCX text and table extraction with lxml iterparse.
+
+Produces the same paragraphs, heading markers and table rows as walking the
+python-docx object model, without building it: the main document part is
+streamed out of the zip and each top-level paragraph or table is converted and
+freed as soon as its closing tag is seen. Anything this reader does not
+understand raises DocxFastPathUnsupported so the caller can fall back to python-docx.
+"""
+
+import posixpath
+import zipfile
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from docx.styles import BabelFish
+from lxml import etree
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+STYLES_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles'
+DOCX_MAIN_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+
+W_BODY = f'{{{W_NS}}}body'
+W_P = f'{{{W_NS}}}p'
+W_TBL = f'{{{W_NS}}}tbl'
+W_TR = f'{{{W_NS}}}tr'
+W_TC = f'{{{W_NS}}}tc'
+W_R = f'{{{W_NS}}}r'
+W_HYPERLINK = f'{{{W_NS}}}hyperlink'
+W_T = f'{{{W_NS}}}t'
+W_BR = f'{{{W_NS}}}br'
+W_VAL = f'{{{W_NS}}}val'
+W_TYPE = f'{{{W_NS}}}type'
+
+# Run children with a text equivalent, as python-docx's Run.text renders them
+RUN_TEXT = {
+    f'{{{W_NS}}}tab': '\t',
+    f'{{{W_NS}}}ptab': '\t',
+    f'{{{W_NS}}}cr': '\n',
+    f'{{{W_NS}}}noBreakHyphen': '-',
+}
+
+ON_VALUES = ('1', 'true', 'on')
+
+
+class DocxFastPathUnsupported(Exception):
+    """The document uses a layout the streaming reader doesn't handle; parse it with python-docx."""
+    pass
+
+
+def read_docx(file_path: Union[str, BinaryIO], should_stop: Optional[Callable[[], bool]] = None) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Return (content_parts, tables) for a DOCX file, matching the python-docx based extraction.
+
+    should_stop is checked before each top-level paragraph or table; once it
+    returns True the content read so far is returned.
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            document_part = _main_document_part(archive)
+            styles = _paragraph_styles(archive, document_part)
+            with archive.open(document_part) as stream:
+                return _read_body(stream, styles, should_stop)
+    except (zipfile.BadZipFile, KeyError, etree.XMLSyntaxError) as e:
+        raise DocxFastPathUnsupported(str(e))
+
+
+def _parse_part(archive: zipfile.ZipFile, name: str) -> etree._Element:
+    parser = etree.XMLParser(resolve_entities=False, no_network=True)
+    with archive.open(name) as stream:
+        return etree.parse(stream, parser).getroot()
+
+
+def _main_document_part(archive: zipfile.ZipFile) -> str:
+    rels = _parse_part(archive, '_rels/.rels')
+    target = next(
+        (rel.get('Target') for rel in rels.iterfind(f'{{{PKG_REL_NS}}}Relationship')
+         if rel.get('Type') == OFFICE_DOCUMENT_REL),
+        None
+    )
+    if not target:
+        raise DocxFastPathUnsupported("no officeDocument relationship")
+    part = target.lstrip('/')
+
+    # python-docx refuses macro-enabled documents and templates; let it raise that error itself
+    content_types = _parse_part(archive, '[Content_Types].xml')
+    for override in content_types.iterfind(f'{{{CT_NS}}}Override'):
+        if override.get('PartName', '').lstrip('/') == part:
+            if override.get('ContentType') != DOCX_MAIN_CONTENT_TYPE:
+                raise DocxFastPathUnsupported(f"main part content type is {override.get('ContentType')}")
+            return part
+    raise DocxFastPathUnsupported("main part has no content type override")
+
+
+def _paragraph_styles(archive: zipfile.ZipFile, document_part: str) -> Dict[Optional[str], Optional[str]]:
+    """Map paragraph styleId to UI style name; the None key holds the default paragraph style."""
+    directory, filename = posixpath.split(document_part)
+    rels_name = posixpath.join(directory, '_rels', f'{filename}.rels')
+    if rels_name not in archive.namelist():
+        return {None: None}
+    rels = _parse_part(archive, rels_name)
+    target = next(
+        (rel.get('Target') for rel in rels.iterfind(f'{{{PKG_REL_NS}}}Relationship')
+         if rel.get('Type') == STYLES_REL),
+        None
+    )
+    if not target:
+        return {None: None}
+    styles_part = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(directory, target))
+
+    styles: Dict[Optional[str], Optional[str]] = {None: None}
+    for style in _parse_part(archive, styles_part).iterfind(f'{{{W_NS}}}style'):
+        if style.get(W_TYPE) != 'paragraph':
+            continue
+        name_element = style.find(f'{{{W_NS}}}name')
+        name = None
+        if name_element is not None and name_element.get(W_VAL) is not None:
+            name = BabelFish.internal2ui(name_element.get(W_VAL))
+        style_id = style.get(f'{{{W_NS}}}styleId')
+        # First definition of an id wins; the last default wins
+        if style_id is not None and style_id not in styles:
+            styles[style_id] = name
+        if style.get(f'{{{W_NS}}}default') in ON_VALUES:
+            styles[None] = name
+    return styles
+
+
+def _read_body(stream, styles: Dict[Optional[str], Optional[str]],
+               should_stop: Optional[Callable[[], bool]] = None) -> Tuple[List[str], List[Dict[str, Any]]]:
+    content_parts: List[str] = []
+    tables: List[Dict[str, Any]] = []
+    context = etree.iterparse(stream, events=('end',), tag=(W_P, W_TBL), resolve_entities=False, no_network=True)
+    for _, element in context:
+        parent = element.getparent()
+        # Paragraphs and tables nested in cells or content controls belong to their container
+        if parent is None or parent.tag != W_BODY:
+            continue
+        if should_stop and should_stop():
+            break
+
+        if element.tag == W_P:
+            text = _paragraph_text(element).strip()
+            if text:
+                style = _paragraph_style_name(element, styles)
+                if style and "Heading" in style:
+                    content_parts.append(f"\n## {text}\n")
+                else:
+                    content_parts.append(text)
+        else:
+            table_data = _table_rows(element)
+            if table_data:
+                tables.append({
+                    'table_index': len(tables),
+                    'headers': table_data[0] if table_data else [],
+                    'rows': table_data[1:] if len(table_data) > 1 else [],
+                    'row_count': len(table_data) - 1
+                })
+
+        # Free what has been converted so memory stays flat on long documents
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del parent[0]
+    return content_parts, tables
+
+
+def _paragraph_style_name(paragraph: etree._Element, styles: Dict[Optional[str], Optional[str]]) -> Optional[str]:
+    p_style = paragraph.find(f'{{{W_NS}}}pPr/{{{W_NS}}}pStyle')
+    style_id = p_style.get(W_VAL) if p_style is not None else None
+    if style_id in styles:
+        return styles[style_id]
+    return styles[None]
+
+
+def _paragraph_text(paragraph: etree._Element) -> str:
+    parts = []
+    for child in paragraph:
+        if child.tag == W_R:
+            parts.append(_run_text(child))
+        elif child.tag == W_HYPERLINK:
+            parts.extend(_run_text(run) for run in child.iterchildren(W_R))
+    return "".join(parts)
+
+
+def _run_text(run: etree._Element) -> str:
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_BR:
+            # Only line breaks have a text equivalent; page and column breaks don't
+            if child.get(W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append("\n")
+        elif tag in RUN_TEXT:
+            parts.append(RUN_TEXT[tag])
+    return "".join(parts)
+
+
+def _table_rows(table: etree._Element) -> List[List[str]]:
+    """One text entry per layout-grid cell, repeating spanned and vertically merged cells."""
+    rows = []
+    # grid offset -> (text, grid span) of the cell that holds the content, for vMerge continuations
+    cells_above: Dict[int, Tuple[str, int]] = {}
+    for tr in table.iterchildren(W_TR):
+        offset = _int_val(tr.find(f'{{{W_NS}}}trPr/{{{W_NS}}}gridBefore'), 0)
+        row: List[str] = []
+        cells_here: Dict[int, Tuple[str, int]] = {}
+        for tc in tr.iterchildren(W_TC):
+            grid_span = _int_val(tc.find(f'{{{W_NS}}}tcPr/{{{W_NS}}}gridSpan'), 1)
+            v_merge = tc.find(f'{{{W_NS}}}tcPr/{{{W_NS}}}vMerge')
+            if v_merge is not None and v_merge.get(W_VAL, 'continue') == 'continue':
+                if offset not in cells_above:
+                    raise DocxFastPathUnsupported(f"vertical merge without a cell above at grid offset {offset}")
+                cell = cells_above[offset]
+            else:
+                text = "\n".join(_paragraph_text(p) for p in tc.iterchildren(W_P)).strip()
+                cell = (text, grid_span)
+            row.extend([cell[0]] * cell[1])
+            cells_here[offset] = cell
+            offset += grid_span
+        rows.append(row)
+        cells_above = cells_here
+    return rows
+
+
+def _int_val(element: Optional[etree._Element], default: int) -> int:
+    if element is None:
+        return default
+    try:
+        return int(element.get(W_VAL, default))
+    except ValueError:
+        raise DocxFastPathUnsupported(f"non-integer {element.tag} value")
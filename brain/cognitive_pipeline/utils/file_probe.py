@@ -0,0 +1,170 @@
+# brain/cognitive_pipeline/utils/file_probe.py
+
+"""
+Single-pass file probing shared by FileValidator and DocumentProcessor.
+
+A FileProbe is built with one stat() and one header read, then handed from
+validation to parsing so neither repeats the syscalls. The MIME type comes from
+the file's magic bytes; the extension is only a fallback for unknown content.
+Members of ZIP bundles (see archive_reader) are probed from the archive's
+directory entry and the first decompressed bytes of the member.
+"""
+
+import mimetypes
+import os
+import stat
+import zipfile
+import zlib
+from typing import Optional
+
+from .archive_reader import ArchiveError, member_error, open_source, split_member_path
+
+DOCX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+XLSX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+
+class FileProbe:
+    """Size, readability, header bytes and content-based MIME type of one file."""
+
+    HEADER_SIZE = 4096
+
+    def __init__(self, file_path: str, exists: bool = False, is_file: bool = False, readable: bool = False,
+                 size: int = 0, header: bytes = b'', mime_type: Optional[str] = None,
+                 extension_mime_type: Optional[str] = None, error: Optional[str] = None):
+        self.file_path = file_path
+        self.exists = exists
+        self.is_file = is_file
+        self.readable = readable
+        self.size = size
+        self.header = header
+        self.mime_type = mime_type
+        self.extension_mime_type = extension_mime_type
+        self.error = error
+        # xxh3 digest of the content, set by the first parse-cache lookup so later ones reuse it
+        self.content_digest: Optional[str] = None
+
+    @classmethod
+    def probe(cls, file_path: str) -> "FileProbe":
+        extension_mime_type, _ = mimetypes.guess_type(file_path)
+        split = split_member_path(file_path)
+        if split is not None:
+            return cls._probe_member(file_path, *split, extension_mime_type)
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            return cls(file_path, extension_mime_type=extension_mime_type)
+        except OSError as e:
+            return cls(file_path, exists=True, extension_mime_type=extension_mime_type, error=str(e))
+
+        if not stat.S_ISREG(st.st_mode):
+            return cls(file_path, exists=True, extension_mime_type=extension_mime_type)
+
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(cls.HEADER_SIZE)
+        except PermissionError:
+            return cls(file_path, exists=True, is_file=True, size=st.st_size,
+                       extension_mime_type=extension_mime_type)
+        except OSError as e:
+            return cls(file_path, exists=True, is_file=True, size=st.st_size,
+                       extension_mime_type=extension_mime_type, error=str(e))
+
+        return cls(
+            file_path,
+            exists=True,
+            is_file=True,
+            readable=True,
+            size=st.st_size,
+            header=header,
+            mime_type=sniff_mime_type(file_path, header, extension_mime_type),
+            extension_mime_type=extension_mime_type
+        )
+
+    @classmethod
+    def _probe_member(cls, file_path: str, archive_path: str, name: str,
+                      extension_mime_type: Optional[str]) -> "FileProbe":
+        try:
+            with zipfile.ZipFile(archive_path) as archive:
+                info = archive.getinfo(name)
+                error = member_error(info)
+                if error:
+                    return cls(file_path, exists=True, is_file=True, size=info.file_size,
+                               extension_mime_type=extension_mime_type, error=error)
+                with archive.open(info) as member:
+                    header = member.read(cls.HEADER_SIZE)
+        except (KeyError, FileNotFoundError):
+            return cls(file_path, extension_mime_type=extension_mime_type)
+        except (zipfile.BadZipFile, zlib.error, NotImplementedError, OSError) as e:
+            return cls(file_path, exists=True, extension_mime_type=extension_mime_type, error=str(e))
+
+        return cls(
+            file_path,
+            exists=True,
+            is_file=True,
+            readable=True,
+            size=info.file_size,
+            header=header,
+            mime_type=sniff_mime_type(file_path, header, extension_mime_type),
+            extension_mime_type=extension_mime_type
+        )
+
+    @property
+    def type_mismatch(self) -> bool:
+        """True when the extension claims a different type than the content shows."""
+        return bool(self.mime_type and self.extension_mime_type and self.mime_type != self.extension_mime_type)
+
+
+def sniff_mime_type(file_path: str, header: bytes, extension_mime_type: Optional[str] = None) -> Optional[str]:
+    """Detect the MIME type from magic bytes, falling back to the extension for unknown content."""
+    if header.startswith(b'%PDF-'):
+        return 'application/pdf'
+
+    if header.startswith(b'PK\x03\x04'):
+        return _sniff_ooxml(file_path)
+
+    if header.startswith(OLE_SIGNATURE):
+        # Legacy Office container; only .doc is supported, so trust the extension for .xls/.ppt
+        return extension_mime_type if extension_mime_type and extension_mime_type != 'text/plain' else 'application/msword'
+
+    if header and _looks_like_text(header):
+        if extension_mime_type and extension_mime_type.startswith('text/'):
+            return extension_mime_type
+        return 'text/plain'
+
+    return extension_mime_type
+
+
+def _sniff_ooxml(file_path: str) -> str:
+    # Decided by the central directory, not by names seen in the header: a plain ZIP
+    # bundle may well contain a word/ or xl/ folder
+    try:
+        with open_source(file_path) as source, zipfile.ZipFile(source) as archive:
+            names = set(archive.namelist())
+    except (zipfile.BadZipFile, ArchiveError, OSError):
+        return 'application/zip'
+    if '[Content_Types].xml' not in names:
+        return 'application/zip'
+    if 'word/document.xml' in names:
+        return DOCX_MIME_TYPE
+    if 'xl/workbook.xml' in names:
+        return XLSX_MIME_TYPE
+    return 'application/zip'
+
+
+def _looks_like_text(header: bytes) -> bool:
+    if header.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return True  # UTF-16 byte order mark
+    if b'\x00' in header:
+        return False
+    try:
+        header.decode('utf-8')
+        return True
+    except UnicodeDecodeError as e:
+        # A multi-byte character may be cut off by the header boundary
+        if e.start >= len(header) - 3:
+            return True
+    # Single-byte encodings: mostly printable bytes
+    printable = sum(1 for b in header if b >= 0x20 or b in (0x09, 0x0a, 0x0d))
+    return printable / len(header) > 0.95
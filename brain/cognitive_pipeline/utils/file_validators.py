@@ -6,10 +6,13 @@ Used for file pre-validation only
 
 import os
 import mimetypes
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from django.core.files.uploadedfile import UploadedFile
 
 from brain.cognitive_pipeline.schema import DocumentParsingValidationResult
+from .archive_reader import ARCHIVE_MIME_TYPE, ArchiveError, list_archive_members
+from .content_metrics import content_metrics
+from .file_probe import FileProbe
 
 
 class FileValidator:
@@ -180,12 +183,61 @@ class FileValidator:
 		}
     
 	@classmethod
-	def validate_file_paths(cls, file_paths: List[str]) -> DocumentParsingValidationResult:
+	def probe_file_paths(cls, file_paths: List[str]) -> Dict[str, FileProbe]:
+		"""
+		Probe each path once (stat + header read) so validation and parsing can share the result.
+		"""
+		return {path: FileProbe.probe(path) for path in file_paths}
+    
+	@classmethod
+	def expand_archives(cls, file_paths: List[str], probes: Dict[str, FileProbe]
+						) -> Tuple[List[str], Dict[str, FileProbe], Dict[str, List[str]]]:
+		"""
+		Replace ZIP bundles with the documents inside them.
+
+		Each member is probed inside the archive and checked with the same rules as
+		a file path. Returns (paths in input order with bundles expanded in place,
+		probes of the accepted paths, validation errors of rejected members and
+		unreadable bundles by path).
+		"""
+		expanded: List[str] = []
+		expanded_probes: Dict[str, FileProbe] = {}
+		rejected: Dict[str, List[str]] = {}
+
+		for path in file_paths:
+			probe = probes.get(path) or FileProbe.probe(path)
+			if probe.mime_type != ARCHIVE_MIME_TYPE:
+				expanded.append(path)
+				expanded_probes[path] = probe
+				continue
+			try:
+				members = list_archive_members(path)
+			except ArchiveError as e:
+				expanded.append(path)
+				rejected[path] = [str(e)]
+				continue
+			if not members:
+				expanded.append(path)
+				rejected[path] = ["Archive contains no documents"]
+			for member in members:
+				member_probe = FileProbe.probe(member)
+				member_errors, _, _ = cls._validate_file_path(member, member_probe)
+				expanded.append(member)
+				if member_errors:
+					rejected[member] = member_errors
+				else:
+					expanded_probes[member] = member_probe
+
+		return expanded, expanded_probes, rejected
+    
+	@classmethod
+	def validate_file_paths(cls, file_paths: List[str], probes: Optional[Dict[str, FileProbe]] = None) -> DocumentParsingValidationResult:
 		"""
 		Validate a list of file paths for processing.
         
 		Args:
 			file_paths: List of absolute file paths
+			probes: Optional FileProbes from probe_file_paths; missing paths are probed here
         
 		Returns:
 			ValidationResult with path validation status
@@ -208,7 +260,8 @@ class FileValidator:
 		total_size = 0
         
 		for i, path in enumerate(file_paths):
-			path_errors, path_warnings, path_size = cls._validate_file_path(path)
+			probe = probes.get(path) if probes else None
+			path_errors, path_warnings, path_size = cls._validate_file_path(path, probe)
             
 			if path_errors:
 				errors.extend([f"Path {i+1} ({path}): {error}" for error in path_errors])
@@ -238,47 +291,49 @@ class FileValidator:
 		)
     
 	@classmethod
-	def _validate_file_path(cls, file_path: str) -> tuple[list[str], list[str], int]:
+	def _validate_file_path(cls, file_path: str, probe: Optional[FileProbe] = None) -> tuple[list[str], list[str], int]:
 		"""Validate a single file path."""
 		errors: list[str] = []
 		warnings: list[str] = []
 		file_size: int = 0
+		probe = probe or FileProbe.probe(file_path)
 
 		# Path existence check
-		if not os.path.exists(file_path):
+		if not probe.exists:
 			errors.append("File does not exist")
 			return errors, warnings, file_size
 
+		if probe.error:
+			errors.append(f"Cannot access file: {probe.error}")
+			return errors, warnings, file_size
+
 		# Path type check
-		if not os.path.isfile(file_path):
+		if not probe.is_file:
 			errors.append("Path is not a file")
 			return errors, warnings, file_size
 
 		# File accessibility check
-		if not os.access(file_path, os.R_OK):
+		if not probe.readable:
 			errors.append("File is not readable")
 			return errors, warnings, file_size
 
-		try:
-			# File size check
-			file_size = os.path.getsize(file_path)
-			if file_size > cls.MAX_FILE_SIZE:
-				errors.append(f"File too large: {file_size} bytes (max: {cls.MAX_FILE_SIZE})")
-			elif file_size < cls.MIN_FILE_SIZE:
-				errors.append(f"File too small: {file_size} bytes (min: {cls.MIN_FILE_SIZE})")
-
-			# File extension check
-			file_ext = os.path.splitext(file_path)[1].lower()
-			if file_ext in cls.SECURITY_EXTENSIONS_BLOCKED:
-				errors.append(f"File type not allowed for security reasons: {file_ext}")
+		# File size check
+		file_size = probe.size
+		if file_size > cls.MAX_FILE_SIZE:
+			errors.append(f"File too large: {file_size} bytes (max: {cls.MAX_FILE_SIZE})")
+		elif file_size < cls.MIN_FILE_SIZE:
+			errors.append(f"File too small: {file_size} bytes (min: {cls.MIN_FILE_SIZE})")
 
-			# MIME type check
-			mime_type, _ = mimetypes.guess_type(file_path)
-			if mime_type not in cls.SUPPORTED_MIME_TYPES:
-				errors.append(f"Unsupported file type: {mime_type}")
+		# File extension check
+		file_ext = os.path.splitext(file_path)[1].lower()
+		if file_ext in cls.SECURITY_EXTENSIONS_BLOCKED:
+			errors.append(f"File type not allowed for security reasons: {file_ext}")
 
-		except OSError as e:
-			errors.append(f"Cannot access file: {e}")
+		# MIME type check (content-based)
+		if probe.mime_type not in cls.SUPPORTED_MIME_TYPES:
+			errors.append(f"Unsupported file type: {probe.mime_type}")
+		elif probe.type_mismatch:
+			warnings.append(f"File extension suggests {probe.extension_mime_type} but content is {probe.mime_type}")
 
 		return errors, warnings, file_size
 
@@ -306,44 +361,38 @@ class ContentValidator:
 		errors = []
 		warnings = []
 		quality_score = 1.0
+		# One pass over the content for every metric below
+		metrics = content_metrics(content or "")
         
 		# Content length check
-		if not content or not content.strip():
+		if metrics['stripped_length'] == 0:
 			errors.append("No content extracted from document")
 			quality_score = 0.0
-		elif len(content.strip()) < cls.MIN_CONTENT_LENGTH:
+		elif metrics['stripped_length'] < cls.MIN_CONTENT_LENGTH:
 			warnings.append("Very little content extracted - document may be mostly images or formatting")
 			quality_score *= 0.7
         
 		# Content quality heuristics
 		if content:
 			# Check for reasonable text-to-special-character ratio
-			text_chars = sum(1 for c in content if c.isalnum() or c.isspace())
-			special_chars = len(content) - text_chars
-            
-			if len(content) > 0:
-				special_ratio = special_chars / len(content)
-				if special_ratio > 0.5:
-					warnings.append("High ratio of special characters - may indicate extraction issues")
-					quality_score *= 0.8
+			if metrics['special_char_ratio'] > 0.5:
+				warnings.append("High ratio of special characters - may indicate extraction issues")
+				quality_score *= 0.8
             
 			# Check for reasonable word count
-			words = content.split()
-			if len(words) < 10:
+			if metrics['word_count'] < 10:
 				warnings.append("Very few words extracted")
 				quality_score *= 0.6
             
 			# Check for repeated patterns (potential extraction errors)
-			if len(set(words)) < len(words) * 0.3 and len(words) > 20:
+			if metrics['unique_words'] < metrics['word_count'] * 0.3 and metrics['word_count'] > 20:
 				warnings.append("High word repetition detected - may indicate extraction issues")
 				quality_score *= 0.8
         
 		is_valid = len(errors) == 0 and quality_score >= cls.MIN_QUALITY_SCORE
         
 		details = {
-			'content_length': len(content) if content else 0,
-			'word_count': len(content.split()) if content else 0,
-			'unique_words': len(set(content.split())) if content else 0,
+			**metrics,
 			'file_type': file_type
 		}
         
@@ -0,0 +1,162 @@
+# brain/cognitive_pipeline/utils/incremental_parse.py
+
+"""
+Page and sheet fingerprints for incremental re-parsing.
+
+A new upload of a known document (same logical name, different bytes) is
+usually an edit of a few pages or sheets. Every PDF page and XLSX sheet is
+fingerprinted from its raw bytes, without layout analysis; parts whose
+fingerprint appears in the previously stored version of the document are
+merged from it instead of being parsed again.
+
+Fingerprints cover everything the parsers read: for a PDF page its content
+streams and resources (fonts, ToUnicode maps, form XObjects), for a sheet its
+worksheet XML, the shared strings it references and the workbook styles.
+A page whose resources nest deeper than MAX_PDF_OBJECT_DEPTH gets no
+fingerprint and is always parsed fresh, since a truncated hash could match a
+page that differs below the cut-off.
+"""
+
+import os
+import re
+import zipfile
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+
+import xxhash
+from lxml import etree
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSLiteral
+
+from .archive_reader import MEMBER_SEPARATOR, split_member_path
+
+UPLOAD_PREFIX_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_')
+# Numeric cell values; shared-string cells hold their index this way
+CELL_VALUE_RE = re.compile(rb'<(?:\w+:)?v>(\d+)</')
+MAX_PDF_OBJECT_DEPTH = 32
+
+SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+
+def logical_document_name(file_path: str) -> str:
+    """Upload name of a file, without the unique prefix added when it was saved."""
+    return UPLOAD_PREFIX_RE.sub('', os.path.basename(file_path))
+
+
+def document_identity(file_path: str) -> str:
+    """
+    Logical name of a document that also tells bundle members apart: a member
+    is named by its archive's logical name and its path inside the archive.
+    """
+    member = split_member_path(file_path)
+    if member is None:
+        return logical_document_name(file_path)
+    archive_path, name = member
+    return f"{logical_document_name(archive_path)}{MEMBER_SEPARATOR}{name}"
+
+
+class PDFObjectDepthExceeded(Exception):
+    """A page's object graph nests deeper than MAX_PDF_OBJECT_DEPTH"""
+    pass
+
+
+def pdf_page_fingerprint(page) -> Optional[str]:
+    """
+    Fingerprint of a pdfplumber page from its undecoded content streams and
+    resources, or None when they nest too deeply to be hashed completely.
+    """
+    page_obj = page.page_obj
+    digest = xxhash.xxh3_64()
+    digest.update(repr((page.bbox, page_obj.attrs.get('Rotate', 0))).encode())
+    try:
+        for stream in page_obj.contents:
+            _hash_pdf_object(digest, stream, set(), 0)
+        _hash_pdf_object(digest, page_obj.resources, set(), 0)
+    except PDFObjectDepthExceeded:
+        return None
+    return digest.hexdigest()
+
+
+def _hash_pdf_object(digest, obj: Any, seen: set, depth: int) -> None:
+    if depth > MAX_PDF_OBJECT_DEPTH:
+        raise PDFObjectDepthExceeded(f"PDF object nesting exceeds {MAX_PDF_OBJECT_DEPTH} levels")
+    if isinstance(obj, PDFObjRef):
+        # Object numbers change between versions, so hash the target, once per page
+        if obj.objid in seen:
+            digest.update(b'<seen>')
+            return
+        seen.add(obj.objid)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        _hash_pdf_object(digest, obj.attrs, seen, depth + 1)
+        # Raw bytes until pdfminer decodes the stream, decoded bytes after
+        digest.update(obj.rawdata if obj.rawdata is not None else (obj.data or b''))
+    elif isinstance(obj, dict):
+        for key in sorted(obj):
+            if key == 'Parent':
+                continue
+            digest.update(key.encode() if isinstance(key, str) else repr(key).encode())
+            _hash_pdf_object(digest, obj[key], seen, depth + 1)
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'[')
+        for item in obj:
+            _hash_pdf_object(digest, item, seen, depth + 1)
+        digest.update(b']')
+    elif isinstance(obj, PSLiteral):
+        digest.update(repr(obj.name).encode())
+    else:
+        digest.update(repr(obj).encode())
+
+
+def xlsx_sheet_fingerprints(file_path: Union[str, BinaryIO]) -> Dict[str, str]:
+    """Fingerprint of every worksheet in a workbook, keyed by sheet title."""
+    with zipfile.ZipFile(file_path) as archive:
+        workbook_path = 'xl/workbook.xml'
+        targets = _relationship_targets(archive, workbook_path)
+        shared_strings = _shared_string_hashes(archive, targets.get('sharedStrings'))
+        styles_path = targets.get('styles')
+        styles_hash = xxhash.xxh3_64_hexdigest(archive.read(styles_path)) if styles_path else ''
+
+        workbook = etree.fromstring(archive.read(workbook_path))
+        fingerprints = {}
+        for sheet in workbook.iter(f'{{{SPREADSHEET_NS}}}sheet'):
+            target = targets['by_id'].get(sheet.get(f'{{{RELATIONSHIP_NS}}}id'))
+            if target is None or target[0] != 'worksheet':
+                continue  # Chartsheets aren't among openpyxl's workbook.worksheets
+            sheet_xml = archive.read(target[1])
+            digest = xxhash.xxh3_64()
+            digest.update(sheet.get('name', '').encode())
+            digest.update(styles_hash.encode())
+            digest.update(sheet_xml)
+            for match in CELL_VALUE_RE.finditer(sheet_xml):
+                index = int(match.group(1))
+                if index < len(shared_strings):
+                    digest.update(shared_strings[index])
+            fingerprints[sheet.get('name')] = digest.hexdigest()
+        return fingerprints
+
+
+def _relationship_targets(archive: zipfile.ZipFile, part_path: str) -> Dict[str, Any]:
+    """Targets of a part's relationships: archive paths by relationship id and by (last) type name."""
+    directory, name = part_path.rsplit('/', 1)
+    rels = etree.fromstring(archive.read(f'{directory}/_rels/{name}.rels'))
+    targets: Dict[str, Any] = {'by_id': {}}
+    for rel in rels.iter(f'{{{PACKAGE_RELS_NS}}}Relationship'):
+        target = rel.get('Target', '')
+        path = target.lstrip('/') if target.startswith('/') else f'{directory}/{target}'
+        rel_type = rel.get('Type', '').rsplit('/', 1)[-1]
+        targets['by_id'][rel.get('Id')] = (rel_type, path)
+        targets[rel_type] = path
+    return targets
+
+
+def _shared_string_hashes(archive: zipfile.ZipFile, path: Optional[str]) -> List[bytes]:
+    if path is None:
+        return []
+    hashes = []
+    with archive.open(path) as part:
+        for _, item in etree.iterparse(part, tag=f'{{{SPREADSHEET_NS}}}si'):
+            hashes.append(xxhash.xxh3_64_digest("".join(item.itertext())))
+            item.clear()
+    return hashes
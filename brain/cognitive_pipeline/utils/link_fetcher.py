@@ -0,0 +1,440 @@
+# brain/cognitive_pipeline/utils/link_fetcher.py
+
+"""
+Concurrent URL ingestion for the Perception Layer.
+
+All links of a job are fetched on one asyncio event loop through a single
+pooled httpx.AsyncClient: a global connection limit bounds the pool and a
+per-host semaphore keeps one site from being hammered (or from starving the
+others). Responses that carry an ETag or Last-Modified validator are kept in a
+SQLite-backed cache; fetching a known URL again sends a conditional GET and a
+304 is served from the cache.
+
+URLs come from users, so every host (the first request's and each redirect
+hop's) is refused if any of its addresses is loopback, private, link-local
+(cloud metadata), reserved or multicast. The check runs in the connection
+layer (PublicAddressBackend): the host is resolved once, and the socket is
+opened to exactly the address that passed, so a DNS answer that changes
+between check and connect (DNS rebinding) cannot reach an internal service.
+Host header and TLS SNI still carry the original host name. Redirects are
+followed here rather than by httpx, so conditional-GET validators only go to
+the URL whose cached response they came from.
+
+HTML is reduced to text with lxml (BeautifulSoup for markup lxml rejects):
+headings become "## " lines so the document sectioner picks them up, and
+tables are also returned as table dicts like the file parsers produce. Linked
+PDF/DOCX/XLSX files are handed to a DocumentProcessor.
+"""
+
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpcore
+import httpx
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from brain.cognitive_pipeline.schema import DocumentMetadata, DocumentParsingValidationResult, ParsedDocument
+from .compression import compress_bytes, decompress_bytes
+from .disk_cache import DiskCache
+from .file_validators import ContentValidator
+
+logger = logging.getLogger(__name__)
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+HTML_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+# Linked files parsed by DocumentProcessor, with the suffix their temp file gets
+DOCUMENT_CONTENT_TYPES = {
+    'application/pdf': '.pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx',
+}
+# Not part of the readable text of a page
+SKIPPED_TAGS = ('script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'nav', 'footer', 'aside', 'form', 'button')
+BLOCK_TAGS = (
+    'p', 'div', 'section', 'article', 'main', 'header', 'li', 'dt', 'dd', 'blockquote', 'pre',
+    'tr', 'caption', 'figcaption', 'br', 'hr', 'address', 'summary', 'details',
+)
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+class LinkResponseCache:
+    """Persistent cache of response bodies with their HTTP validators, keyed by URL."""
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.store = DiskCache(os.path.join(cache_dir, "link_responses.sqlite3"), max_bytes)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            payload = self.store.get(url)
+        except Exception as e:
+            logger.warning(f"Link cache read failed for {url}: {e}")
+            return None
+        if payload is None:
+            return None
+        try:
+            # Header JSON length, header JSON, then the raw body
+            data = decompress_bytes(payload)
+            header_length = int.from_bytes(data[:4], 'big')
+            entry = json.loads(data[4:4 + header_length])
+            entry['body'] = data[4 + header_length:]
+        except Exception as e:
+            # A corrupt entry is a miss; the next fetch overwrites it
+            logger.warning(f"Link cache entry for {url} is unreadable: {e}")
+            return None
+        return entry
+
+    def set(self, url: str, entry: Dict[str, Any]) -> None:
+        header = json.dumps({key: value for key, value in entry.items() if key != 'body'}).encode('utf-8')
+        try:
+            self.store.set(url, compress_bytes(len(header).to_bytes(4, 'big') + header + entry['body']))
+        except Exception as e:
+            logger.warning(f"Link cache write failed for {url}: {e}")
+
+
+class LinkFetcher:
+    """Fetches many URLs concurrently with pooled connections, per-host limits and conditional GETs."""
+
+    MAX_CONNECTIONS = 20
+    PER_HOST_LIMIT = 4
+    TIMEOUT_SECONDS = 20.0
+    MAX_RESPONSE_BYTES = 50 * 1024 * 1024  # Same as DocumentProcessor.MAX_FILE_SIZE
+    USER_AGENT = "BrainLinkFetcher/1.0"
+    MAX_REDIRECTS = 5
+
+    def __init__(self, cache: Optional[LinkResponseCache] = None, max_connections: Optional[int] = None,
+                 per_host_limit: Optional[int] = None, timeout_seconds: Optional[float] = None,
+                 allow_private_addresses: bool = False):
+        """
+        Args:
+            allow_private_addresses: Also fetch from loopback/private/link-local hosts (tests and
+                local development only; user-supplied URLs must never reach internal services).
+        """
+        self.cache = cache
+        self.allow_private_addresses = allow_private_addresses
+        self.max_connections = max(1, max_connections or self.MAX_CONNECTIONS)
+        self.per_host_limit = max(1, per_host_limit or self.PER_HOST_LIMIT)
+        self.timeout_seconds = timeout_seconds or self.TIMEOUT_SECONDS
+        self.stats = {
+            'links_fetched': 0,
+            'not_modified': 0,
+            'errors': [],
+            'bytes_downloaded': 0,
+            'fetch_timings_ms': {}
+        }
+
+    def fetch_all(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Fetch every URL; results are in input order, failures carry an 'error'."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.afetch_all(urls))
+        # Called from inside an event loop (e.g. an async view): run ours on a separate thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.afetch_all(urls)).result()
+
+    async def afetch_all(self, urls: List[str]) -> List[Dict[str, Any]]:
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+        # Every connection goes through the address check; environment proxies would bypass it
+        transport._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicAddressBackend(self._resolve, self.allow_private_addresses)
+        )
+        # Redirects are followed in _fetch_url so every hop's host is checked
+        async with httpx.AsyncClient(transport=transport, trust_env=False, timeout=self.timeout_seconds,
+                                     follow_redirects=False, headers={'User-Agent': self.USER_AGENT}) as client:
+            return await asyncio.gather(*(self._fetch(client, url, host_semaphores) for url in urls))
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str,
+                     host_semaphores: Dict[str, asyncio.Semaphore]) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        try:
+            result = await self._fetch_url(client, url, host_semaphores)
+        except Exception as e:
+            error_msg = f"Failed to fetch {url}: {e}"
+            self.stats['errors'].append(error_msg)
+            result = {'url': url, 'error': error_msg}
+        elapsed_ms = int((time.perf_counter() - start_time) * 1000)
+        self.stats['fetch_timings_ms'][url] = elapsed_ms
+        result['elapsed_ms'] = elapsed_ms
+        return result
+
+    async def _fetch_url(self, client: httpx.AsyncClient, url: str,
+                         host_semaphores: Dict[str, asyncio.Semaphore]) -> Dict[str, Any]:
+        # SQLite calls run off the loop so they don't stall the other fetches
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache is not None else None
+        validators = {}
+        if cached is not None:
+            if cached.get('etag'):
+                validators['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                validators['If-Modified-Since'] = cached['last_modified']
+
+        request_url = httpx.URL(url)
+        for _ in range(self.MAX_REDIRECTS + 1):
+            _check_scheme(request_url)
+            # Validators belong to the response cached for this exact URL, not to other hops
+            conditional = bool(validators) and str(request_url) == cached.get('final_url', url)
+            semaphore = host_semaphores.setdefault(request_url.host, asyncio.Semaphore(self.per_host_limit))
+            async with semaphore:
+                async with client.stream('GET', request_url, headers=validators if conditional else {}) as response:
+                    # Set for 3xx responses with a Location header (not for 304)
+                    if response.next_request is not None:
+                        request_url = response.next_request.url
+                        continue
+                    if response.status_code == 304 and conditional:
+                        self.stats['not_modified'] += 1
+                        return {**cached, 'url': url, 'status': 304, 'from_cache': True}
+                    response.raise_for_status()
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body.extend(chunk)
+                        if len(body) > self.MAX_RESPONSE_BYTES:
+                            raise ValueError(f"response larger than {self.MAX_RESPONSE_BYTES} bytes")
+            break
+        else:
+            raise ValueError(f"more than {self.MAX_REDIRECTS} redirects")
+
+        self.stats['links_fetched'] += 1
+        self.stats['bytes_downloaded'] += len(body)
+        entry = {
+            'final_url': str(response.url),
+            'content_type': response.headers.get('content-type', ''),
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'body': bytes(body)
+        }
+        # Without a validator the next fetch couldn't be conditional, so there's nothing to gain
+        if self.cache is not None and (entry['etag'] or entry['last_modified']):
+            await asyncio.to_thread(self.cache.set, url, entry)
+        return {**entry, 'url': url, 'status': response.status_code, 'from_cache': False}
+
+    async def _resolve(self, host: str, port: int) -> List[IPAddress]:
+        try:
+            return [ipaddress.ip_address(host)]
+        except ValueError:
+            pass
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        # Drop IPv6 scope ids ("fe80::1%eth0") before parsing
+        return [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+
+
+class PublicAddressBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend that resolves each host once and connects to an address that
+    passed is_public_address, so the address checked is the address dialled.
+
+    resolve is an async (host, port) -> addresses callable (LinkFetcher._resolve). TLS is
+    started by httpcore on the returned stream with the original host name as SNI.
+    """
+
+    def __init__(self, resolve, allow_private_addresses: bool = False):
+        self.resolve = resolve
+        self.allow_private_addresses = allow_private_addresses
+        self.backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options=None) -> httpcore.AsyncNetworkStream:
+        addresses = await self.resolve(host, port)
+        if not self.allow_private_addresses:
+            for address in addresses:
+                if not is_public_address(address):
+                    raise ValueError(f"refusing to fetch {host}: resolves to non-public address {address}")
+        error: Optional[Exception] = httpcore.ConnectError(f"{host} did not resolve")
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(
+                    str(address), port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options=None) -> httpcore.AsyncNetworkStream:
+        raise httpcore.ConnectError("unix sockets are not fetched")
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+
+def _check_scheme(url: httpx.URL) -> None:
+    if url.scheme not in ('http', 'https'):
+        raise ValueError(f"unsupported URL scheme '{url.scheme}'")
+
+
+def is_public_address(address: IPAddress) -> bool:
+    """False for loopback, private (RFC1918, IPv6 ULA), link-local, reserved, multicast and unspecified addresses."""
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    return not (address.is_private or address.is_loopback or address.is_link_local or address.is_reserved
+                or address.is_multicast or address.is_unspecified)
+
+
+def extract_html(body: bytes, encoding: Optional[str] = None) -> Tuple[str, str, List[Dict[str, Any]]]:
+    """Return (title, text, tables) of an HTML page."""
+    try:
+        parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+        root = lxml.html.document_fromstring(body, parser=parser)
+    except (etree.ParserError, ValueError, LookupError) as e:
+        logger.debug(f"lxml rejected HTML ({e}), falling back to BeautifulSoup")
+        soup = BeautifulSoup(body, 'html.parser', from_encoding=encoding)
+        for tag in soup(SKIPPED_TAGS):
+            tag.decompose()
+        title = soup.title.get_text(" ", strip=True) if soup.title else ""
+        return title, _normalise_lines(soup.get_text("\n")), []
+
+    title = " ".join((root.findtext('.//title') or "").split())
+    for element in list(root.iter(*SKIPPED_TAGS)):
+        element.drop_tree()
+    body_element = root.find('body')
+    if body_element is None:
+        return title, "", []
+
+    tables = []
+    for table in body_element.iter('table'):
+        rows = [
+            [" ".join(cell.text_content().split()) for cell in row.xpath('./th|./td')]
+            for row in table.xpath('./tr|./thead/tr|./tbody/tr|./tfoot/tr')
+        ]
+        rows = [row for row in rows if any(row)]
+        if len(rows) > 1:  # Skip empty or single-row (layout) tables
+            tables.append({
+                'table_index': len(tables),
+                'headers': rows[0],
+                'rows': rows[1:],
+                'row_count': len(rows) - 1
+            })
+
+    # Put block boundaries into the text so text_content() keeps paragraphs apart
+    for element in body_element.iter(*HEADING_TAGS):
+        element.text = "\n## " + (element.text or "")
+        element.tail = "\n" + (element.tail or "")
+    for element in body_element.iter(*BLOCK_TAGS):
+        element.tail = "\n" + (element.tail or "")
+    for element in body_element.iter('td', 'th'):
+        element.tail = " " + (element.tail or "")
+    return title, _normalise_lines(body_element.text_content()), tables
+
+
+def _normalise_lines(text: str) -> str:
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line and line != "##")
+
+
+def build_link_document(fetched: Dict[str, Any], processor=None) -> ParsedDocument:
+    """
+    ParsedDocument for a fetch_all result.
+
+    HTML and plain text are converted here; linked PDF/DOCX/XLSX files are parsed
+    by processor (a DocumentProcessor) from a temporary file.
+    """
+    url = fetched['url']
+    if fetched.get('error'):
+        return _failed_link_document(url, fetched['error'])
+
+    content_type, _, params = fetched.get('content_type', '').partition(';')
+    content_type = content_type.strip().lower()
+    charset = None
+    for param in params.split(';'):
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset':
+            charset = value.strip().strip('"') or None
+    body = fetched['body']
+    details = {
+        "status": fetched.get('status'),
+        "final_url": fetched.get('final_url', url),
+        "content_type": content_type,
+        "from_cache": fetched.get('from_cache', False),
+        "fetch_ms": fetched.get('elapsed_ms')
+    }
+
+    if content_type in DOCUMENT_CONTENT_TYPES and processor is not None:
+        return _parse_linked_file(url, body, DOCUMENT_CONTENT_TYPES[content_type], processor, details)
+    if content_type in HTML_CONTENT_TYPES or (not content_type and body.lstrip()[:1] == b'<'):
+        title, content, tables = extract_html(body, charset)
+        details["title"] = title
+    elif content_type.startswith('text/'):
+        content, tables = body.decode(charset or 'utf-8', errors='replace'), []
+    else:
+        return _failed_link_document(url, f"Unsupported content type for {url}: {content_type or 'unknown'}")
+
+    validation = ContentValidator.validate_processed_content(content, "url")
+    validation.processing_method = "traditional"
+    validation.details.update(details)
+    metadata = DocumentMetadata(
+        file_path=url,
+        file_size=len(body),
+        file_type="url",
+        quality_score=validation.quality_score,
+        errors=validation.errors,
+        warnings=validation.warnings,
+        details={**details, "table_count": len(tables), "extracted_text_length": len(content)},
+        processing_method="traditional"
+    )
+    return ParsedDocument(
+        file_path=url,
+        file_type="url",
+        content=content,
+        tables=tables,
+        metadata=metadata,
+        validation_result=validation
+    )
+
+
+def _parse_linked_file(url: str, body: bytes, suffix: str, processor, details: Dict[str, Any]) -> ParsedDocument:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"link{suffix}")
+        with open(path, 'wb') as f:
+            f.write(body)
+        document = processor.process_files([path])[0]
+    if document.file_type == "failed":
+        return _failed_link_document(url, "; ".join(document.validation_result.errors))
+    metadata = document.metadata.model_copy(update={"file_path": url, "details": {**document.metadata.details, **details}})
+    return document.model_copy(update={"file_path": url, "metadata": metadata})
+
+
+def _failed_link_document(url: str, error_message: str) -> ParsedDocument:
+    metadata = DocumentMetadata(
+        file_path=url,
+        file_size=0,
+        file_type="url",
+        quality_score=0.0,
+        errors=[error_message],
+        warnings=[],
+        details={"processing_failed": True},
+        processing_method="traditional"
+    )
+    validation = DocumentParsingValidationResult(
+        is_valid=False,
+        quality_score=0.0,
+        errors=[error_message],
+        warnings=[],
+        details={"processing_failed": True},
+        processing_method="traditional"
+    )
+    return ParsedDocument(
+        file_path=url,
+        file_type="failed",
+        content="",
+        tables=[],
+        metadata=metadata,
+        validation_result=validation
+    )
@@ -0,0 +1,346 @@
+# brain/cognitive_pipeline/utils/llm_batch.py
+
+"""
+Offline LLM batch mode for bulk (e.g. nightly) re-processing.
+
+Instead of one synchronous call per prompt, LLMBatchRunner packages every
+prompt of a call into one provider batch submission (OpenAI Batch API,
+Anthropic Message Batches), polls until the provider reports it finished and
+returns the responses in input order. Prompts already in the response cache
+are not submitted, identical prompts are submitted once, and results are
+written back to the cache.
+
+Submitted batches are recorded in a journal keyed by the set of prompts, so a
+job that is restarted (or that gave up waiting after max_wait_seconds) picks
+the same batch up again instead of paying for it twice. Until then, prompts
+of an unfinished batch yield LLMBatchPending in place of a response, or are
+answered by BatchLLMFn's synchronous fallback when it has one. The default
+wait is kept short so a pipeline run is not held for a provider's whole
+completion window.
+"""
+
+import io
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import xxhash
+from decouple import config
+
+from . import llm_utils
+from .disk_cache import DiskCache
+from .llm_cache import LLMResponseCache, get_llm_cache, request_key
+from .llm_gateway import PROVIDERS, LLMRequest
+from .llm_http import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBatchError(Exception):
+    """A prompt the provider's batch did not answer successfully."""
+
+
+class LLMBatchPending(LLMBatchError):
+    """The prompt's batch was still running when the runner stopped waiting."""
+
+    def __init__(self, provider: str, batch_id: str):
+        super().__init__(f"{provider} batch {batch_id} has not finished")
+        self.provider = provider
+        self.batch_id = batch_id
+
+
+class OpenAIBatchAPI:
+    """OpenAI Batch API: JSONL input file, batch job, JSONL output/error files."""
+
+    TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.headers = llm_utils.openai_headers(api_key)
+        self.client = get_llm_client("openai")
+
+    def submit(self, entries: List[Tuple[str, Dict[str, Any]]]) -> str:
+        lines = "".join(
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": data}) + "\n"
+            for custom_id, data in entries
+        )
+        upload = self.client.post(
+            f"{llm_utils.OPENAI_BASE_URL}/files",
+            headers=self.headers,
+            data={"purpose": "batch"},
+            files={"file": ("batch.jsonl", io.BytesIO(lines.encode("utf-8")), "application/jsonl")}
+        )
+        upload.raise_for_status()
+        batch = self.client.post(
+            f"{llm_utils.OPENAI_BASE_URL}/batches",
+            headers=self.headers,
+            json={"input_file_id": upload.json()["id"], "endpoint": "/v1/chat/completions", "completion_window": "24h"}
+        )
+        batch.raise_for_status()
+        return batch.json()["id"]
+
+    def status(self, batch_id: str) -> Tuple[bool, Dict[str, Any]]:
+        """(finished, batch object)."""
+        resp = self.client.get(f"{llm_utils.OPENAI_BASE_URL}/batches/{batch_id}", headers=self.headers)
+        resp.raise_for_status()
+        batch = resp.json()
+        return batch["status"] in self.TERMINAL_STATUSES, batch
+
+    def results(self, batch: Dict[str, Any]) -> Dict[str, Union[str, Exception]]:
+        results: Dict[str, Union[str, Exception]] = {}
+        # Expired and cancelled batches still report the requests they completed
+        for file_id in (batch.get("output_file_id"), batch.get("error_file_id")):
+            if not file_id:
+                continue
+            resp = self.client.get(f"{llm_utils.OPENAI_BASE_URL}/files/{file_id}/content", headers=self.headers)
+            resp.raise_for_status()
+            for line in resp.text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["custom_id"]] = self._result(record)
+        return results
+
+    @staticmethod
+    def _result(record: Dict[str, Any]) -> Union[str, Exception]:
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            return LLMBatchError(f"Batch request failed: {record.get('error') or response.get('body')}")
+        try:
+            return llm_utils.openai_content(response["body"])
+        except (KeyError, IndexError, TypeError) as e:
+            return LLMBatchError(f"Malformed batch response: {e}")
+
+
+class AnthropicBatchAPI:
+    """Anthropic Message Batches API: inline requests, JSONL results."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.headers = llm_utils.anthropic_headers(api_key)
+        self.client = get_llm_client("anthropic")
+
+    def submit(self, entries: List[Tuple[str, Dict[str, Any]]]) -> str:
+        resp = self.client.post(
+            f"{llm_utils.ANTHROPIC_BASE_URL}/messages/batches",
+            headers=self.headers,
+            json={"requests": [{"custom_id": custom_id, "params": data} for custom_id, data in entries]}
+        )
+        resp.raise_for_status()
+        return resp.json()["id"]
+
+    def status(self, batch_id: str) -> Tuple[bool, Dict[str, Any]]:
+        resp = self.client.get(f"{llm_utils.ANTHROPIC_BASE_URL}/messages/batches/{batch_id}", headers=self.headers)
+        resp.raise_for_status()
+        batch = resp.json()
+        return batch["processing_status"] == "ended", batch
+
+    def results(self, batch: Dict[str, Any]) -> Dict[str, Union[str, Exception]]:
+        resp = self.client.get(batch["results_url"], headers=self.headers)
+        resp.raise_for_status()
+        results: Dict[str, Union[str, Exception]] = {}
+        for line in resp.text.splitlines():
+            if line.strip():
+                record = json.loads(line)
+                results[record["custom_id"]] = self._result(record["result"])
+        return results
+
+    @staticmethod
+    def _result(result: Dict[str, Any]) -> Union[str, Exception]:
+        if result.get("type") != "succeeded":
+            return LLMBatchError(f"Batch request {result.get('type')}: {result.get('error')}")
+        try:
+            return llm_utils.anthropic_content(result["message"])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return LLMBatchError(f"Malformed batch response: {e}")
+
+
+BATCH_APIS = {
+    "anthropic": AnthropicBatchAPI,
+    "openai": OpenAIBatchAPI,
+}
+
+
+class BatchJournal:
+    """Persistent record of submitted, not yet collected batches by prompt set."""
+
+    MAX_BYTES = 16 * 1024 * 1024
+
+    def __init__(self, journal_dir: str):
+        self.store = DiskCache(os.path.join(journal_dir, "llm_batches.sqlite3"), self.MAX_BYTES)
+
+    def get(self, set_key: str) -> Optional[str]:
+        try:
+            payload = self.store.get(set_key)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM batch journal read failed for {set_key}: {e}")
+            return None
+        return json.loads(payload)["batch_id"] if payload is not None else None
+
+    def record(self, set_key: str, batch_id: str) -> None:
+        try:
+            self.store.set(set_key, json.dumps({"batch_id": batch_id, "submitted_at": time.time()}).encode("utf-8"))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM batch journal write failed for {set_key}: {e}")
+
+    def forget(self, set_key: str) -> None:
+        try:
+            self.store.delete(set_key)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM batch journal delete failed for {set_key}: {e}")
+
+
+class LLMBatchRunner:
+    """Answers many LLMRequests through provider batch APIs (one submission per provider per run())."""
+
+    POLL_INTERVAL_SECONDS = 30.0
+    # Providers allow up to 24h; past this the caller falls back or resumes the batch later
+    MAX_WAIT_SECONDS = 30 * 60.0
+
+    def __init__(self, journal: Optional[BatchJournal] = None, cache: Optional[LLMResponseCache] = None,
+                 poll_interval: float = POLL_INTERVAL_SECONDS, max_wait_seconds: float = MAX_WAIT_SECONDS):
+        self.journal = journal
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.max_wait_seconds = max_wait_seconds
+        self.stats = {
+            'batches_submitted': 0,
+            'batches_resumed': 0,
+            'batches_pending': 0,
+            'requests_submitted': 0,
+            'cache_hits': 0,
+            'polls': 0
+        }
+
+    @classmethod
+    def from_settings(cls) -> "LLMBatchRunner":
+        # Empty LLM_BATCH_DIR disables resuming batches across restarts
+        journal_dir = str(config('LLM_BATCH_DIR', default=os.path.join('media', 'cache', 'llm_batches')))
+        return cls(
+            journal=BatchJournal(journal_dir) if journal_dir else None,
+            cache=get_llm_cache(),
+            poll_interval=config('LLM_BATCH_POLL_SECONDS', default=cls.POLL_INTERVAL_SECONDS, cast=float),
+            max_wait_seconds=config('LLM_BATCH_MAX_WAIT_HOURS', default=cls.MAX_WAIT_SECONDS / 3600, cast=float) * 3600
+        )
+
+    def run(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        """Response text of every request, in input order; failed or unfinished requests yield an exception."""
+        results: List[Union[str, Exception, None]] = [None] * len(requests)
+        # provider -> custom_id -> (cache key, request body, api key); identical requests share a custom_id
+        batches: Dict[str, Dict[str, Tuple[str, Dict[str, Any], Optional[str]]]] = {}
+        positions: Dict[Tuple[str, str], List[int]] = {}
+        for i, request in enumerate(requests):
+            try:
+                _, _, data = PROVIDERS[request.provider][0](request.prompt, request.api_key, request.model, request.max_tokens)
+            except ValueError as e:
+                results[i] = e
+                continue
+            key = request_key(request.provider, data)
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                results[i] = cached
+                continue
+            # Provider custom ids are limited to 64 word characters
+            custom_id = xxhash.xxh3_128_hexdigest(key.encode("utf-8"))
+            batches.setdefault(request.provider, {}).setdefault(custom_id, (key, data, request.api_key))
+            positions.setdefault((request.provider, custom_id), []).append(i)
+
+        for provider, entries in batches.items():
+            for custom_id, value in self._run_batch(provider, entries).items():
+                for i in positions[(provider, custom_id)]:
+                    results[i] = value
+        return results
+
+    def _run_batch(self, provider: str, entries: Dict[str, Tuple[str, Dict[str, Any], Optional[str]]]) -> Dict[str, Union[str, Exception]]:
+        set_key = f"{provider}:" + xxhash.xxh3_128_hexdigest("\n".join(sorted(entries)).encode("utf-8"))
+        try:
+            api = BATCH_APIS[provider](next(iter(entries.values()))[2])
+            batch_id = self.journal.get(set_key) if self.journal is not None else None
+            if batch_id is not None:
+                self.stats['batches_resumed'] += 1
+                logger.info(f"Resuming {provider} batch {batch_id} ({len(entries)} requests)")
+            else:
+                batch_id = api.submit([(custom_id, data) for custom_id, (_, data, _) in entries.items()])
+                self.stats['batches_submitted'] += 1
+                self.stats['requests_submitted'] += len(entries)
+                logger.info(f"Submitted {provider} batch {batch_id} ({len(entries)} requests)")
+                if self.journal is not None:
+                    self.journal.record(set_key, batch_id)
+
+            deadline = time.monotonic() + self.max_wait_seconds
+            while True:
+                finished, batch = api.status(batch_id)
+                self.stats['polls'] += 1
+                if finished:
+                    break
+                if time.monotonic() >= deadline:
+                    # Left in the journal for the next run to collect
+                    self.stats['batches_pending'] += 1
+                    pending = LLMBatchPending(provider, batch_id)
+                    return {custom_id: pending for custom_id in entries}
+                time.sleep(self.poll_interval)
+            outcome = api.results(batch)
+        except Exception as e:
+            logger.error(f"{provider} batch failed: {e}")
+            return {custom_id: e for custom_id in entries}
+
+        results: Dict[str, Union[str, Exception]] = {}
+        for custom_id, (key, _, _) in entries.items():
+            value = outcome.get(custom_id, LLMBatchError(f"{provider} batch {batch_id} returned no result for {custom_id}"))
+            if isinstance(value, str) and self.cache is not None:
+                self.cache.set(key, value)
+            results[custom_id] = value
+        if self.journal is not None:
+            self.journal.forget(set_key)
+        return results
+
+
+class BatchLLMFn:
+    """
+    llm_fn for one provider backed by provider batch APIs.
+
+    Every batch() call (one extraction round of llm_extract_entities) becomes
+    one provider batch; a single-prompt call such as relationship inference
+    becomes a batch of one. Results arrive in bulk, so per-document
+    prefetching is skipped for it (see perception_node).
+
+    Prompts whose batch has not finished within the runner's max wait are
+    sent through fallback (an llm_fn with batch(), e.g. GatewayLLMFn) when
+    one is given; otherwise they yield LLMBatchPending.
+    """
+
+    deferred = True
+
+    def __init__(self, provider: str, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_tokens: int = 512, runner: Optional[LLMBatchRunner] = None, fallback=None):
+        self.provider = provider
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.runner = runner
+        self.fallback = fallback
+
+    def _runner(self) -> LLMBatchRunner:
+        if self.runner is None:
+            self.runner = LLMBatchRunner.from_settings()
+        return self.runner
+
+    def __call__(self, prompt: str) -> str:
+        result = self.batch([prompt])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def batch(self, prompts: List[str]) -> List[Union[str, Exception]]:
+        requests = [LLMRequest(self.provider, prompt, self.api_key, self.model, self.max_tokens) for prompt in prompts]
+        results = self._runner().run(requests)
+        waiting = [i for i, result in enumerate(results) if isinstance(result, LLMBatchPending)]
+        if waiting and self.fallback is not None:
+            logger.warning(
+                f"{len(waiting)} prompt(s) still waiting on a {self.provider} batch after "
+                f"{self._runner().max_wait_seconds:.0f}s; answering them synchronously"
+            )
+            for i, result in zip(waiting, self.fallback.batch([prompts[i] for i in waiting])):
+                results[i] = result
+        return results
@@ -0,0 +1,136 @@
+# brain/cognitive_pipeline/utils/llm_cache.py
+
+"""
+Persistent cache of LLM responses.
+
+Extraction and relationship prompts run at temperature 0 and recur across
+reruns for the same organization, so a response is reused whenever the same
+request is sent again. Keys combine provider, model and max_tokens with an
+xxh3 hash of the full request body (prompt, system message, sampling settings).
+Entries live in a size-bounded LRU DiskCache and expire after a TTL; expired
+entries are dropped when read. Hit/miss counters are per process.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import xxhash
+from decouple import config
+
+from .compression import compress_bytes, decompress_bytes
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+def request_key(provider: str, data: Dict[str, Any]) -> str:
+    """Identity of a request body built by llm_utils.<provider>_request."""
+    body = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    digest = xxhash.xxh3_128_hexdigest(body.encode('utf-8'))
+    return f"{provider}:{data.get('model')}:{data.get('max_tokens')}:{digest}"
+
+
+class LLMResponseCache:
+    """Size-bounded LRU cache of LLM response text with a time-to-live."""
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+    DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.store = DiskCache(os.path.join(cache_dir, "llm_responses.sqlite3"), max_bytes)
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'errors': 0}
+
+    @classmethod
+    def from_settings(cls) -> Optional["LLMResponseCache"]:
+        """Cache configured by LLM_CACHE_* settings, or None when LLM_CACHE_DIR is empty."""
+        cache_dir = str(config('LLM_CACHE_DIR', default=os.path.join('media', 'cache', 'llm_responses')))
+        if not cache_dir:
+            return None
+        return cls(
+            cache_dir,
+            max_bytes=config('LLM_CACHE_MAX_MB', default=256, cast=int) * 1024 * 1024,
+            ttl_seconds=config('LLM_CACHE_TTL_HOURS', default=cls.DEFAULT_TTL_SECONDS / 3600, cast=float) * 3600
+        )
+
+    def key_for(self, provider: str, data: Dict[str, Any]) -> str:
+        return request_key(provider, data)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response text, or None on a miss, an expired entry or a read error."""
+        try:
+            payload = self.store.get(key)
+            entry = json.loads(decompress_bytes(payload)) if payload is not None else None
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"LLM cache read failed for {key}: {e}")
+            self._count('errors')
+            return None
+        if entry is None:
+            self._count('misses')
+            return None
+        if self.ttl_seconds and time.time() - entry['created_at'] > self.ttl_seconds:
+            self._count('expired')
+            try:
+                self.store.delete(key)
+            except sqlite3.Error:
+                pass
+            return None
+        self._count('hits')
+        return entry['response']
+
+    def set(self, key: str, response: str) -> None:
+        payload = json.dumps({'created_at': time.time(), 'response': response}).encode('utf-8')
+        try:
+            self.store.set(key, compress_bytes(payload))
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed for {key}: {e}")
+            self._count('errors')
+            return
+        self._count('writes')
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters['hits'] + counters['misses'] + counters['expired']
+        return {**counters, 'hit_ratio': counters['hits'] / lookups if lookups else 0.0}
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_configured = False
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """The process-wide response cache, created from settings on first use (None when disabled)."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        if not _cache_configured:
+            _cache = LLMResponseCache.from_settings()
+            _cache_configured = True
+        return _cache
+
+
+def configure_llm_cache(cache: Optional[LLMResponseCache]) -> None:
+    """Replace the process-wide response cache; None disables caching."""
+    global _cache, _cache_configured
+    with _cache_lock:
+        _cache = cache
+        _cache_configured = True
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and hit ratio of this process's response cache (empty when disabled)."""
+    with _cache_lock:
+        cache = _cache
+    return cache.stats() if cache is not None else {}
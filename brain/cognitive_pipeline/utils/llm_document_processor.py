@@ -15,11 +15,20 @@ Architecture:
 
 import logging
 import time
-from typing import List, Dict, Any, Optional
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 import json
 
-from .document_processor import DocumentProcessor, DocumentProcessingError
+from .archive_reader import ArchiveError, open_source
+from .document_processor import DocumentProcessor
+from .file_probe import FileProbe
+from .llm_cache import llm_cache_stats
+from .llm_http import llm_http_stats
+from .llm_utils import llm_coalescing_stats
+from .metrics import LatencyHistogram
+from .parse_cache import ParseCache
 from brain.cognitive_pipeline.schema import ParsedDocument, DocumentMetadata, DocumentParsingValidationResult
 
 from brain.prompts.document_analysis_prompts import DOCUMENT_ANALYSIS_PROMPT, FALLBACK_ANALYSIS_PROMPT
@@ -30,79 +39,175 @@ logger = logging.getLogger(__name__)
 class LLMDocumentProcessor(DocumentProcessor):
     """
     Hybrid document processor combining traditional parsing with LLM intelligence.
+    
+    The whole file list flows through one batch pipeline: traditional parsing
+    (the DocumentProcessor base, in parallel) -> gating -> LLM enhancement for
+    complex documents or LLM fallback for failed ones. All stages share
+    self.stats, and per-stage latencies are kept in histograms.
     """
     
-    def __init__(self, anthropic_api_key: Optional[str] = None, openai_api_key: Optional[str] = None):
-        super().__init__()
-        self.traditional_processor = DocumentProcessor()
+    LLM_ENHANCEMENT_CONCURRENCY = 4  # In-flight LLM requests per batch
+    HYBRID_CACHE_NAMESPACE = "hybrid_llm"
+    PIPELINE_STAGES = ("parse", "gating", "enhancement", "fallback")
+    
+    def __init__(self, anthropic_api_key: Optional[str] = None, openai_api_key: Optional[str] = None,
+                 max_workers: Optional[int] = None, cache: Optional[ParseCache] = None,
+                 time_budget_seconds: Optional[float] = None, memory_budget_bytes: Optional[int] = None,
+                 llm_concurrency: Optional[int] = None, incremental: bool = True,
+                 organization_id: Optional[str] = None):
+        super().__init__(max_workers=max_workers, cache=cache,
+                         time_budget_seconds=time_budget_seconds, memory_budget_bytes=memory_budget_bytes,
+                         incremental=incremental, organization_id=organization_id)
         self.anthropic_api_key = anthropic_api_key
         self.openai_api_key = openai_api_key
-        # Processing statistics
-        self.stats = {
+        self.llm_concurrency = max(1, llm_concurrency or self.LLM_ENHANCEMENT_CONCURRENCY)
+        # Hybrid counters sit next to the traditional parsing ones; cache_hits/misses
+        # count the traditional parse cache, enhanced_cache_* the final hybrid results
+        self.stats.update({
             "traditional_success": 0,
             "traditional_failures": 0,
             "llm_enhancements": 0,
             "llm_fallbacks": 0,
-            "total_processing_time_ms": 0.0
-        }
+            "total_processing_time_ms": 0.0,
+            "enhanced_cache_hits": 0,
+            "enhanced_cache_misses": 0
+        })
+        self.stage_latency = {stage: LatencyHistogram() for stage in self.PIPELINE_STAGES}
     
-    def process_files(self, file_paths: List[str]) -> List[ParsedDocument]:
+    def _iter_processed(self, file_paths: List[str], probes: Optional[Dict[str, FileProbe]] = None) -> Iterator[tuple[int, ParsedDocument]]:
         """
-        Process multiple files using hybrid approach.
+        Run the batch through the hybrid pipeline, yielding each document as it completes.
         
         Strategy:
-        1. Try traditional parsing first
-        2. Enhance successful results with LLM
-        3. Use LLM fallback for failures
+        1. Traditional parsing of every uncached file (base class, in parallel)
+        2. Gating: decide per parsed document whether it needs the LLM
+        3. LLM enhancement of complex documents, or LLM fallback for failed
+           ones, with up to llm_concurrency requests in flight while the rest
+           of the batch is still parsing
+        
+        Documents that skip the LLM are yielded as soon as they are parsed;
+        the others as soon as their LLM request returns.
         """
         start_time = time.time()
-        documents = []
-        
-        for file_path in file_paths:
-            try:
-                doc = self._process_single_file(file_path)
-                documents.append(doc)
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                # Create error document
-                error_doc = self._create_error_document(file_path, str(e))
-                documents.append(error_doc)
-        
-        # Update stats
-        processing_time = (time.time() - start_time) * 1000
-        self.stats["total_processing_time_ms"] += processing_time
+        probes = dict(probes or {})
+        cached_docs, cache_keys = self._lookup_cache(file_paths, probes)
+        executor = ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="llm-enhance")
+        pending: Dict[Future, tuple[int, str, ParsedDocument]] = {}
         
-        return documents
-    
-    def _process_single_file(self, file_path: str) -> ParsedDocument:
-        """Process a single file using hybrid approach."""
-        # Step 1: Try traditional parsing
         try:
-            traditional_doc = self.traditional_processor.process_files([file_path])[0]
-            self.stats["traditional_success"] += 1
-            
-            # Step 2: Enhance with LLM if available and content is complex
-            if self._should_enhance_with_llm(traditional_doc):
-                enhanced_doc = self._enhance_with_llm(traditional_doc)
-                if enhanced_doc:
-                    self.stats["llm_enhancements"] += 1
-                    return enhanced_doc
+            for idx, file_path in enumerate(file_paths):
+                if file_path in cached_docs:
+                    yield idx, cached_docs[file_path]
             
-            return traditional_doc
+            to_parse = [idx for idx, file_path in enumerate(file_paths) if file_path not in cached_docs]
+            parsed = super()._iter_processed([file_paths[idx] for idx in to_parse], probes)
+            for parse_idx, traditional_doc in parsed:
+                idx = to_parse[parse_idx]
+                self.stage_latency["parse"].observe(self.stats["file_timings_ms"].get(file_paths[idx], 0))
+                
+                gate_start = time.perf_counter()
+                stage = self._gate(traditional_doc)
+                self.stage_latency["gating"].observe((time.perf_counter() - gate_start) * 1000)
+                
+                if stage == "enhancement":
+                    future = executor.submit(_timed, self._request_llm_enhancement, traditional_doc)
+                    pending[future] = (idx, stage, traditional_doc)
+                elif stage == "fallback":
+                    future = executor.submit(_timed, self._llm_fallback_processing, traditional_doc.file_path)
+                    pending[future] = (idx, stage, traditional_doc)
+                else:
+                    yield idx, self._finish_document(traditional_doc, traditional_doc, cache_keys)
+                
+                # Hand over LLM results that returned while this file was parsing
+                for future in [f for f in pending if f.done()]:
+                    idx, stage, traditional_doc = pending.pop(future)
+                    yield idx, self._complete_llm_stage(stage, traditional_doc, future, cache_keys)
             
-        except DocumentProcessingError as e:
+            for future in as_completed(list(pending)):
+                idx, stage, traditional_doc = pending.pop(future)
+                yield idx, self._complete_llm_stage(stage, traditional_doc, future, cache_keys)
+        finally:
+            # Consumer may stop early; don't send requests nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+            # Update stats
+            processing_time = (time.time() - start_time) * 1000
+            self.stats["total_processing_time_ms"] += processing_time
+    
+    def _gate(self, traditional_doc: ParsedDocument) -> Optional[str]:
+        """Pick the LLM stage a traditionally parsed document goes through, or None to keep it as is."""
+        if traditional_doc.file_type == "failed":
             self.stats["traditional_failures"] += 1
-            logger.warning(f"Traditional parsing failed for {file_path}: {e}")
-            
-            # Step 3: LLM fallback for failed traditional parsing
-            if self._has_llm_capability():
-                fallback_doc = self._llm_fallback_processing(file_path)
-                if fallback_doc:
-                    self.stats["llm_fallbacks"] += 1
-                    return fallback_doc
-            
-            # If all else fails, re-raise the error
-            raise
+            return "fallback" if self._has_llm_capability() else None
+        self.stats["traditional_success"] += 1
+        return "enhancement" if self._should_enhance_with_llm(traditional_doc) else None
+    
+    def _complete_llm_stage(self, stage: str, traditional_doc: ParsedDocument, future: Future,
+                            cache_keys: Dict[str, str]) -> ParsedDocument:
+        """Apply a finished LLM request; the traditional result stands if it failed."""
+        doc = traditional_doc
+        try:
+            result, elapsed_ms = future.result()
+            self.stage_latency[stage].observe(elapsed_ms)
+            if result and stage == "enhancement":
+                doc = self._apply_llm_enhancement(traditional_doc, result)
+                self.stats["llm_enhancements"] += 1
+            elif result and stage == "fallback":
+                doc = result
+                self.stats["llm_fallbacks"] += 1
+        except Exception as e:
+            logger.error(f"LLM {stage} failed for {traditional_doc.file_path}: {e}")
+        return self._finish_document(traditional_doc, doc, cache_keys)
+    
+    def _finish_document(self, traditional_doc: ParsedDocument, doc: ParsedDocument,
+                         cache_keys: Dict[str, str]) -> ParsedDocument:
+        """Store a final hybrid result in the parse cache when it is worth keeping."""
+        key = cache_keys.get(doc.file_path)
+        if key and self._is_cacheable(traditional_doc, doc):
+            self._record_cache_write(*self.cache.set(key, doc))
+        return doc
+    
+    def _lookup_cache(self, file_paths: List[str],
+                      probes: Dict[str, FileProbe]) -> tuple[Dict[str, ParsedDocument], Dict[str, str]]:
+        """
+        Return (cached hybrid results, cache keys for the misses) for the given files.
+        
+        Each file's content digest is left on its probe in probes, so the traditional
+        parse of a miss builds its cache key without reading the file again. Hits are
+        counted in the same per-file stats as parsed files.
+        """
+        cached_docs: Dict[str, ParsedDocument] = {}
+        cache_keys: Dict[str, str] = {}
+        if self.cache is None:
+            return cached_docs, cache_keys
+        
+        for file_path in file_paths:
+            start_time = time.perf_counter()
+            try:
+                digest = self.cache.content_digest(file_path)
+            except (OSError, ArchiveError, zipfile.BadZipFile):
+                continue  # Traditional parsing reports unreadable files and bundle members
+            key = self.cache.key_for(file_path, self.HYBRID_CACHE_NAMESPACE, digest)
+            cached = self.cache.get(key, file_path)
+            if cached is not None:
+                self.stats["enhanced_cache_hits"] += 1
+                self.stats["files_processed"] += 1
+                self.stats["total_pages"] += cached.metadata.details.get("page_count", 0)
+                self.stats["total_tables"] += len(cached.tables)
+                self.stats["file_timings_ms"][file_path] = int((time.perf_counter() - start_time) * 1000)
+                cached_docs[file_path] = cached
+            else:
+                self.stats["enhanced_cache_misses"] += 1
+                cache_keys[file_path] = key
+                probe = probes.get(file_path) or FileProbe.probe(file_path)
+                probe.content_digest = digest
+                probes[file_path] = probe
+        return cached_docs, cache_keys
+    
+    def _is_cacheable(self, traditional_doc: ParsedDocument, doc: ParsedDocument) -> bool:
+        """Skip caching failures, partial parses and documents whose LLM enhancement failed, so they are retried."""
+        if traditional_doc.file_type == "failed" or traditional_doc.validation_result.partial:
+            return False
+        return doc is not traditional_doc or not self._should_enhance_with_llm(traditional_doc)
     
     def _should_enhance_with_llm(self, doc: ParsedDocument) -> bool:
         """Determine if document should be enhanced with LLM processing."""
@@ -130,24 +235,10 @@ class LLMDocumentProcessor(DocumentProcessor):
             doc.validation_result.quality_score < 0.8  # Low traditional confidence
         )
     
-    def _enhance_with_llm(self, doc: ParsedDocument) -> Optional[ParsedDocument]:
-        """Enhance traditional parsing results with LLM understanding."""
-        try:
-            # Prepare content for LLM
-            content_summary = self._prepare_content_for_llm(doc)
-            
-            # Get LLM enhancement
-            enhancement = self._get_llm_content_analysis(content_summary, doc.file_type)
-            
-            if enhancement:
-                # Create enhanced document
-                enhanced_doc = self._apply_llm_enhancement(doc, enhancement)
-                return enhanced_doc
-            
-        except Exception as e:
-            logger.error(f"LLM enhancement failed for {doc.file_path}: {e}")
-        
-        return None
+    def _request_llm_enhancement(self, doc: ParsedDocument) -> Optional[Dict[str, Any]]:
+        """Prepare the document summary and fetch its LLM content analysis; safe to run in a thread."""
+        content_summary = self._prepare_content_for_llm(doc)
+        return self._get_llm_content_analysis(content_summary, doc.file_type)
     
     def _llm_fallback_processing(self, file_path: str) -> Optional[ParsedDocument]:
         """Use LLM as fallback when traditional parsing fails."""
@@ -160,8 +251,8 @@ class LLMDocumentProcessor(DocumentProcessor):
             # Read raw file content if possible
             try:
                 if file_path_obj.suffix.lower() == '.txt':
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        raw_content = f.read()
+                    with open_source(file_path) as f:
+                        raw_content = f.read().decode('utf-8', errors='ignore')
                 else:
                     # For non-text files, create a placeholder
                     raw_content = f"[LLM FALLBACK] Unable to parse {file_path_obj.name} with traditional methods."
@@ -298,35 +389,6 @@ class LLMDocumentProcessor(DocumentProcessor):
             validation_result=validation
         )
     
-    def _create_error_document(self, file_path: str, error_message: str) -> ParsedDocument:
-        """Create error document for completely failed processing."""
-        file_path_obj = Path(file_path)
-        
-        metadata = DocumentMetadata(
-            file_path=file_path,
-            file_size=file_path_obj.stat().st_size if file_path_obj.exists() else 0,
-            file_type=file_path_obj.suffix.lstrip('.').lower(),
-            quality_score=0.0
-        )
-        
-        validation = DocumentParsingValidationResult(
-            is_valid=False,
-            quality_score=0.0,
-            errors=[f"Processing failed: {error_message}"],
-            warnings=[],
-            processing_method="failed",
-            details={"processing_failed": True, "error_message": error_message}
-        )
-        
-        return ParsedDocument(
-            file_path=file_path,
-            file_type=metadata.file_type,
-            content=f"[ERROR] Failed to process file: {error_message}",
-            tables=[],
-            metadata=metadata,
-            validation_result=validation
-        )
-    
     def _has_llm_capability(self) -> bool:
         """Check if LLM processing is available."""
         return self.anthropic_api_key is not None or self.openai_api_key is not None
@@ -334,12 +396,25 @@ class LLMDocumentProcessor(DocumentProcessor):
     def get_processing_stats(self) -> Dict[str, Any]:
         """Get processing statistics."""
         total_processed = self.stats["traditional_success"] + self.stats["traditional_failures"]
+        enhanced_lookups = self.stats["enhanced_cache_hits"] + self.stats["enhanced_cache_misses"]
         
         return {
-            **self.stats,
+            **super().get_processing_stats(),
             "total_files_processed": total_processed,
             "traditional_success_rate": self.stats["traditional_success"] / max(total_processed, 1),
             "enhancement_rate": self.stats["llm_enhancements"] / max(self.stats["traditional_success"], 1),
             "fallback_rate": self.stats["llm_fallbacks"] / max(self.stats["traditional_failures"], 1),
-            "average_processing_time_ms": self.stats["total_processing_time_ms"] / max(total_processed, 1)
+            "average_processing_time_ms": self.stats["total_processing_time_ms"] / max(total_processed, 1),
+            "enhanced_cache_hit_rate": self.stats["enhanced_cache_hits"] / enhanced_lookups if enhanced_lookups else 0.0,
+            "stage_latency_ms": {stage: histogram.to_dict() for stage, histogram in self.stage_latency.items()},
+            "llm_http": llm_http_stats(),
+            "llm_cache": llm_cache_stats(),
+            "llm_coalescing": llm_coalescing_stats()
         }
+
+
+def _timed(fn, *args) -> tuple[Any, float]:
+    """Thread-pool entry point: call fn and return (result, elapsed milliseconds)."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
@@ -0,0 +1,334 @@
+# brain/cognitive_pipeline/utils/llm_gateway.py
+
+"""
+Async LLM gateway: many prompts in flight at once, within provider limits.
+
+All calls run on one background event loop per process, so every caller
+(extraction batches, prefetch threads) shares the same per-provider limits:
+a concurrency cap (semaphore and httpx connection pool), a requests-per-minute
+token bucket and a tokens-per-minute token bucket. Token use is reserved up
+front from an estimate (prompt characters / 4 plus max_tokens) and the unused
+part is returned once the response reports actual usage. Requests answered
+by the response cache (llm_cache) skip the limits entirely, and identical
+requests already in flight share that call's result. Results come back in
+input order; a failed prompt yields its exception instead of raising, so one
+bad call doesn't discard the rest of a batch.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import httpx
+from decouple import config
+
+from .llm_cache import LLMResponseCache, get_llm_cache, request_key
+from .llm_http import LLMHttpClient
+from .llm_utils import (
+    ANTHROPIC_DEFAULT_MODEL, OPENAI_DEFAULT_MODEL, anthropic_content, anthropic_request, anthropic_usage_tokens,
+    openai_content, openai_request, openai_usage_tokens
+)
+from .metrics import LatencyHistogram
+from .single_flight import AsyncSingleFlight
+
+CHARS_PER_TOKEN = 4
+
+# provider -> (request builder, response content, response token usage, default model)
+PROVIDERS: Dict[str, tuple] = {
+    "anthropic": (anthropic_request, anthropic_content, anthropic_usage_tokens, ANTHROPIC_DEFAULT_MODEL),
+    "openai": (openai_request, openai_content, openai_usage_tokens, OPENAI_DEFAULT_MODEL),
+}
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Upper-bound token reservation for a call: prompt tokens (by characters) plus the completion limit."""
+    return len(prompt) // CHARS_PER_TOKEN + 1 + max_tokens
+
+
+class TokenBucket:
+    """Continuously refilled budget of per_minute units; acquire waits until enough have accrued."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until amount can be taken (0 when it can be taken now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(amount - self.tokens, 0.0) / self.rate
+
+    async def acquire(self, amount: float) -> float:
+        """Take amount (capped at capacity so oversize requests still proceed); returns seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            delay = self.delay_for(amount)
+            if delay <= 0:
+                self.tokens -= amount
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class ProviderLimits:
+    """Concurrency cap and per-minute request/token budgets of one provider (0 disables a budget)."""
+
+    MAX_CONCURRENCY = 8
+    REQUESTS_PER_MINUTE = 500
+    TOKENS_PER_MINUTE = 0
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE):
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    @classmethod
+    def from_settings(cls, provider: str) -> "ProviderLimits":
+        prefix = f"LLM_{provider.upper()}"
+        return cls(
+            max_concurrency=config(f'{prefix}_MAX_CONCURRENCY', default=cls.MAX_CONCURRENCY, cast=int),
+            requests_per_minute=config(f'{prefix}_REQUESTS_PER_MINUTE', default=cls.REQUESTS_PER_MINUTE, cast=float),
+            tokens_per_minute=config(f'{prefix}_TOKENS_PER_MINUTE', default=cls.TOKENS_PER_MINUTE, cast=float)
+        )
+
+
+class LLMRequest:
+    """One prompt for one provider."""
+
+    def __init__(self, provider: str, prompt: str, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_tokens: int = 512):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        self.provider = provider
+        self.prompt = prompt
+        self.api_key = api_key
+        self.model = model or PROVIDERS[provider][3]
+        self.max_tokens = max_tokens
+
+
+class _ProviderState:
+    """Loop-bound limiters, HTTP client and counters of one provider."""
+
+    def __init__(self, limits: ProviderLimits, timeout: httpx.Timeout):
+        self.limits = limits
+        self.semaphore = asyncio.Semaphore(limits.max_concurrency)
+        self.requests_bucket = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self.tokens_bucket = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        pool = httpx.Limits(max_connections=limits.max_concurrency, max_keepalive_connections=limits.max_concurrency)
+        self.client = httpx.AsyncClient(limits=pool, timeout=timeout)
+        self.in_flight = AsyncSingleFlight()
+        self.latency = LatencyHistogram()
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+            'rate_limit_wait_ms': 0.0,
+            'tokens_reserved': 0,
+            'tokens_used': 0
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **{key: value for key, value in self.stats.items() if key != 'in_flight'},
+            'rate_limit_wait_ms': round(self.stats['rate_limit_wait_ms'], 3),
+            'coalesced': self.in_flight.counters['coalesced'],
+            'max_concurrency': self.limits.max_concurrency,
+            'latency': self.latency.to_dict()
+        }
+
+
+class LLMGateway:
+    """Runs LLM prompts concurrently on a background event loop under per-provider limits."""
+
+    def __init__(self, limits: Optional[Dict[str, ProviderLimits]] = None,
+                 connect_timeout: float = LLMHttpClient.CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = LLMHttpClient.READ_TIMEOUT_SECONDS,
+                 cache: Optional[LLMResponseCache] = None):
+        """
+        Args:
+            limits: Per-provider limits; providers not listed use ProviderLimits.from_settings.
+            connect_timeout, read_timeout: httpx timeouts of every call, in seconds.
+            cache: Response cache consulted before, and filled after, each call.
+        """
+        self.limits = dict(limits or {})
+        self.cache = cache
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._providers: Dict[str, _ProviderState] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "LLMGateway":
+        return cls(
+            connect_timeout=config('LLM_HTTP_CONNECT_TIMEOUT_SECONDS', default=LLMHttpClient.CONNECT_TIMEOUT_SECONDS, cast=float),
+            read_timeout=config('LLM_HTTP_READ_TIMEOUT_SECONDS', default=LLMHttpClient.READ_TIMEOUT_SECONDS, cast=float),
+            cache=get_llm_cache()
+        )
+
+    def complete_all(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        """Response text of every request, in input order; failed requests yield their exception."""
+        if not requests:
+            return []
+        return asyncio.run_coroutine_threadsafe(self._complete_all(requests), self._ensure_loop()).result()
+
+    async def acomplete_all(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        """complete_all for callers already inside an event loop."""
+        if not requests:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._complete_all(requests), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def complete(self, request: LLMRequest) -> str:
+        """Response text of one request; raises on failure."""
+        result = self.complete_all([request])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {provider: state.to_dict() for provider, state in list(self._providers.items())}
+
+    def close(self) -> None:
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        # Stats stay readable after close; the next call starts fresh providers on a new loop
+        clients = [state.client for state in self._providers.values()]
+
+        async def close_clients():
+            await asyncio.gather(*(client.aclose() for client in clients))
+
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop_pid != os.getpid():
+                # A loop inherited through fork has no thread running it in this process
+                self._loop = asyncio.new_event_loop()
+                self._loop_pid = os.getpid()
+                self._providers = {}
+                threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True).start()
+            return self._loop
+
+    def _provider(self, provider: str) -> _ProviderState:
+        state = self._providers.get(provider)
+        if state is None:
+            limits = self.limits.get(provider) or ProviderLimits.from_settings(provider)
+            state = self._providers[provider] = _ProviderState(limits, self.timeout)
+        return state
+
+    async def _complete_all(self, requests: List[LLMRequest]) -> List[Union[str, Exception]]:
+        return await asyncio.gather(*(self._complete(request) for request in requests), return_exceptions=True)
+
+    async def _complete(self, request: LLMRequest) -> str:
+        build_request = PROVIDERS[request.provider][0]
+        state = self._provider(request.provider)
+        url, headers, data = build_request(request.prompt, request.api_key, request.model, request.max_tokens)
+        key = request_key(request.provider, data)
+        return await state.in_flight.do(key, lambda: self._lookup_or_call(request, state, key, url, headers, data))
+
+    async def _lookup_or_call(self, request: LLMRequest, state: _ProviderState, key: str, url: str,
+                              headers: Dict[str, str], data: Dict[str, Any]) -> str:
+        _, read_content, read_usage, _ = PROVIDERS[request.provider]
+        if self.cache is not None:
+            # SQLite lookups run off the loop so they don't stall other calls
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                state.stats['cache_hits'] += 1
+                return cached
+        reserved = estimate_tokens(request.prompt, request.max_tokens)
+
+        # Wait for rate budget before taking a concurrency slot, so waiting doesn't hold one
+        waited = 0.0
+        if state.requests_bucket is not None:
+            waited += await state.requests_bucket.acquire(1)
+        if state.tokens_bucket is not None:
+            waited += await state.tokens_bucket.acquire(reserved)
+        state.stats['rate_limit_wait_ms'] += waited * 1000
+        state.stats['tokens_reserved'] += reserved
+
+        async with state.semaphore:
+            state.stats['requests'] += 1
+            state.stats['in_flight'] += 1
+            state.stats['max_in_flight'] = max(state.stats['max_in_flight'], state.stats['in_flight'])
+            start = time.perf_counter()
+            try:
+                response = await state.client.post(url, headers=headers, json=data)
+                response.raise_for_status()
+                result = response.json()
+                content = read_content(result)
+            except Exception:
+                state.stats['errors'] += 1
+                raise
+            finally:
+                state.stats['in_flight'] -= 1
+                state.latency.observe((time.perf_counter() - start) * 1000)
+
+        used = read_usage(result)
+        if used is not None:
+            state.stats['tokens_used'] += used
+            if state.tokens_bucket is not None and used < reserved:
+                state.tokens_bucket.refund(reserved - used)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, key, content)
+        return content
+
+
+class GatewayLLMFn:
+    """
+    llm_fn for one provider backed by the gateway.
+
+    Callable with a single prompt like llm_fn_openai; batch() sends many
+    prompts concurrently and is picked up by llm_extract_entities.
+    """
+
+    def __init__(self, provider: str, api_key: Optional[str] = None, model: Optional[str] = None,
+                 max_tokens: int = 512, gateway: Optional[LLMGateway] = None):
+        self.provider = provider
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.gateway = gateway
+
+    def _request(self, prompt: str) -> LLMRequest:
+        return LLMRequest(self.provider, prompt, self.api_key, self.model, self.max_tokens)
+
+    def __call__(self, prompt: str) -> str:
+        return (self.gateway or get_llm_gateway()).complete(self._request(prompt))
+
+    def batch(self, prompts: List[str]) -> List[Union[str, Exception]]:
+        return (self.gateway or get_llm_gateway()).complete_all([self._request(prompt) for prompt in prompts])
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """The process-wide gateway, created from settings on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway.from_settings()
+        return _gateway
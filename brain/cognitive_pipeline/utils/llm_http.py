@@ -0,0 +1,119 @@
+# brain/cognitive_pipeline/utils/llm_http.py
+
+"""
+Pooled, keep-alive HTTP clients for LLM provider APIs.
+
+Each process holds one requests.Session per provider, so consecutive prompts
+reuse an open TLS connection instead of handshaking again. Connect and read
+timeouts and the pool size come from settings. A session is never shared
+across a fork: a child process that asks for a client gets a fresh one.
+Connection reuse is read from urllib3's per-host pool counters.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from decouple import config
+from requests.adapters import HTTPAdapter
+
+from .metrics import LatencyHistogram
+
+
+class LLMHttpClient:
+    """Keep-alive session for one LLM provider with request latency and connection reuse stats."""
+
+    CONNECT_TIMEOUT_SECONDS = 5.0
+    READ_TIMEOUT_SECONDS = 60.0
+    POOL_SIZE = 10  # Connections kept open per host; match the number of threads calling the provider
+
+    def __init__(self, provider: str, connect_timeout: float = CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = READ_TIMEOUT_SECONDS, pool_size: int = POOL_SIZE):
+        self.provider = provider
+        self.timeout = (connect_timeout, read_timeout)
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, provider: str) -> "LLMHttpClient":
+        return cls(
+            provider,
+            connect_timeout=config('LLM_HTTP_CONNECT_TIMEOUT_SECONDS', default=cls.CONNECT_TIMEOUT_SECONDS, cast=float),
+            read_timeout=config('LLM_HTTP_READ_TIMEOUT_SECONDS', default=cls.READ_TIMEOUT_SECONDS, cast=float),
+            pool_size=config('LLM_HTTP_POOL_SIZE', default=cls.POOL_SIZE, cast=int)
+        )
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        """session.post with the configured (connect, read) timeout unless one is given."""
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.latency.observe((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        pools = self.adapter.poolmanager.pools
+        requests_sent = 0
+        connections_opened = 0
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+        with self._lock:
+            return {
+                "requests": requests_sent,
+                "connections_opened": connections_opened,
+                "connections_reused": max(requests_sent - connections_opened, 0),
+                "reuse_ratio": 1 - connections_opened / requests_sent if requests_sent else 0.0,
+                "errors": self.errors,
+                "latency": self.latency.to_dict()
+            }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, LLMHttpClient] = {}
+_clients_pid: Optional[int] = None
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(provider: str) -> LLMHttpClient:
+    """The calling process's shared client for provider, created on first use."""
+    global _clients_pid
+    with _clients_lock:
+        if _clients_pid != os.getpid():
+            # Inherited from the parent through fork: its sockets belong to the parent
+            _clients.clear()
+            _clients_pid = os.getpid()
+        client = _clients.get(provider)
+        if client is None:
+            client = _clients[provider] = LLMHttpClient.from_settings(provider)
+        return client
+
+
+def llm_http_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection reuse and latency stats of this process's provider clients."""
+    with _clients_lock:
+        clients = dict(_clients) if _clients_pid == os.getpid() else {}
+    return {provider: client.stats() for provider, client in clients.items()}
@@ -1,23 +1,34 @@
 # brain/cognitive_pipeline/utils/llm_utils.py
 
 import os
-import requests
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
-def llm_fn_anthropic(prompt: str, api_key: Optional[str] = None, model: str = "claude-3-sonnet-20240229", max_tokens: int = 512) -> str:
-    """
-    Calls Anthropic Claude API and returns the raw string response.
-    Expects the LLM to return a JSON string.
-    """
-    import requests
+from .llm_cache import get_llm_cache, request_key
+from .llm_http import get_llm_client
+from .single_flight import SingleFlight
+
+# Overridable for API-compatible gateways and proxies
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com/v1")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+ANTHROPIC_DEFAULT_MODEL = "claude-3-sonnet-20240229"
+OPENAI_DEFAULT_MODEL = "gpt-4"
+
+# Concurrent runs often send byte-identical prompts (same org, same upload)
+_in_flight = SingleFlight()
+
+
+def anthropic_headers(api_key: Optional[str] = None) -> Dict[str, str]:
     api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY not set")
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
+    return {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+
+
+def anthropic_request(prompt: str, api_key: Optional[str] = None, model: str = ANTHROPIC_DEFAULT_MODEL,
+                      max_tokens: int = 512) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """(url, headers, JSON body) of an Anthropic Messages API call."""
+    headers = {**anthropic_headers(api_key), "content-type": "application/json"}
     data = {
         "model": model,
         "max_tokens": max_tokens,
@@ -25,9 +36,10 @@ def llm_fn_anthropic(prompt: str, api_key: Optional[str] = None, model: str = "c
             {"role": "user", "content": prompt}
         ]
     }
-    resp = requests.post("https://api.anthropic.com/v1/messages", headers=headers, json=data, timeout=60)
-    resp.raise_for_status()
-    result = resp.json()
+    return f"{ANTHROPIC_BASE_URL}/messages", headers, data
+
+
+def anthropic_content(result: Dict[str, Any]) -> str:
     # Anthropic returns content as a list of message parts
     content = result["content"][0].get("text") if result.get("content") else None
     if not content:
@@ -35,15 +47,24 @@ def llm_fn_anthropic(prompt: str, api_key: Optional[str] = None, model: str = "c
     return content
 
 
-def llm_fn_openai(prompt: str, api_key: Optional[str] = None, model: str = "gpt-4", max_tokens: int = 512) -> str:
-    """
-    Calls OpenAI API (or compatible endpoint) and returns the raw string response.
-    Expects the LLM to return a JSON list of entities.
-    """
+def anthropic_usage_tokens(result: Dict[str, Any]) -> Optional[int]:
+    usage = result.get("usage") or {}
+    if "input_tokens" not in usage:
+        return None
+    return usage["input_tokens"] + usage.get("output_tokens", 0)
+
+
+def openai_headers(api_key: Optional[str] = None) -> Dict[str, str]:
     api_key = api_key or os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY not set")
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def openai_request(prompt: str, api_key: Optional[str] = None, model: str = OPENAI_DEFAULT_MODEL,
+                   max_tokens: int = 512) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """(url, headers, JSON body) of an OpenAI (or compatible) chat completion call."""
+    headers = {**openai_headers(api_key), "Content-Type": "application/json"}
     data = {
         "model": model,
         "messages": [
@@ -53,12 +74,70 @@ def llm_fn_openai(prompt: str, api_key: Optional[str] = None, model: str = "gpt-
         "max_tokens": max_tokens,
         "temperature": 0.0
     }
-    resp = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data, timeout=60)
-    resp.raise_for_status()
-    result = resp.json()
+    return f"{OPENAI_BASE_URL}/chat/completions", headers, data
+
+
+def openai_content(result: Dict[str, Any]) -> str:
     # Extract the assistant's message
-    content = result["choices"][0]["message"]["content"]
-    return content
+    return result["choices"][0]["message"]["content"]
+
+
+def openai_usage_tokens(result: Dict[str, Any]) -> Optional[int]:
+    return (result.get("usage") or {}).get("total_tokens")
+
+
+def cached_completion(provider: str, data: Dict[str, Any], fetch: Callable[[], str]) -> str:
+    """
+    Cached response to the request body data, else fetch() stored in the response cache.
+    Threads sending an identical request while one is in flight wait for and share its result.
+    """
+    key = request_key(provider, data)
+
+    def lookup_or_fetch() -> str:
+        cache = get_llm_cache()
+        content = cache.get(key) if cache is not None else None
+        if content is None:
+            content = fetch()
+            if cache is not None:
+                cache.set(key, content)
+        return content
+
+    return _in_flight.do(key, lookup_or_fetch)
+
+
+def llm_coalescing_stats() -> Dict[str, int]:
+    """Upstream calls made and identical in-flight calls that shared them, in this process."""
+    return _in_flight.stats()
+
+
+def llm_fn_anthropic(prompt: str, api_key: Optional[str] = None, model: str = ANTHROPIC_DEFAULT_MODEL, max_tokens: int = 512) -> str:
+    """
+    Calls Anthropic Claude API and returns the raw string response.
+    Expects the LLM to return a JSON string.
+    """
+    url, headers, data = anthropic_request(prompt, api_key, model, max_tokens)
+
+    def fetch() -> str:
+        resp = get_llm_client("anthropic").post(url, headers=headers, json=data)
+        resp.raise_for_status()
+        return anthropic_content(resp.json())
+
+    return cached_completion("anthropic", data, fetch)
+
+
+def llm_fn_openai(prompt: str, api_key: Optional[str] = None, model: str = OPENAI_DEFAULT_MODEL, max_tokens: int = 512) -> str:
+    """
+    Calls OpenAI API (or compatible endpoint) and returns the raw string response.
+    Expects the LLM to return a JSON list of entities.
+    """
+    url, headers, data = openai_request(prompt, api_key, model, max_tokens)
+
+    def fetch() -> str:
+        resp = get_llm_client("openai").post(url, headers=headers, json=data)
+        resp.raise_for_status()
+        return openai_content(resp.json())
+
+    return cached_completion("openai", data, fetch)
 
 def llm_fn_dummy(prompt: str, *args, **kwargs) -> str:
     """
@@ -0,0 +1,115 @@
+# brain/cognitive_pipeline/utils/parse_cache.py
+
+"""
+Content-addressed cache of ParsedDocument results.
+
+Entries are keyed by an xxh3 hash of the file bytes plus PARSER_VERSION and a
+processor namespace, so byte-identical re-uploads skip parsing entirely no matter
+what the upload was named. Bump PARSER_VERSION whenever parser output changes.
+Documents are stored as zstd-compressed JSON.
+
+Alongside whole documents the cache keeps, per organization and document
+(see incremental_parse.document_identity), the parsed PDF pages / XLSX sheets
+of its latest version keyed by part fingerprint, so an edited re-upload only
+re-parses changed parts. Stored parts are never shared between organizations.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, Optional, Tuple
+
+import pydantic_core
+import xxhash
+
+from brain.cognitive_pipeline.schema import ParsedDocument
+from .archive_reader import open_source
+from .compression import compress_bytes, decompress_bytes
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+PARSER_VERSION = "4"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ParseCache:
+    """Persistent, size-bounded LRU cache of parsed documents."""
+
+    DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512MB
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.store = DiskCache(os.path.join(cache_dir, "parsed_documents.sqlite3"), max_bytes)
+
+    def key_for(self, file_path: str, namespace: str, digest: Optional[str] = None) -> str:
+        """
+        Content hash of the file combined with the parser version and processor namespace.
+
+        digest, when the caller already hashed the file (see FileProbe.content_digest),
+        saves reading it again.
+        """
+        return f"{namespace}:v{PARSER_VERSION}:{digest or self.content_digest(file_path)}"
+
+    @staticmethod
+    def content_digest(file_path: str) -> str:
+        """xxh3-128 hex digest of the file's bytes."""
+        digest = xxhash.xxh3_128()
+        # Bundle members are hashed as they decompress
+        with open_source(file_path) as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, key: str, file_path: str) -> Optional[ParsedDocument]:
+        """Return the cached document re-pointed at file_path, or None on a miss or read error."""
+        try:
+            payload = self.store.get(key)
+            if payload is None:
+                return None
+            document = ParsedDocument.model_validate_json(decompress_bytes(payload))
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Parse cache read failed for {file_path}: {e}")
+            return None
+        # The same bytes may have been uploaded under a different name
+        metadata = document.metadata.model_copy(update={"file_path": file_path})
+        return document.model_copy(update={"file_path": file_path, "metadata": metadata})
+
+    def set(self, key: str, document: ParsedDocument) -> Tuple[int, int]:
+        """Store the document; returns (serialised bytes, stored bytes) for compression telemetry."""
+        payload = document.model_dump_json().encode('utf-8')
+        stored = compress_bytes(payload)
+        try:
+            self.store.set(key, stored)
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache write failed for {document.file_path}: {e}")
+            return 0, 0
+        return len(payload), len(stored)
+
+    def parts_key_for(self, scope: str, document: str, namespace: str) -> str:
+        """Key of the stored parts of the latest version of a document within scope (an organization)."""
+        return f"{namespace}:v{PARSER_VERSION}:parts:{scope}:{document}"
+
+    def get_parts(self, key: str) -> Dict[str, Dict[str, Any]]:
+        """Parsed parts by fingerprint, empty on a miss or read error."""
+        try:
+            payload = self.store.get(key)
+            return json.loads(decompress_bytes(payload)) if payload is not None else {}
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Parse cache parts read failed for {key}: {e}")
+            return {}
+
+    def set_parts(self, key: str, parts: Dict[str, Dict[str, Any]]) -> Tuple[int, int]:
+        """Replace the stored parts; returns (serialised bytes, stored bytes)."""
+        # Same JSON encoding as model_dump_json, so merged parts match cached documents
+        payload = pydantic_core.to_json(parts)
+        stored = compress_bytes(payload)
+        try:
+            self.store.set(key, stored)
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache parts write failed for {key}: {e}")
+            return 0, 0
+        return len(payload), len(stored)
@@ -0,0 +1,56 @@
+# brain/cognitive_pipeline/utils/parsing_budget.py
+
+"""
+Per-file wall-clock and memory limits for DocumentProcessor.
+
+Parsers call ParsingBudget.exceeded() between units of work (PDF pages, DOCX
+body elements, spreadsheet sheets and row batches, text chunks) and stop early
+when it returns True, keeping what they have parsed so far. The checks are
+cooperative: a single unit that never returns (one pathological page) is not
+interrupted, but a file can no longer keep a worker busy page after page.
+"""
+
+import os
+import time
+from typing import Optional
+
+
+class ParsingBudget:
+    """Deadline and resident-memory growth limit for parsing one file."""
+
+    def __init__(self, max_seconds: Optional[float] = None, max_memory_bytes: Optional[int] = None):
+        self.max_seconds = max_seconds
+        self.max_memory_bytes = max_memory_bytes
+        # Wall-clock rather than monotonic so the deadline means the same thing in shard processes
+        self.deadline = time.time() + max_seconds if max_seconds else None
+        self.baseline_rss = current_rss_bytes() if max_memory_bytes else None
+        self.exceeded_reason: Optional[str] = None
+
+    def exceeded(self) -> bool:
+        """True once the deadline has passed or memory grew past the limit; stays True afterwards."""
+        if self.exceeded_reason is not None:
+            return True
+        if self.deadline is not None and time.time() > self.deadline:
+            self.exceeded_reason = f"time budget of {self.max_seconds:g}s exceeded"
+        elif self.max_memory_bytes and self.baseline_rss is not None:
+            rss = current_rss_bytes()
+            if rss is not None and rss - self.baseline_rss > self.max_memory_bytes:
+                self.exceeded_reason = f"memory budget of {self.max_memory_bytes // (1024 * 1024)}MB exceeded"
+        return self.exceeded_reason is not None
+
+    def rebased(self) -> "ParsingBudget":
+        """Copy for use in another process: same deadline, memory measured from that process's RSS."""
+        budget = ParsingBudget(max_memory_bytes=self.max_memory_bytes)
+        budget.max_seconds = self.max_seconds
+        budget.deadline = self.deadline
+        return budget
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
@@ -0,0 +1,92 @@
+# brain/cognitive_pipeline/utils/simhash.py
+
+"""
+64-bit SimHash fingerprints for near-duplicate document detection.
+
+Documents that differ in a few edits ("v3_final" vs "v3_final_2") get
+fingerprints a few bits apart, unlike exact content hashes. Fingerprints are
+split into SIMHASH_BANDS 16-bit bands: two fingerprints within
+SIMHASH_BANDS - 1 bits of each other must agree on at least one band, so an
+indexed equality lookup on the bands finds every candidate.
+"""
+
+import re
+import sys
+from array import array
+from itertools import islice
+from typing import Iterator, List
+
+import xxhash
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+NEAR_DUPLICATE_MAX_DISTANCE = SIMHASH_BANDS - 1
+SHINGLE_SIZE = 3
+# Tokens hashed and counted at a time; memory stays bounded by this, not by the text
+TOKEN_BATCH_SIZE = 8192
+
+TOKEN_RE = re.compile(r'\w+')
+# BIT_TABLES[m] maps a byte to 1 if its m-th most significant bit is set, else 0
+BIT_TABLES = [bytes((value >> (7 - m)) & 1 for value in range(256)) for m in range(8)]
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """SimHash of the word shingles of text, as an unsigned 64-bit int (0 for empty text)."""
+    counts = [0] * SIMHASH_BITS  # Set bits per position, most significant first
+    total = 0
+    for hashes in _shingle_hash_batches(text, shingle_size):
+        total += len(hashes)
+        packed = array('Q', hashes)
+        if sys.byteorder == 'little':
+            packed.byteswap()
+        data = packed.tobytes()
+        # Byte lane k holds bits 8k..8k+7 (from the top) of every hash; translate/count run in C
+        for k in range(8):
+            lane = data[k::8]
+            for m in range(8):
+                counts[k * 8 + m] += lane.translate(BIT_TABLES[m]).count(1)
+    threshold = total / 2
+    fingerprint = 0
+    for count in counts:
+        fingerprint = (fingerprint << 1) | (count > threshold)
+    return fingerprint
+
+
+def _shingle_hash_batches(text: str, shingle_size: int) -> Iterator[List[int]]:
+    """xxh3 hashes of the text's word shingles, TOKEN_BATCH_SIZE tokens at a time."""
+    tokens = map(re.Match.group, TOKEN_RE.finditer(text.lower()))
+    carry: List[str] = []  # Last shingle_size - 1 tokens, which start shingles of the next batch
+    produced = False
+    while True:
+        batch = list(islice(tokens, TOKEN_BATCH_SIZE))
+        if not batch:
+            break
+        window = carry + batch
+        if len(window) >= shingle_size:
+            shingles = map(" ".join, zip(*(window[i:] for i in range(shingle_size))))
+            yield list(map(xxhash.xxh3_64_intdigest, shingles))
+            produced = True
+        carry = window[max(0, len(window) - shingle_size + 1):] if shingle_size > 1 else []
+    if not produced and carry:
+        # Fewer tokens than one shingle: the whole text is the only shingle
+        yield [xxhash.xxh3_64_intdigest(" ".join(carry))]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def simhash_bands(fingerprint: int) -> List[int]:
+    """The fingerprint's SIMHASH_BANDS bands, most significant first."""
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (BAND_BITS * (SIMHASH_BANDS - 1 - i))) & mask for i in range(SIMHASH_BANDS)]
+
+
+def to_signed64(value: int) -> int:
+    """Map an unsigned 64-bit int into the signed range of a BigIntegerField."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_signed64(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
@@ -0,0 +1,82 @@
+# brain/cognitive_pipeline/utils/single_flight.py
+
+"""
+Coalescing of identical concurrent calls ("single flight").
+
+While a call for a key is running, other callers asking for the same key wait
+for it and receive its result (or its exception) instead of starting their
+own. Nothing is remembered once the call finishes; persistence across calls
+is the response cache's job. SingleFlight serves threads, AsyncSingleFlight
+serves coroutines on one event loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-safe single flight: concurrent do() calls with the same key share one fn() call."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.counters = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.counters['calls'] += 1
+            else:
+                self.counters['coalesced'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.counters, 'in_flight': len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """Single flight for one event loop: concurrent do() awaits with the same key share one fn() task."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.counters = {'calls': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            self.counters['calls'] += 1
+        else:
+            self.counters['coalesced'] += 1
+        # A cancelled waiter must not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.counters, 'in_flight': len(self._tasks)}
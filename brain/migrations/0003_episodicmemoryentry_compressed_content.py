@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brain', '0002_episodicmemoryentry_episodicmemoryevent_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='episodicmemoryentry',
+            name='content',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='episodicmemoryentry',
+            name='compressed_content',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='episodicmemoryentry',
+            name='compressed_tables',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='episodicmemoryentry',
+            name='raw_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='episodicmemoryentry',
+            name='stored_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
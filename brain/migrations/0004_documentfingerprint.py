@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_organization_departments_organization_headcount_and_more'),
+        ('brain', '0003_episodicmemoryentry_compressed_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('simhash', models.BigIntegerField()),
+                ('band_0', models.PositiveIntegerField()),
+                ('band_1', models.PositiveIntegerField()),
+                ('band_2', models.PositiveIntegerField()),
+                ('band_3', models.PositiveIntegerField()),
+                ('section_entities', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_fingerprints', to='accounts.organization')),
+                ('run', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='document_fingerprints', to='brain.brainrun')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['organization', 'band_0'], name='brain_docum_organiz_fa6752_idx'), models.Index(fields=['organization', 'band_1'], name='brain_docum_organiz_14b664_idx'), models.Index(fields=['organization', 'band_2'], name='brain_docum_organiz_7c68f4_idx'), models.Index(fields=['organization', 'band_3'], name='brain_docum_organiz_4d86ce_idx')],
+            },
+        ),
+    ]
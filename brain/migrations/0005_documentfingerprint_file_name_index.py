@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_organization_departments_organization_headcount_and_more'),
+        ('brain', '0004_documentfingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentfingerprint',
+            index=models.Index(fields=['organization', 'file_name'], name='brain_docum_organiz_6682f5_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-17 02:43
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_organization_departments_organization_headcount_and_more'),
+        ('brain', '0005_documentfingerprint_file_name_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('total_size', models.BigIntegerField()),
+                ('received_bytes', models.BigIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('committed', 'Committed'), ('aborted', 'Aborted'), ('failed', 'Failed')], default='open', max_length=20)),
+                ('file_path', models.CharField(blank=True, default='', max_length=500)),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('committed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='accounts.organization')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['organization', 'created_by', 'status'], name='brain_uploa_organiz_3286c8_idx'), models.Index(fields=['status', 'expires_at'], name='brain_uploa_status_583a1b_idx')],
+            },
+        ),
+    ]
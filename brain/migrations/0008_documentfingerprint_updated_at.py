@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-17 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brain', '0007_uploadsession_write_lease'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='documentfingerprint',
+            options={'ordering': ['-updated_at']},
+        ),
+        migrations.AddField(
+            model_name='documentfingerprint',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
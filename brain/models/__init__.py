@@ -2,3 +2,5 @@
 # models package init
 from .runs import BrainRun, BrainRunEvent
 from .memory import EpisodicMemoryEvent
+from .fingerprints import DocumentFingerprint
+from .uploads import UploadSession
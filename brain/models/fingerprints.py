@@ -0,0 +1,125 @@
+# brain/models/fingerprints.py
+
+from typing import Dict, List, Optional
+
+from django.db import models
+from brain.cognitive_pipeline.utils.simhash import (
+	NEAR_DUPLICATE_MAX_DISTANCE, from_signed64, hamming_distance, simhash_bands, to_signed64
+)
+from brain.models.runs import BrainRun
+
+
+class DocumentFingerprint(models.Model):
+	"""Org-scoped SimHash index of processed documents and their per-section LLM extraction results."""
+	organization = models.ForeignKey(
+		"accounts.Organization", on_delete=models.CASCADE, related_name="document_fingerprints"
+	)
+	run = models.ForeignKey(BrainRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="document_fingerprints")
+	file_name = models.CharField(max_length=255)  # Upload name, without the prefix added when saving
+	simhash = models.BigIntegerField()  # Unsigned 64-bit fingerprint stored in the signed range
+	# 16-bit bands of the fingerprint, indexed for near-duplicate candidate lookup
+	band_0 = models.PositiveIntegerField()
+	band_1 = models.PositiveIntegerField()
+	band_2 = models.PositiveIntegerField()
+	band_3 = models.PositiveIntegerField()
+	section_entities = models.JSONField(default=dict, blank=True)  # section_id -> list of entity dicts
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)  # Last time this version was processed
+
+	class Meta:
+		ordering = ["-updated_at"]
+		indexes = [
+			models.Index(fields=["organization", "band_0"]),
+			models.Index(fields=["organization", "band_1"]),
+			models.Index(fields=["organization", "band_2"]),
+			models.Index(fields=["organization", "band_3"]),
+			models.Index(fields=["organization", "file_name"]),
+		]
+
+	def __str__(self):
+		return f"DocumentFingerprint({self.file_name}: {from_signed64(self.simhash):016x})"
+
+	@property
+	def fingerprint(self) -> int:
+		return from_signed64(self.simhash)
+
+	@classmethod
+	def record(cls, organization_id, run, file_name: str, fingerprint: int, section_entities: dict) -> "DocumentFingerprint":
+		"""
+		Index a processed document. Re-processing the same version updates its row, and
+		older versions of the same upload name are dropped, so the index holds one row
+		per document.
+		"""
+		file_name = file_name[:255]
+		bands = simhash_bands(fingerprint)
+		entry, _ = cls.objects.update_or_create(
+			organization_id=organization_id,
+			file_name=file_name,
+			simhash=to_signed64(fingerprint),
+			defaults={
+				"run": run,
+				"band_0": bands[0],
+				"band_1": bands[1],
+				"band_2": bands[2],
+				"band_3": bands[3],
+				"section_entities": section_entities
+			}
+		)
+		cls.objects.filter(organization_id=organization_id, file_name=file_name).exclude(pk=entry.pk).delete()
+		return entry
+
+	@classmethod
+	def index_for(cls, organization_id) -> "FingerprintIndex":
+		"""In-memory lookup index of the organization's documents, loaded with a single query."""
+		return FingerprintIndex(
+			organization_id,
+			cls.objects.filter(organization_id=organization_id).values_list(
+				"id", "file_name", "simhash", "band_0", "band_1", "band_2", "band_3"
+			)
+		)
+
+
+class FingerprintIndex:
+	"""
+	Fingerprints of one organization's documents, most recent first, for matching a
+	whole run's documents without a query per document. Extraction results are only
+	fetched for the rows that match.
+	"""
+
+	def __init__(self, organization_id, rows):
+		self.organization_id = organization_id
+		self._fingerprints: Dict[int, int] = {}
+		self._order: Dict[int, int] = {}
+		self._by_name: Dict[str, int] = {}
+		self._bands: List[Dict[int, List[int]]] = [{}, {}, {}, {}]
+		for position, (pk, file_name, signed, *bands) in enumerate(rows):
+			self._fingerprints[pk] = from_signed64(signed)
+			self._order[pk] = position
+			self._by_name.setdefault(file_name, pk)
+			for band, value in zip(self._bands, bands):
+				band.setdefault(value, []).append(pk)
+
+	def find_near_duplicate(self, fingerprint: int,
+							max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE) -> Optional[tuple["DocumentFingerprint", int]]:
+		"""Closest (most recent on ties) indexed document within max_distance bits, with its distance."""
+		candidates = set()
+		for band, value in zip(self._bands, simhash_bands(fingerprint)):
+			candidates.update(band.get(value, ()))
+		best = None
+		for pk in sorted(candidates, key=self._order.__getitem__):
+			distance = hamming_distance(self._fingerprints[pk], fingerprint)
+			if distance <= max_distance and (best is None or distance < best[1]):
+				best = (pk, distance)
+		if best is None:
+			return None
+		entry = self._fetch(best[0])
+		return (entry, best[1]) if entry is not None else None
+
+	def latest_version(self, file_name: str) -> Optional["DocumentFingerprint"]:
+		"""Most recently indexed document uploaded under the same name."""
+		pk = self._by_name.get(file_name[:255])
+		return self._fetch(pk) if pk is not None else None
+
+	def _fetch(self, pk) -> Optional["DocumentFingerprint"]:
+		# May have been pruned by a concurrent run since the index was loaded
+		return DocumentFingerprint.objects.filter(pk=pk, organization_id=self.organization_id).first()
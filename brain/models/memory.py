@@ -2,7 +2,11 @@
 
 
 # Episodic memory event model for logging extracted entities and events
+import json
+
 from django.db import models
+from django.utils.functional import cached_property
+from brain.cognitive_pipeline.utils.compression import compress_bytes, decompress_json, decompress_text
 from brain.models.runs import BrainRun
 
 class EpisodicMemoryEvent(models.Model):
@@ -23,7 +27,7 @@ class EpisodicMemoryEvent(models.Model):
 
 class SemanticMemoryEntry(models.Model):
 	"""Persistent semantic memory entry for storing extracted knowledge."""
-	run = models.ForeignKey('runs.BrainRun', on_delete=models.CASCADE, related_name='semantic_memories')
+	run = models.ForeignKey(BrainRun, on_delete=models.CASCADE, related_name='semantic_memories')
 	entity_type = models.CharField(max_length=100)
 	value = models.TextField()
 	step = models.CharField(max_length=100, null=True, blank=True)
@@ -36,13 +40,53 @@ class SemanticMemoryEntry(models.Model):
 
 class EpisodicMemoryEntry(models.Model):
 	"""Persistent episodic memory entry for storing event-based memory."""
-	run = models.ForeignKey('runs.BrainRun', on_delete=models.CASCADE, related_name='episodic_memories')
+	run = models.ForeignKey(BrainRun, on_delete=models.CASCADE, related_name='episodic_memories')
 	event_type = models.CharField(max_length=100)
-	content = models.TextField()
+	content = models.TextField(blank=True, default="")  # Empty when compressed_content is set
+	compressed_content = models.BinaryField(null=True, blank=True)  # zstd frame or raw UTF-8, see utils/compression
+	compressed_tables = models.BinaryField(null=True, blank=True)  # Same encoding, JSON list of tables
+	raw_size = models.PositiveIntegerField(default=0)  # Bytes of content + tables before compression
+	stored_size = models.PositiveIntegerField(default=0)  # Bytes actually stored
 	step = models.CharField(max_length=100, null=True, blank=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
 	def __str__(self):
-		return f"EpisodicMemoryEntry({self.event_type}: {self.content[:30]})"
+		return f"EpisodicMemoryEntry({self.event_type}: {self.full_content[:30]})"
+
+	@classmethod
+	def build_compressed(cls, run, event_type: str, content: str, tables=None, step=None) -> "EpisodicMemoryEntry":
+		"""Unsaved entry with content (and tables, if given) stored zstd-compressed."""
+		raw_content = content.encode('utf-8')
+		compressed_content = compress_bytes(raw_content)
+		raw_size = len(raw_content)
+		stored_size = len(compressed_content)
+		compressed_tables = None
+		if tables:
+			raw_tables = json.dumps(tables, default=str).encode('utf-8')
+			compressed_tables = compress_bytes(raw_tables)
+			raw_size += len(raw_tables)
+			stored_size += len(compressed_tables)
+		return cls(
+			run=run,
+			event_type=event_type,
+			compressed_content=compressed_content,
+			compressed_tables=compressed_tables,
+			raw_size=raw_size,
+			stored_size=stored_size,
+			step=step
+		)
+
+	@cached_property
+	def full_content(self) -> str:
+		"""Entry text, decompressed on first access; plain content for uncompressed entries."""
+		if self.compressed_content is None:
+			return self.content
+		return decompress_text(self.compressed_content)
+
+	@cached_property
+	def tables(self) -> list:
+		if self.compressed_tables is None:
+			return []
+		return decompress_json(self.compressed_tables)
 
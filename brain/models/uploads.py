@@ -0,0 +1,129 @@
+# brain/models/uploads.py
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from brain.utils.chunked_upload import discard_part, part_path
+
+
+class UploadSession(models.Model):
+	"""Resumable chunked upload of a single job input file; its id is the file id passed to job submission."""
+	class Status(models.TextChoices):
+		OPEN = "open", "Open"
+		COMMITTED = "committed", "Committed"
+		ABORTED = "aborted", "Aborted"
+		FAILED = "failed", "Failed"
+		EXPIRED = "expired", "Expired"
+
+	id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+	organization = models.ForeignKey(
+		"accounts.Organization", on_delete=models.CASCADE, related_name="upload_sessions"
+	)
+	created_by = models.ForeignKey(
+		settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_sessions"
+	)
+	file_name = models.CharField(max_length=255)
+	total_size = models.BigIntegerField()
+	received_bytes = models.BigIntegerField(default=0)  # Offset the next chunk must start at
+	sha256 = models.CharField(max_length=64)  # Expected hex digest, verified on commit
+	status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
+	file_path = models.CharField(max_length=500, blank=True, default="")  # Set on commit
+	error_message = models.TextField(blank=True, default="")
+	expires_at = models.DateTimeField()
+	# Lease of the request currently streaming a chunk; the row lock is only held to claim and release it
+	write_token = models.UUIDField(null=True, blank=True)
+	write_lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+	created_at = models.DateTimeField(auto_now_add=True)
+	updated_at = models.DateTimeField(auto_now=True)
+	committed_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(fields=["organization", "created_by", "status"]),
+			models.Index(fields=["status", "expires_at"]),
+		]
+
+	def __str__(self):
+		return f"UploadSession {self.id} ({self.file_name}, {self.received_bytes}/{self.total_size})"
+
+	@classmethod
+	def start(cls, organization, user, file_name: str, total_size: int, sha256: str, ttl_hours: int) -> "UploadSession":
+		return cls.objects.create(
+			organization=organization,
+			created_by=user,
+			file_name=file_name[:255],
+			total_size=total_size,
+			sha256=sha256.lower(),
+			expires_at=timezone.now() + timedelta(hours=ttl_hours)
+		)
+
+	@property
+	def part_path(self) -> str:
+		return part_path(self.id)
+
+	@property
+	def is_complete(self) -> bool:
+		return self.received_bytes == self.total_size
+
+	@property
+	def is_expired(self) -> bool:
+		return self.status == self.Status.OPEN and timezone.now() >= self.expires_at
+
+	@property
+	def write_in_progress(self) -> bool:
+		return self.write_token is not None and timezone.now() < self.write_lease_expires_at
+
+	def claim_write(self, lease_seconds: int) -> uuid.UUID:
+		"""Reserve the current offset for one chunk; a writer that never finishes loses the lease after lease_seconds."""
+		self.write_token = uuid.uuid4()
+		self.write_lease_expires_at = timezone.now() + timedelta(seconds=lease_seconds)
+		self.save(update_fields=["write_token", "write_lease_expires_at", "updated_at"])
+		return self.write_token
+
+	def release_write(self, received_bytes: int = None):
+		"""End the current lease, advancing the offset when the chunk was written."""
+		if received_bytes is not None:
+			self.received_bytes = received_bytes
+		self.write_token = None
+		self.write_lease_expires_at = None
+		self.save(update_fields=["received_bytes", "write_token", "write_lease_expires_at", "updated_at"])
+
+	@classmethod
+	def expire_stale(cls, limit: int = 100) -> int:
+		"""Mark up to limit open sessions past their expiry as expired and delete their partial data."""
+		stale_ids = list(
+			cls.objects.filter(status=cls.Status.OPEN, expires_at__lte=timezone.now())
+			.order_by("expires_at")
+			.values_list("id", flat=True)[:limit]
+		)
+		if not stale_ids:
+			return 0
+		expired = cls.objects.filter(id__in=stale_ids, status=cls.Status.OPEN).update(
+			status=cls.Status.EXPIRED,
+			write_token=None,
+			write_lease_expires_at=None,
+			updated_at=timezone.now()
+		)
+		for upload_id in stale_ids:
+			discard_part(part_path(upload_id))
+		return expired
+
+	def mark_committed(self, file_path: str):
+		self.status = self.Status.COMMITTED
+		self.file_path = file_path
+		self.committed_at = timezone.now()
+		self.save(update_fields=["status", "file_path", "committed_at", "updated_at"])
+
+	def mark_failed(self, message: str):
+		self.status = self.Status.FAILED
+		self.error_message = message[:8000]
+		self.save(update_fields=["status", "error_message", "updated_at"])
+
+	def mark_aborted(self):
+		self.status = self.Status.ABORTED
+		self.save(update_fields=["status", "updated_at"])
@@ -2,7 +2,7 @@
 
 from rest_framework import serializers
 from drf_spectacular.utils import extend_schema_field
-from .models import BrainRun, BrainRunEvent
+from .models import BrainRun, BrainRunEvent, UploadSession
 
 class BrainRunSerializer(serializers.ModelSerializer):
     duration_seconds = serializers.ReadOnlyField()
@@ -47,3 +47,17 @@ class BrainRunSummarySerializer(serializers.ModelSerializer):
     @extend_schema_field(serializers.IntegerField)
     def get_event_count(self, obj) -> int:
         return obj.events.count()
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Upload session state; `offset` is where the next chunk must start"""
+    upload_id = serializers.UUIDField(source="id", read_only=True)
+    offset = serializers.IntegerField(source="received_bytes", read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = (
+            "upload_id", "file_name", "total_size", "offset", "sha256", "status",
+            "error_message", "expires_at", "created_at", "committed_at"
+        )
+        read_only_fields = fields
@@ -1,3 +1,392 @@
-from django.test import TestCase
+# brain/tests.py
+"""
+brain/tests.py
 
-# Create your tests here.
+Tests for Brain app:
+- Resumable upload API: chunk offset, size and expiry checks, chunks streamed
+  outside the row lock, SHA-256 verification on commit (also outside the lock), file_ids in start_job
+- LLM entity extraction: section packing, per-document call cap, retries and keyword fallback,
+  prefetch failures logged
+- Document fingerprint index: one row per document, near-duplicate lookup from one query
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import Organization
+from brain.cognitive_pipeline.logic.entity_extraction_logic import llm_extract_entities
+from brain.cognitive_pipeline.nodes.perception_node import _build_extraction_prefetcher
+from brain.cognitive_pipeline.schema import DocumentMetadata, DocumentParsingValidationResult, ParsedDocument
+from brain.cognitive_pipeline.utils.document_sectioner import section_document
+from brain.cognitive_pipeline.utils.llm_batch import LLMBatchPending
+from brain.models import DocumentFingerprint, UploadSession
+from brain.utils import chunked_upload
+
+User = get_user_model()
+
+
+class UploadAPITestCase(APITestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org1")
+        self.user = User.objects.create_user(
+            username="user1", email="user1@example.com", password="pass", organization=self.org
+        )
+        self.client.force_authenticate(user=self.user)
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        for name, directory in (("UPLOAD_DIR", "documents"), ("PARTIAL_DIR", "partial")):
+            patcher = mock.patch.object(chunked_upload, name, os.path.join(media, directory))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.data = b"%PDF-" + b"roadmap " * 512
+
+    def create_upload(self, data=None, sha256=None):
+        data = self.data if data is None else data
+        resp = self.client.post("/api/brain/uploads/", {
+            "file_name": "plan.pdf",
+            "total_size": len(data),
+            "sha256": sha256 or hashlib.sha256(data).hexdigest()
+        }, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        return resp.data["upload_id"]
+
+    def send_chunk(self, upload_id, chunk, offset):
+        return self.client.patch(
+            f"/api/brain/uploads/{upload_id}/", chunk,
+            content_type="application/octet-stream", HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    # -------------------
+    # Chunks
+    # -------------------
+    def test_chunks_resume_from_acknowledged_offset(self):
+        upload_id = self.create_upload()
+        resp = self.send_chunk(upload_id, self.data[:1000], 0)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp["Upload-Offset"], "1000")
+
+        resp = self.client.head(f"/api/brain/uploads/{upload_id}/")
+        self.assertEqual(resp["Upload-Offset"], "1000")
+        resp = self.send_chunk(upload_id, self.data[1000:], 1000)
+        self.assertEqual(resp.data["offset"], len(self.data))
+
+    def test_offset_mismatch_returns_409(self):
+        upload_id = self.create_upload()
+        self.send_chunk(upload_id, self.data[:1000], 0)
+
+        resp = self.send_chunk(upload_id, self.data[:1000], 0)
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(resp.data["error"], "Offset mismatch")
+        self.assertEqual(resp["Upload-Offset"], "1000")
+
+    def test_chunk_past_total_size_returns_400(self):
+        upload_id = self.create_upload()
+        resp = self.send_chunk(upload_id, self.data + b"extra", 0)
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).received_bytes, 0)
+
+    def test_expired_session_returns_410(self):
+        upload_id = self.create_upload()
+        UploadSession.objects.filter(id=upload_id).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        resp = self.send_chunk(upload_id, self.data, 0)
+        self.assertEqual(resp.status_code, status.HTTP_410_GONE)
+
+    def test_chunk_is_written_outside_the_row_lock(self):
+        upload_id = self.create_upload()
+        baseline = len(connection.savepoint_ids)
+        observed = {}
+        write_chunk = chunked_upload.write_chunk
+
+        def observe(*args):
+            session = UploadSession.objects.get(id=upload_id)
+            observed["write_in_progress"] = session.write_in_progress
+            observed["open_atomic_blocks"] = len(connection.savepoint_ids) - baseline
+            # A second chunk is turned away while this one streams
+            observed["concurrent"] = self.send_chunk(upload_id, self.data, 0)
+            return write_chunk(*args)
+
+        with mock.patch("brain.api.upload_endpoints.write_chunk", side_effect=observe):
+            resp = self.send_chunk(upload_id, self.data, 0)
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(observed["write_in_progress"])
+        self.assertEqual(observed["open_atomic_blocks"], 0)
+        self.assertEqual(observed["concurrent"].status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(observed["concurrent"].data["error"], "Another chunk is being written")
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual(session.received_bytes, len(self.data))
+        self.assertFalse(session.write_in_progress)
+
+    def test_chunk_aborted_while_streaming_is_discarded(self):
+        upload_id = self.create_upload()
+        write_chunk = chunked_upload.write_chunk
+
+        def abort_midway(*args):
+            written = write_chunk(*args)
+            self.client.delete(f"/api/brain/uploads/{upload_id}/")
+            return written
+
+        with mock.patch("brain.api.upload_endpoints.write_chunk", side_effect=abort_midway):
+            resp = self.send_chunk(upload_id, self.data, 0)
+
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual((session.status, session.received_bytes), (UploadSession.Status.ABORTED, 0))
+        self.assertFalse(os.path.exists(session.part_path))
+
+    def test_new_upload_expires_stale_sessions(self):
+        stale_id = self.create_upload()
+        self.send_chunk(stale_id, self.data[:1000], 0)
+        UploadSession.objects.filter(id=stale_id).update(expires_at=timezone.now() - timedelta(minutes=1))
+        stale = UploadSession.objects.get(id=stale_id)
+        self.assertTrue(os.path.exists(stale.part_path))
+
+        self.create_upload()
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, UploadSession.Status.EXPIRED)
+        self.assertFalse(os.path.exists(stale.part_path))
+        self.assertEqual(self.send_chunk(stale_id, self.data[1000:], 1000).status_code, status.HTTP_410_GONE)
+
+    # -------------------
+    # Commit
+    # -------------------
+    def test_commit_moves_verified_file(self):
+        upload_id = self.create_upload()
+        self.send_chunk(upload_id, self.data, 0)
+
+        resp = self.client.post(f"/api/brain/uploads/{upload_id}/commit/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual(session.status, UploadSession.Status.COMMITTED)
+        with open(session.file_path, "rb") as committed:
+            self.assertEqual(committed.read(), self.data)
+
+    def test_commit_hashes_outside_the_row_lock(self):
+        upload_id = self.create_upload()
+        self.send_chunk(upload_id, self.data, 0)
+        baseline = len(connection.savepoint_ids)
+        observed = {}
+        file_sha256 = chunked_upload.file_sha256
+
+        def observe(path):
+            observed["open_atomic_blocks"] = len(connection.savepoint_ids) - baseline
+            # An abort that lands while hashing wins over the commit
+            observed["abort"] = self.client.delete(f"/api/brain/uploads/{upload_id}/")
+            return file_sha256(path) if os.path.exists(path) else hashlib.sha256(self.data).hexdigest()
+
+        with mock.patch("brain.api.upload_endpoints.file_sha256", side_effect=observe):
+            resp = self.client.post(f"/api/brain/uploads/{upload_id}/commit/")
+
+        self.assertEqual(observed["open_atomic_blocks"], 0)
+        self.assertEqual(observed["abort"].status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(resp.data["status"], UploadSession.Status.ABORTED)
+
+    def test_sha256_mismatch_fails_upload(self):
+        upload_id = self.create_upload(sha256="0" * 64)
+        self.send_chunk(upload_id, self.data, 0)
+
+        resp = self.client.post(f"/api/brain/uploads/{upload_id}/commit/")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data["status"], UploadSession.Status.FAILED)
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertIn("SHA-256 mismatch", session.error_message)
+        self.assertFalse(os.path.exists(session.part_path))
+
+    # -------------------
+    # Job submission
+    # -------------------
+    def test_start_job_resolves_committed_file_ids(self):
+        upload_id = self.create_upload()
+        self.send_chunk(upload_id, self.data, 0)
+        self.client.post(f"/api/brain/uploads/{upload_id}/commit/")
+        file_path = UploadSession.objects.get(id=upload_id).file_path
+
+        with mock.patch("brain.api.ai_job_endpoints.ProductRoadmapGraph") as graph:
+            graph.return_value.run_workflow.return_value.parsed_documents = []
+            resp = self.client.post("/api/brain/start_job/", {"file_ids": [upload_id]}, format="json")
+            self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+            state = graph.return_value.run_workflow.call_args[0][1]
+            self.assertEqual(state.uploaded_files, [file_path])
+
+            resp = self.client.post("/api/brain/start_job/", {"file_ids": [upload_id, "missing"]}, format="json")
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(resp.data["file_ids"], ["missing"])
+
+    def test_uncommitted_upload_is_not_a_file_id(self):
+        upload_id = self.create_upload()
+        resp = self.client.post("/api/brain/start_job/", {"file_ids": [upload_id]}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+def make_paged_document(file_path, page_count):
+    content = "\n\n".join(
+        f"--- Page {n} ---\nGoal: expand the partner programme in market {n}. " + "Supporting detail. " * 8
+        for n in range(1, page_count + 1)
+    )
+    doc = ParsedDocument(
+        file_path=file_path,
+        file_type="pdf",
+        content=content,
+        metadata=DocumentMetadata(file_path=file_path, file_size=len(content), file_type="pdf", quality_score=1.0),
+        validation_result=DocumentParsingValidationResult(is_valid=True, quality_score=1.0)
+    )
+    doc.sections = section_document(doc)
+    return doc
+
+
+class LLMExtractionRetryTestCase(SimpleTestCase):
+    class BatchLLM:
+        """llm_fn with a batch() method that answers each round from a script."""
+
+        def __init__(self, rounds):
+            self.rounds = rounds
+            self.calls = []
+
+        def __call__(self, prompt):
+            return self.batch([prompt])[0]
+
+        def batch(self, prompts):
+            self.calls.append(len(prompts))
+            return self.rounds[len(self.calls) - 1]
+
+    def test_pending_batch_is_not_retried(self):
+        documents = [
+            SimpleNamespace(file_path=f"doc{i}.md", content=f"Goal: launch the partner portal in region {i}")
+            for i in range(3)
+        ]
+        answered = '[{"entity_type": "BusinessObjective", "value": "Partner portal"}]'
+        llm_fn = self.BatchLLM([
+            [LLMBatchPending("openai", "batch-1"), RuntimeError("rate limited"), answered],
+            [answered],
+        ])
+        events = []
+
+        entities = llm_extract_entities(documents, {}, [], llm_fn, log_fn=events.append)
+
+        # Only the real error is retried; the pending chunk is not resubmitted
+        self.assertEqual(llm_fn.calls, [3, 1])
+        self.assertEqual(
+            [(e.source_document_id, e.extraction_method) for e in entities],
+            [("doc0.md", "keyword"), ("doc1.md", "llm"), ("doc2.md", "llm")]
+        )
+        fallbacks = [event for event in events if event["event_type"] == "llm_extraction_fallback"]
+        self.assertEqual([event["doc_id"] for event in fallbacks], ["doc0.md"])
+        self.assertIn("batch-1 has not finished", fallbacks[0]["reason"])
+
+
+class LLMExtractionPrefetchTestCase(SimpleTestCase):
+    def test_prefetch_failures_reach_the_workflow_log(self):
+        def failing_llm_fn(prompt):
+            raise RuntimeError("provider unavailable")
+
+        events = []
+        state = SimpleNamespace(context={"llm_fn": failing_llm_fn, "log_fn": events.append})
+        prefetcher = _build_extraction_prefetcher(state)
+        doc = SimpleNamespace(file_path="roadmap.md", content="Goal: launch the partner portal")
+        prefetcher.submit(doc)
+        entities = prefetcher.extract([doc], {}, [])
+        prefetcher.shutdown()
+
+        self.assertEqual([e.extraction_method for e in entities], ["keyword"])
+        errors = [event for event in events if event["event_type"] == "llm_extraction_error"]
+        self.assertEqual([event["error"] for event in errors], ["provider unavailable"] * 2)
+        fallbacks = [event for event in events if event["event_type"] == "llm_extraction_fallback"]
+        self.assertEqual([event["doc_id"] for event in fallbacks], ["roadmap.md"])
+
+
+class LLMExtractionChunkingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.prompts = []
+
+    def llm_fn(self, prompt):
+        self.prompts.append(prompt)
+        market = prompt.rsplit("in market ", 1)[1].split(".", 1)[0]
+        return f'[{{"entity_type": "BusinessObjective", "value": "expand the partner programme in market {market}"}}]'
+
+    def test_many_section_document_is_packed_into_few_calls(self):
+        doc = make_paged_document("plan.pdf", 300)
+        self.assertEqual(len(doc.sections), 300)
+
+        entities = llm_extract_entities([doc], {}, [], self.llm_fn, max_chunks_per_document=100)
+
+        # ~8K characters (2048 tokens) of consecutive pages per call instead of one call per page
+        self.assertEqual(len(self.prompts), 9)
+        self.assertEqual(len(entities), 9)
+        self.assertEqual(set(doc.section_entities), {section.section_id for section in doc.sections})
+        # Provenance: each entity points at the section its value came from
+        last_page = doc.sections[-1]
+        self.assertEqual(entities[-1].source_section_id, last_page.section_id)
+        self.assertEqual(doc.section_entities[last_page.section_id][0]["value"], "expand the partner programme in market 300")
+
+    def test_calls_per_document_are_capped(self):
+        docs = [make_paged_document("plan.pdf", 300), make_paged_document("notes.pdf", 10)]
+        events = []
+
+        entities = llm_extract_entities(docs, {}, [], self.llm_fn, log_fn=events.append, max_chunks_per_document=3)
+
+        self.assertEqual(len(self.prompts), 3 + 1)
+        capped = [event for event in events if event["event_type"] == "llm_extraction_budget_exceeded"]
+        self.assertEqual([(event["doc_id"], event["chunk_count"]) for event in capped], [("plan.pdf", 9)])
+        # Pages past the cap are still covered, by keyword extraction
+        methods = {(e.source_document_id, e.extraction_method) for e in entities}
+        self.assertEqual(methods, {("plan.pdf", "llm"), ("plan.pdf", "keyword"), ("notes.pdf", "llm")})
+        self.assertTrue(any(e.source_section_id == docs[0].sections[-1].section_id for e in entities))
+
+    def test_sections_from_near_duplicate_are_not_sent(self):
+        doc = make_paged_document("plan.pdf", 20)
+        reused = doc.sections[5]
+        doc.section_entities = {reused.section_id: [{"entity_type": "BusinessObjective", "value": "reused goal"}]}
+
+        entities = llm_extract_entities([doc], {}, [], self.llm_fn)
+
+        self.assertEqual(len(self.prompts), 2)
+        self.assertTrue(all("in market 6." not in prompt for prompt in self.prompts))
+        self.assertIn(("reused goal", "near_duplicate"), [(e.value, e.origin) for e in entities])
+
+
+class DocumentFingerprintTestCase(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org1")
+        self.other_org = Organization.objects.create(name="Org2")
+
+    def test_reprocessing_updates_and_prunes_versions(self):
+        DocumentFingerprint.record(self.org.id, None, "plan.pdf", 0x1234, {"s1": []})
+        DocumentFingerprint.record(self.org.id, None, "plan.pdf", 0x1234, {"s1": [{"value": "Grow"}]})
+        self.assertEqual(DocumentFingerprint.objects.filter(organization=self.org).count(), 1)
+
+        latest = DocumentFingerprint.record(self.org.id, None, "plan.pdf", 0x1235, {"s2": []})
+        DocumentFingerprint.record(self.other_org.id, None, "plan.pdf", 0x1234, {})
+        self.assertEqual(list(DocumentFingerprint.objects.filter(organization=self.org)), [latest])
+        self.assertEqual(DocumentFingerprint.objects.count(), 2)
+
+    def test_index_matches_documents_without_a_query_each(self):
+        DocumentFingerprint.record(self.org.id, None, "roadmap.pdf", 0xF0F0F0F0F0F0F0F0, {"s1": [{"value": "Grow"}]})
+        DocumentFingerprint.record(self.org.id, None, "plan.pdf", 0x0123456789ABCDEF, {})
+        DocumentFingerprint.record(self.other_org.id, None, "notes.txt", 0x1111111111111111, {})
+
+        with self.assertNumQueries(1):
+            index = DocumentFingerprint.index_for(self.org.id)
+        with self.assertNumQueries(0):
+            self.assertIsNone(index.find_near_duplicate(0x1111111111111111))
+            self.assertIsNone(index.latest_version("notes.txt"))
+        with self.assertNumQueries(1):
+            entry, distance = index.find_near_duplicate(0xF0F0F0F0F0F0F0F1)
+        self.assertEqual((entry.file_name, distance), ("roadmap.pdf", 1))
+        self.assertEqual(entry.section_entities, {"s1": [{"value": "Grow"}]})
+        self.assertEqual(index.latest_version("plan.pdf").fingerprint, 0x0123456789ABCDEF)
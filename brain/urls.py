@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import BrainRunViewSet, BrainRunEventViewSet
 from .api.ai_job_endpoints import ai_job_urlpatterns
+from .api.upload_endpoints import upload_urlpatterns
 
 router = DefaultRouter()
 router.register(r"runs", BrainRunViewSet, basename="brain-run")
@@ -13,4 +14,7 @@ urlpatterns = [
     
     # AI Job API endpoints
     path('', include(ai_job_urlpatterns)),
+
+    # Resumable chunked uploads
+    path('', include(upload_urlpatterns)),
 ]
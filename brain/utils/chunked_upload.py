@@ -0,0 +1,79 @@
+# brain/utils/chunked_upload.py
+
+"""
+File-level helpers for resumable chunked uploads.
+
+Chunks are streamed from the request body straight into a per-session `.part`
+file in fixed-size blocks, so a chunk is never buffered whole in memory. On
+commit the part file is hashed and atomically moved next to the regular
+multipart uploads, under the same `<uuid>_<name>` naming.
+"""
+
+import hashlib
+import os
+
+UPLOAD_DIR = os.path.join('media', 'uploads', 'documents')
+PARTIAL_DIR = os.path.join('media', 'uploads', 'partial')
+COPY_BLOCK_SIZE = 1024 * 1024  # 1MB
+
+
+def part_path(upload_id) -> str:
+    """Path of the in-progress data file of an upload session."""
+    return os.path.join(PARTIAL_DIR, f"{upload_id}.part")
+
+
+def committed_path(upload_id, file_name: str) -> str:
+    """Final path of a committed upload, named like StartAIJobView._save_uploaded_file."""
+    return os.path.join(UPLOAD_DIR, f"{upload_id}_{os.path.basename(file_name)}")
+
+
+def write_chunk(path: str, offset: int, stream, length: int) -> int:
+    """
+    Copy up to length bytes from stream into path starting at offset.
+
+    Bytes past offset left by an earlier interrupted chunk are discarded first,
+    since only the acknowledged offset is known to be good. A stream that ends
+    or fails early (client disconnect) is not an error: the bytes received so
+    far are kept and their count is returned so the client can resume from there.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    written = 0
+    with open(path, 'ab+') as part:
+        part.truncate(offset)
+    with open(path, 'r+b') as part:
+        part.seek(offset)
+        while written < length:
+            try:
+                block = stream.read(min(COPY_BLOCK_SIZE, length - written))
+            except OSError:
+                break
+            if not block:
+                break
+            part.write(block)
+            written += len(block)
+        part.flush()
+        os.fsync(part.fileno())
+    return written
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(COPY_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_part(source: str, destination: str) -> str:
+    """Move a completed part file to its committed path."""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    os.replace(source, destination)
+    return destination
+
+
+def discard_part(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark ContentValidator's single-pass content metrics against the previous
+per-character implementation.
+
+Generates multi-MB extracted-text-like content (mostly ASCII, some accented
+and CJK words, a few control characters), checks that both implementations
+agree on warnings, score and shared metrics, and prints the best-of-N timings.
+
+Usage: python test_materials/bench_content_quality.py [megabytes]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brain.cognitive_pipeline.utils.file_validators import ContentValidator
+
+WORDS = [
+    "roadmap", "growth", "retention", "KPI:", "$1,200", "(Q3)", "analytics", "platform.",
+    "onboarding", "churn", "segment", "naïve", "café", "路线图", "—", "partner", "portal", "2025",
+]
+
+
+def create_benchmark_content(megabytes):
+    """Lines of random words with page markers, about megabytes MB of text"""
+    rng = random.Random(42)
+    lines = []
+    size = 0
+    page = 1
+    while size < megabytes * 1024 * 1024:
+        if len(lines) % 40 == 0:
+            lines.append(f"--- Page {page} ---")
+            page += 1
+        line = " ".join(rng.choice(WORDS) for _ in range(12))
+        if rng.random() < 0.01:
+            line += "\x0c\x07"
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def legacy_validate(content, min_content_length=ContentValidator.MIN_CONTENT_LENGTH):
+    """ContentValidator.validate_processed_content before the single-pass metrics"""
+    warnings = []
+    quality_score = 1.0
+    if not content or not content.strip():
+        quality_score = 0.0
+    elif len(content.strip()) < min_content_length:
+        warnings.append("Very little content extracted - document may be mostly images or formatting")
+        quality_score *= 0.7
+    if content:
+        text_chars = sum(1 for c in content if c.isalnum() or c.isspace())
+        special_chars = len(content) - text_chars
+        if len(content) > 0:
+            special_ratio = special_chars / len(content)
+            if special_ratio > 0.5:
+                warnings.append("High ratio of special characters - may indicate extraction issues")
+                quality_score *= 0.8
+        words = content.split()
+        if len(words) < 10:
+            warnings.append("Very few words extracted")
+            quality_score *= 0.6
+        if len(set(words)) < len(words) * 0.3 and len(words) > 20:
+            warnings.append("High word repetition detected - may indicate extraction issues")
+            quality_score *= 0.8
+    details = {
+        'content_length': len(content) if content else 0,
+        'word_count': len(content.split()) if content else 0,
+        'unique_words': len(set(content.split())) if content else 0,
+    }
+    return warnings, quality_score, details
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 8
+    content = create_benchmark_content(megabytes)
+    print(f"Content: {len(content)} characters")
+
+    warnings, quality_score, details = legacy_validate(content)
+    result = ContentValidator.validate_processed_content(content, "pdf")
+    assert result.warnings == warnings and result.quality_score == quality_score, "validators disagree"
+    assert all(result.details[key] == value for key, value in details.items()), "metrics disagree"
+    print("Extra metrics: " + ", ".join(
+        f"{key}={result.details[key]:.4f}" for key in ("special_char_ratio", "printable_ratio", "repeated_line_ratio")
+    ))
+
+    baseline = best_of(lambda: legacy_validate(content), 3)
+    fast = best_of(lambda: ContentValidator.validate_processed_content(content, "pdf"), 3)
+    print(f"per-character: {baseline * 1000:.0f} ms")
+    print(f"single-pass:   {fast * 1000:.0f} ms")
+    print(f"speedup:       {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark the lxml streaming DOCX reader against the python-docx object model.
+
+Generates a long document with large tables, checks that both readers produce
+identical output, and prints the best-of-N timings.
+
+Usage: python test_materials/bench_docx_parsing.py [paragraphs] [table_rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from docx import Document
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from brain.cognitive_pipeline.utils.document_processor import _read_docx_object_model
+from brain.cognitive_pipeline.utils.docx_reader import read_docx
+
+
+def create_benchmark_document(filename, paragraphs, table_rows):
+    """Create a DOCX with headed sections of prose and a few wide tables"""
+    doc = Document()
+    for section in range(paragraphs // 20):
+        doc.add_heading(f"Initiative {section}", level=2)
+        for i in range(20):
+            doc.add_paragraph(
+                f"Paragraph {i} of initiative {section}: improve onboarding conversion, "
+                "reduce churn in the SMB segment and expand the analytics platform."
+            )
+    for table_idx in range(3):
+        table = doc.add_table(rows=table_rows, cols=6)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"T{table_idx} R{r} C{c}"
+    doc.save(filename)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    paragraphs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    table_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "benchmark.docx")
+        create_benchmark_document(path, paragraphs, table_rows)
+        print(f"Document: {paragraphs} paragraphs, 3 tables x {table_rows} rows, {os.path.getsize(path)} bytes")
+
+        assert read_docx(path) == _read_docx_object_model(path), "readers disagree"
+
+        baseline = best_of(lambda: _read_docx_object_model(path), 3)
+        fast = best_of(lambda: read_docx(path), 3)
+        print(f"python-docx: {baseline * 1000:.0f} ms")
+        print(f"lxml:        {fast * 1000:.0f} ms")
+        print(f"speedup:     {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
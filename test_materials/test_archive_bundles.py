@@ -0,0 +1,107 @@
+# test_materials/test_archive_bundles.py
+
+import zipfile
+
+from docx import Document
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from brain.cognitive_pipeline.utils.archive_reader import member_path
+from brain.cognitive_pipeline.utils.document_processor import DocumentProcessor
+from brain.cognitive_pipeline.utils.file_validators import FileValidator
+from brain.cognitive_pipeline.utils.parse_cache import ParseCache
+
+
+def make_documents(directory):
+    directory.mkdir()
+    pdf = canvas.Canvas(str(directory / "strategy.pdf"), pagesize=letter)
+    for page in range(1, 4):
+        pdf.drawString(72, 720, f"Strategy page {page}: grow revenue in EMEA by 20 percent")
+        pdf.showPage()
+    pdf.save()
+
+    document = Document()
+    document.add_heading("Customer interviews", level=1)
+    document.add_paragraph("Customers ask for a partner portal and better onboarding analytics.")
+    document.save(str(directory / "interviews.docx"))
+
+    workbook = Workbook()
+    workbook.active.title = "Backlog"
+    for row in [["Initiative", "Score"], ["Partner portal", 8], ["Analytics", 5]]:
+        workbook.active.append(row)
+    workbook.save(str(directory / "backlog.xlsx"))
+
+    (directory / "notes.txt").write_text("Roadmap notes: reduce churn in the SMB segment next quarter.\n" * 3)
+    return directory
+
+
+def make_bundle(path, documents):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.write(documents / "strategy.pdf", "planning/strategy.pdf")
+        archive.write(documents / "interviews.docx", "research/interviews.docx")
+        archive.write(documents / "backlog.xlsx", "backlog.xlsx")
+        archive.write(documents / "notes.txt", "notes.txt")
+        archive.writestr("planning/", "")
+        archive.writestr("__MACOSX/planning/._strategy.pdf", b"\x00\x05\x16\x07")
+        archive.writestr(".DS_Store", b"\x00\x00\x00\x01Bud1")
+        archive.writestr("tools/setup.exe", b"MZ" + b"\x00" * 64)
+    return str(path)
+
+
+def test_bundle_members_are_validated_individually(tmp_path):
+    bundle = make_bundle(tmp_path / "bundle.zip", make_documents(tmp_path / "docs"))
+    paths, probes, rejected = FileValidator.expand_archives(["/missing.pdf", bundle], {})
+
+    assert paths == ["/missing.pdf"] + [member_path(bundle, name) for name in [
+        "planning/strategy.pdf", "research/interviews.docx", "backlog.xlsx", "notes.txt", "tools/setup.exe"
+    ]]
+    assert list(rejected) == [member_path(bundle, "tools/setup.exe")]
+    assert "File type not allowed for security reasons: .exe" in rejected[member_path(bundle, "tools/setup.exe")]
+    assert probes[member_path(bundle, "research/interviews.docx")].mime_type == (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    )
+    assert probes[member_path(bundle, "notes.txt")].size == (tmp_path / "docs" / "notes.txt").stat().st_size
+
+
+def test_members_parse_like_extracted_files(tmp_path):
+    documents = make_documents(tmp_path / "docs")
+    bundle = make_bundle(tmp_path / "bundle.zip", documents)
+    names = ["planning/strategy.pdf", "research/interviews.docx", "backlog.xlsx", "notes.txt"]
+    members = [member_path(bundle, name) for name in names]
+
+    from_bundle = DocumentProcessor(max_workers=2).process_files(members)
+    from_disk = DocumentProcessor(max_workers=1).process_files(
+        [str(documents / name.rsplit("/", 1)[-1]) for name in names]
+    )
+
+    assert [doc.file_path for doc in from_bundle] == members
+    assert [doc.file_type for doc in from_bundle] == ["pdf", "docx", "xlsx", "txt"]
+    assert [doc.content for doc in from_bundle] == [doc.content for doc in from_disk]
+    assert [doc.tables for doc in from_bundle] == [doc.tables for doc in from_disk]
+    assert from_bundle[0].metadata.file_size == (documents / "strategy.pdf").stat().st_size
+
+
+def test_member_shares_cache_entry_with_plain_upload(tmp_path):
+    documents = make_documents(tmp_path / "docs")
+    bundle = make_bundle(tmp_path / "bundle.zip", documents)
+    processor = DocumentProcessor(max_workers=1, cache=ParseCache(str(tmp_path / "cache")))
+
+    processor.process_files([str(documents / "interviews.docx")])
+    cached = processor.process_files([member_path(bundle, "research/interviews.docx")])[0]
+
+    assert processor.stats["cache_hits"] == 1
+    assert cached.file_path == member_path(bundle, "research/interviews.docx")
+
+
+def test_decompression_bomb_member_is_rejected(tmp_path):
+    bundle = str(tmp_path / "bomb.zip")
+    with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("report.txt", b"a" * (8 * 1024 * 1024))
+        archive.writestr("summary.txt", "Quarterly summary: revenue grew twelve percent year over year.")
+
+    paths, probes, rejected = FileValidator.expand_archives([bundle], {})
+
+    assert list(rejected) == [member_path(bundle, "report.txt")]
+    assert "Suspicious compression ratio" in rejected[member_path(bundle, "report.txt")][0]
+    assert list(probes) == [member_path(bundle, "summary.txt")]
@@ -0,0 +1,56 @@
+# test_materials/test_chunked_upload.py
+
+import hashlib
+import io
+
+from brain.utils.chunked_upload import committed_path, file_sha256, finalize_part, write_chunk
+
+DATA = bytes(range(256)) * 4096  # 1MB
+
+
+class FlakyStream(io.BytesIO):
+    """Request body whose connection drops after limit bytes."""
+
+    def __init__(self, data, limit):
+        super().__init__(data)
+        self.limit = limit
+
+    def read(self, size=-1):
+        if self.tell() >= self.limit:
+            raise OSError("connection reset")
+        return super().read(min(size, self.limit - self.tell()))
+
+
+def test_chunks_resume_after_interrupted_transfer(tmp_path):
+    part = str(tmp_path / "partial" / "upload.part")
+    chunk = 300_000
+
+    offset = write_chunk(part, 0, io.BytesIO(DATA[:chunk]), chunk)
+    written = write_chunk(part, offset, FlakyStream(DATA[offset:offset + chunk], 1000), chunk)
+    assert (offset, written) == (chunk, 1000)
+    offset += written
+    while offset < len(DATA):
+        length = min(chunk, len(DATA) - offset)
+        offset += write_chunk(part, offset, io.BytesIO(DATA[offset:offset + length]), length)
+
+    assert file_sha256(part) == hashlib.sha256(DATA).hexdigest()
+
+
+def test_retried_chunk_overwrites_unacknowledged_bytes(tmp_path):
+    part = str(tmp_path / "upload.part")
+    write_chunk(part, 0, io.BytesIO(b"a" * 100), 100)
+    # Bytes past the acknowledged offset (from a chunk whose response was lost) are discarded
+    write_chunk(part, 100, io.BytesIO(b"x" * 50), 50)
+    write_chunk(part, 100, io.BytesIO(b"b" * 20), 20)
+
+    with open(part, "rb") as f:
+        assert f.read() == b"a" * 100 + b"b" * 20
+
+
+def test_finalize_uses_upload_naming(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_chunk("upload.part", 0, io.BytesIO(b"roadmap"), 7)
+    destination = finalize_part("upload.part", committed_path("1234", "../plans/roadmap.pdf"))
+
+    assert destination.endswith("documents/1234_roadmap.pdf")
+    assert (tmp_path / destination).read_bytes() == b"roadmap"
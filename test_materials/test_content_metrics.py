@@ -0,0 +1,41 @@
+# test_materials/test_content_metrics.py
+
+from brain.cognitive_pipeline.utils.content_metrics import CONTROL_CHARS, content_metrics
+from brain.cognitive_pipeline.utils.file_validators import ContentValidator
+
+
+def reference_special_ratio(content):
+    return sum(1 for c in content if not (c.isalnum() or c.isspace())) / len(content)
+
+
+def test_character_classes_match_str_predicates():
+    samples = [
+        "Grow revenue by 20% in Q3 (EMEA) — see roadmap_v2.",
+        "Café naïve 路线图，增长。 ½ ² ٣   \x1c tab\tend_",
+        "Broken \ufffd bytes \x00\x07 and C1 \x85\x9f controls\x0c",
+    ]
+    for content in samples:
+        metrics = content_metrics(content)
+        assert metrics["special_char_ratio"] == reference_special_ratio(content)
+        non_printable = sum(1 for c in content if c in CONTROL_CHARS or c == "\ufffd")
+        assert metrics["printable_ratio"] == 1 - non_printable / len(content)
+        assert metrics["word_count"] == len(content.split())
+
+
+def test_repetition_metrics_and_empty_content():
+    content = "--- Page 1 ---\nACME Confidential\nGrow revenue\n--- Page 2 ---\nACME Confidential\nReduce churn"
+    metrics = content_metrics(content)
+    assert metrics["line_count"] == 6
+    assert metrics["repeated_line_ratio"] == 1 - 5 / 6
+    assert content_metrics("") == {
+        "content_length": 0, "stripped_length": 0, "word_count": 0, "unique_words": 0, "line_count": 0,
+        "special_char_ratio": 0.0, "printable_ratio": 1.0, "unique_word_ratio": 1.0, "repeated_line_ratio": 0.0
+    }
+
+
+def test_content_validator_reports_metrics():
+    result = ContentValidator.validate_processed_content("roadmap " * 30, "txt")
+    assert result.warnings == ["High word repetition detected - may indicate extraction issues"]
+    assert result.quality_score == 0.8
+    assert result.details["word_count"] == 30 and result.details["unique_words"] == 1
+    assert ContentValidator.validate_processed_content("", "txt").errors == ["No content extracted from document"]
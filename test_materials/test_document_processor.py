@@ -0,0 +1,186 @@
+# brain/cognitive_pipeline/utils/test_document_processor.py
+
+from docx import Document
+from openpyxl import Workbook
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfgen import canvas
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+from brain.cognitive_pipeline.utils import document_processor
+from brain.cognitive_pipeline.utils.document_processor import DocumentProcessor, _read_docx_object_model
+from brain.cognitive_pipeline.utils.docx_reader import read_docx
+
+SAMPLE_TEXT = "Our product roadmap focuses on growth, retention and the new analytics platform. " * 5
+
+
+def make_text_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc_{i}.txt"
+        path.write_text(f"Document {i}\n{SAMPLE_TEXT}", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def crash_on_doc_0(options, file_path, probe):
+    if file_path.endswith("doc_0.txt"):
+        raise MemoryError("worker was killed")
+    return process_file_in_worker(options, file_path, probe)
+
+
+process_file_in_worker = document_processor._process_file_in_worker
+
+
+def make_pdf(path, page_count):
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    for page in range(1, page_count + 1):
+        pdf.drawString(72, 720, f"Strategy page {page}: expand into new markets")
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def test_parallel_matches_sequential(tmp_path):
+    paths = make_text_files(tmp_path, 4)
+    sequential = DocumentProcessor(max_workers=1).process_files(paths)
+    parallel = DocumentProcessor(max_workers=4).process_files(paths)
+    assert [doc.file_path for doc in parallel] == paths
+    assert [doc.content for doc in parallel] == [doc.content for doc in sequential]
+
+
+def test_process_files_iter_yields_every_document(tmp_path):
+    paths = make_text_files(tmp_path, 3)
+    processor = DocumentProcessor(max_workers=3)
+    documents = list(processor.process_files_iter(paths))
+    assert sorted(doc.file_path for doc in documents) == sorted(paths)
+    assert processor.stats["files_processed"] == 3
+
+
+def test_parallel_merges_worker_stats(tmp_path):
+    paths = make_text_files(tmp_path, 3)
+    missing = str(tmp_path / "missing.txt")
+    processor = DocumentProcessor(max_workers=2)
+    documents = processor.process_files(paths + [missing])
+    stats = processor.get_processing_stats()
+    assert documents[-1].file_type == "failed"
+    assert stats["files_processed"] == 4
+    assert stats["total_pages"] == 3
+    assert len(stats["errors"]) == 1
+    assert stats["success_rate"] == 0.75
+    assert set(stats["file_timings_ms"]) == set(paths + [missing])
+
+
+def test_crashed_worker_counts_as_processed_failure(tmp_path, monkeypatch):
+    paths = make_text_files(tmp_path, 3)
+    monkeypatch.setattr(document_processor, "_process_file_in_worker", crash_on_doc_0)
+    processor = DocumentProcessor(max_workers=2)
+    documents = processor.process_files(paths)
+
+    stats = processor.get_processing_stats()
+    assert [doc.file_type for doc in documents] == ["failed", "txt", "txt"]
+    assert stats["files_processed"] == len(documents)
+    assert stats["total_pages"] == 2
+    assert stats["errors"] == [f"Unexpected error processing {paths[0]}: worker was killed"]
+
+
+def test_sharded_pdf_keeps_page_order(tmp_path):
+    path = make_pdf(tmp_path / "deck.pdf", 9)
+    unsharded = DocumentProcessor(max_workers=1, pdf_shard_workers=1).process_files([path])[0]
+    processor = DocumentProcessor(max_workers=1, pdf_shard_workers=3)
+    processor.PDF_SHARD_MIN_PAGES = 2
+    sharded = processor.process_files([path])[0]
+    assert sharded.metadata.details["page_shards"] == 5
+    assert sharded.content == unsharded.content
+    assert sharded.content.index("--- Page 2 ---") < sharded.content.index("--- Page 9 ---")
+
+
+def test_streaming_xlsx_caps_retained_rows(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Initiative", "Score"])
+    for i in range(25):
+        sheet.append([f"Initiative {i}", i])
+    path = str(tmp_path / "backlog.xlsx")
+    workbook.save(path)
+
+    processor = DocumentProcessor(max_workers=1)
+    processor.XLSX_MAX_RETAINED_ROWS = 10
+    document = processor.process_files([path])[0]
+    table = document.tables[0]
+    assert table["row_count"] == 25
+    assert len(table["rows"]) == 10
+    assert table["rows_truncated"] is True
+    assert table["rows"][3] == ["Initiative 3", 3]
+    assert document.metadata.details["peak_rss_bytes"] > 0
+
+
+def test_prose_pages_skip_table_extraction(tmp_path):
+    path = str(tmp_path / "mixed.pdf")
+    table = Table([["Feature", "Priority"], ["Partner portal", "High"], ["Analytics", "Medium"]])
+    table.setStyle(TableStyle([("GRID", (0, 0), (-1, -1), 1, colors.black)]))
+    prose = Paragraph("Our strategy is to grow revenue in new markets.", getSampleStyleSheet()["Normal"])
+    SimpleDocTemplate(path, pagesize=letter).build([table, PageBreak(), prose])
+
+    processor = DocumentProcessor(max_workers=1, pdf_shard_workers=1)
+    document = processor.process_files([path])[0]
+    assert document.metadata.details["table_scan_skipped_pages"] == 1
+    assert [t["page"] for t in document.tables] == [1]
+    assert document.tables[0]["headers"] == ["Feature", "Priority"]
+    assert processor.get_processing_stats()["table_scan_skipped_pages"] == 1
+
+
+def test_text_encoding_is_detected_and_recorded(tmp_path):
+    utf16 = tmp_path / "notes_utf16.txt"
+    utf16.write_bytes("Roadmap: café launch\r\nQ3 goals".encode("utf-16"))
+    legacy = tmp_path / "notes_cp1252.txt"
+    legacy.write_bytes(("Prioritäten für das nächste Quartal: Kundenbindung stärken. " * 20).encode("cp1252"))
+
+    processor = DocumentProcessor(max_workers=1)
+    utf16_doc, legacy_doc = processor.process_files([str(utf16), str(legacy)])
+    assert utf16_doc.content == "Roadmap: café launch\nQ3 goals"
+    assert utf16_doc.metadata.details["encoding"] == "utf-16"
+    assert utf16_doc.metadata.details["line_count"] == 2
+    assert "Prioritäten für das nächste Quartal" in legacy_doc.content
+    assert legacy_doc.metadata.details["encoding"] != "utf-8"
+
+
+def test_docx_fast_path_matches_python_docx(tmp_path):
+    document = Document()
+    document.add_heading("Goals", level=1)
+    document.add_paragraph("Grow revenue\tin new markets")
+    table = document.add_table(rows=3, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"R{r}C{c}"
+    table.cell(0, 0).merge(table.cell(0, 1))
+    table.cell(1, 2).merge(table.cell(2, 2))
+    path = str(tmp_path / "plan.docx")
+    document.save(path)
+
+    parsed = DocumentProcessor(max_workers=1).process_files([path])[0]
+    assert parsed.metadata.details["parser"] == "lxml"
+    assert read_docx(path) == _read_docx_object_model(path)
+    assert parsed.tables[0]["headers"] == ["R0C0\nR0C1", "R0C0\nR0C1", "R0C2"]
+    assert parsed.tables[0]["rows"][1][2] == "R1C2\nR2C2"
+
+
+def test_time_budget_returns_partial_document(tmp_path):
+    path = str(tmp_path / "long.pdf")
+    pdf = canvas.Canvas(path, pagesize=letter)
+    for page in range(6):
+        pdf.drawString(72, 720, f"Page {page + 1}: roadmap detail for the next planning cycle.")
+        pdf.showPage()
+    pdf.save()
+
+    processor = DocumentProcessor(max_workers=1, pdf_shard_workers=1, time_budget_seconds=1e-9)
+    document = processor.process_files([path])[0]
+    assert document.validation_result.partial is True
+    assert document.metadata.details["pages_parsed"] < 6
+    assert any("time budget" in warning for warning in document.validation_result.warnings)
+    assert processor.get_processing_stats()["partial_documents"] == 1
+
+    unlimited = DocumentProcessor(max_workers=1, pdf_shard_workers=1, time_budget_seconds=0).process_files([path])[0]
+    assert unlimited.validation_result.partial is False
+    assert unlimited.metadata.details["pages_parsed"] == 6
@@ -0,0 +1,56 @@
+# brain/cognitive_pipeline/utils/test_document_sectioner.py
+
+from brain.cognitive_pipeline.schema import DocumentMetadata, DocumentParsingValidationResult, ParsedDocument
+from brain.cognitive_pipeline.utils.document_sectioner import section_at, section_document
+
+
+def make_document(content):
+    return ParsedDocument(
+        file_path="roadmap.pdf",
+        file_type="pdf",
+        content=content,
+        metadata=DocumentMetadata(file_path="roadmap.pdf", file_size=len(content), file_type="pdf", quality_score=1.0),
+        validation_result=DocumentParsingValidationResult(is_valid=True, quality_score=1.0)
+    )
+
+
+def test_sections_follow_page_and_heading_markers():
+    content = (
+        "--- Page 1 ---\nExecutive summary of the plan.\n\n"
+        "--- Page 2 ---\nIntro text\n## Goals\nGrow revenue by 20%."
+    )
+    doc = make_document(content)
+    sections = section_document(doc)
+
+    assert [(s.kind, s.page, s.heading) for s in sections] == [
+        ("page", 1, None), ("page", 2, None), ("heading", 2, "Goals")
+    ]
+    assert doc.section_text(sections[2]) == "## Goals\nGrow revenue by 20%."
+    assert all(s.char_count == s.end - s.start for s in sections)
+    doc.sections = sections
+    assert section_at(doc, content.index("revenue")).section_id == sections[2].section_id
+
+
+def test_long_sections_split_on_paragraphs_with_stable_ids():
+    paragraph = "Roadmap detail sentence for the partner portal launch. " * 5
+    content = "--- Sheet: Backlog ---\n" + "\n\n".join([paragraph] * 6)
+    first = section_document(make_document(content), max_chars=800)
+    again = section_document(make_document(content), max_chars=800)
+
+    assert len(first) > 1
+    assert all(s.char_count <= 800 and s.sheet == "Backlog" for s in first)
+    assert [s.section_id for s in first] == [s.section_id for s in again]
+    assert len({s.section_id for s in first}) == len(first)
+
+
+def test_inserted_page_keeps_later_section_ids():
+    pages = ["Executive summary of the plan.", "Intro text\n## Goals\nGrow revenue by 20%.", "Budget: 2M for EMEA."]
+
+    def render(page_texts):
+        return "\n\n".join(f"--- Page {n} ---\n{text}" for n, text in enumerate(page_texts, 1))
+
+    before = section_document(make_document(render(pages)))
+    after = section_document(make_document(render(pages[:1] + ["New market analysis."] + pages[1:])))
+
+    assert [s.section_id for s in after[2:]] == [s.section_id for s in before[1:]]
+    assert [s.page for s in after[2:]] == [3, 3, 4]
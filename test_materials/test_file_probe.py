@@ -0,0 +1,43 @@
+# brain/cognitive_pipeline/utils/test_file_probe.py
+
+import zipfile
+
+from docx import Document
+
+from brain.cognitive_pipeline.utils.file_probe import DOCX_MIME_TYPE, FileProbe
+from brain.cognitive_pipeline.utils.file_validators import FileValidator
+
+
+def test_probe_detects_type_from_content(tmp_path):
+    docx_path = tmp_path / "notes.bin"
+    document = Document()
+    document.add_paragraph("Roadmap notes")
+    document.save(str(docx_path))
+    text_path = tmp_path / "export.dat"
+    text_path.write_text("plain text export with ünïcode", encoding="utf-8")
+
+    assert FileProbe.probe(str(docx_path)).mime_type == DOCX_MIME_TYPE
+    assert FileProbe.probe(str(text_path)).mime_type == "text/plain"
+    assert FileProbe.probe(str(tmp_path / "missing.pdf")).exists is False
+
+
+def test_zip_bundle_with_office_folders_is_not_ooxml(tmp_path):
+    bundle_path = tmp_path / "handover.zip"
+    with zipfile.ZipFile(bundle_path, "w") as bundle:
+        bundle.writestr("word/minutes.txt", "Weekly sync minutes")
+        bundle.writestr("xl/budget.csv", "item,cost")
+    docx_path = tmp_path / "minutes.docx"
+    Document().save(str(docx_path))
+
+    assert FileProbe.probe(str(bundle_path)).mime_type == "application/zip"
+    assert FileProbe.probe(str(docx_path)).mime_type == DOCX_MIME_TYPE
+
+
+def test_validation_flags_content_that_contradicts_extension(tmp_path):
+    path = tmp_path / "strategy.pdf"
+    path.write_text("This is not really a PDF, just a renamed text file.", encoding="utf-8")
+    probes = FileValidator.probe_file_paths([str(path)])
+    result = FileValidator.validate_file_paths([str(path)], probes)
+    assert result.is_valid
+    assert "content is text/plain" in result.warnings[0]
+    assert probes[str(path)].size == path.stat().st_size
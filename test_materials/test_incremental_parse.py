@@ -0,0 +1,118 @@
+# test_materials/test_incremental_parse.py
+
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from brain.cognitive_pipeline.utils.document_processor import DocumentProcessor
+from brain.cognitive_pipeline.utils.incremental_parse import (
+    MAX_PDF_OBJECT_DEPTH,
+    document_identity,
+    logical_document_name,
+    pdf_page_fingerprint,
+)
+from brain.cognitive_pipeline.utils.parse_cache import ParseCache
+
+
+def make_pdf(path, lines):
+    path.parent.mkdir(exist_ok=True)
+    pdf = canvas.Canvas(str(path), pagesize=letter)
+    for line in lines:
+        pdf.drawString(72, 720, line)
+        pdf.showPage()
+    pdf.save()
+    return str(path)
+
+
+def make_workbook(path, sheets):
+    path.parent.mkdir(exist_ok=True)
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(str(path))
+    return str(path)
+
+
+def test_logical_name_strips_upload_prefix():
+    path = "media/uploads/documents/0f8fad5b-d9cb-469f-a165-70867728950e_roadmap_v2.pdf"
+    assert logical_document_name(path) == "roadmap_v2.pdf"
+    assert logical_document_name("/tmp/roadmap_v2.pdf") == "roadmap_v2.pdf"
+
+
+def test_bundle_members_have_their_own_identity():
+    bundle = "media/uploads/documents/0f8fad5b-d9cb-469f-a165-70867728950e_q3.zip"
+    assert document_identity(f"{bundle}!/finance/plan.pdf") == "q3.zip!/finance/plan.pdf"
+    assert document_identity(f"{bundle}!/finance/plan.pdf") != document_identity("/tmp/plan.pdf")
+    assert document_identity("/tmp/plan.pdf") == "plan.pdf"
+
+
+class FakePage:
+    def __init__(self, resources):
+        self.bbox = (0, 0, 612, 792)
+        self.page_obj = type("PageObject", (), {"attrs": {}, "contents": [], "resources": resources})()
+
+
+def test_too_deeply_nested_page_has_no_fingerprint():
+    resources = {"Font": "F1"}
+    for _ in range(MAX_PDF_OBJECT_DEPTH + 1):
+        resources = {"XObject": resources}
+    assert pdf_page_fingerprint(FakePage(resources)) is None
+    assert pdf_page_fingerprint(FakePage({"XObject": {"Font": "F1"}})) is not None
+
+
+def test_edited_pdf_reparses_only_changed_pages(tmp_path):
+    lines = [f"Strategy page {page}: expand into new markets" for page in range(1, 6)]
+    first = make_pdf(tmp_path / "v1" / "strategy.pdf", lines)
+    lines[2] = "Strategy page 3: launch the partner portal"
+    second = make_pdf(tmp_path / "v2" / "strategy.pdf", lines)
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    processor = DocumentProcessor(max_workers=1, pdf_shard_workers=1, cache=cache, organization_id="org-1")
+    processor.process_files([first])
+    revised = processor.process_files([second])[0]
+    reference = DocumentProcessor(max_workers=1, pdf_shard_workers=1).process_files([second])[0]
+
+    assert revised.metadata.details["pages_reused"] == 4
+    assert revised.metadata.details["pages_parsed"] == 5
+    assert revised.content == reference.content
+    assert "partner portal" in revised.content
+    assert processor.get_processing_stats()["reused_pages"] == 4
+
+
+def test_edited_workbook_reparses_only_changed_sheets(tmp_path):
+    sheets = {
+        "Backlog": [["Initiative", "Score"], ["Partner portal", 8], ["Analytics", 5]],
+        "Goals": [["Goal", "Owner"], ["Grow revenue", "CEO"]],
+    }
+    first = make_workbook(tmp_path / "v1" / "plan.xlsx", sheets)
+    sheets["Goals"].append(["Reduce churn", "COO"])
+    second = make_workbook(tmp_path / "v2" / "plan.xlsx", sheets)
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    processor = DocumentProcessor(max_workers=1, cache=cache, organization_id="org-1")
+    processor.process_files([first])
+    revised = processor.process_files([second])[0]
+    reference = DocumentProcessor(max_workers=1).process_files([second])[0]
+
+    assert revised.metadata.details["sheets_reused"] == 1
+    assert revised.content == reference.content
+    assert revised.tables == reference.tables
+    assert revised.tables[1]["row_count"] == 2
+
+
+def test_other_organizations_versions_are_not_reused(tmp_path):
+    lines = [f"Strategy page {page}: expand into new markets" for page in range(1, 4)]
+    first = make_pdf(tmp_path / "v1" / "strategy.pdf", lines)
+    lines[1] = "Strategy page 2: launch the partner portal"
+    second = make_pdf(tmp_path / "v2" / "strategy.pdf", lines)
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    DocumentProcessor(max_workers=1, pdf_shard_workers=1, cache=cache, organization_id="org-1").process_files([first])
+    other = DocumentProcessor(max_workers=1, pdf_shard_workers=1, cache=cache, organization_id="org-2")
+    unscoped = DocumentProcessor(max_workers=1, pdf_shard_workers=1, cache=cache)
+
+    assert other.process_files([second])[0].metadata.details["pages_reused"] == 0
+    assert unscoped.process_files([second])[0].metadata.details["pages_reused"] == 0
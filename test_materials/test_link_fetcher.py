@@ -0,0 +1,195 @@
+# test_materials/test_link_fetcher.py
+
+import ipaddress
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import link_fetcher
+from brain.cognitive_pipeline.utils.link_fetcher import LinkFetcher, LinkResponseCache, build_link_document
+
+STRATEGY_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Strategy 2025</title><style>body { color: red; }</style></head>
+<body>
+<nav><a href="/">Home</a> | <a href="/about">About</a></nav>
+<h1>Strategy 2025</h1>
+<p>Our goal is to grow revenue by 20% in EMEA.</p>
+<h2>Initiatives</h2>
+<ul><li>Launch the partner portal</li><li>Reduce churn in the SMB segment</li></ul>
+<table><tr><th>Initiative</th><th>Priority</th></tr><tr><td>Partner portal</td><td>High</td></tr></table>
+<script>trackPageView();</script>
+</body></html>"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    requests = []
+    hosts = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with Handler.lock:
+            Handler.requests.append((self.path, self.headers.get("If-None-Match")))
+            Handler.hosts.append(self.headers.get("Host"))
+            Handler.active += 1
+            Handler.max_active = max(Handler.max_active, Handler.active)
+        try:
+            if self.path.startswith("/slow/"):
+                time.sleep(0.05)
+                self._send(200, b"<html><body><p>slow page</p></body></html>", "text/html")
+            elif self.path == "/strategy":
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self._send(304, b"", None, etag='"v1"')
+                else:
+                    self._send(200, STRATEGY_PAGE, "text/html; charset=utf-8", etag='"v1"')
+            elif self.path == "/moved":
+                self._send(302, b"", None, location="/strategy")
+            elif self.path == "/elsewhere":
+                self._send(302, b"", None, location=f"http://localhost:{self.server.server_address[1]}/strategy")
+            elif self.path == "/metadata":
+                self._send(302, b"", None, location="http://169.254.169.254/latest/meta-data/")
+            elif self.path == "/notes.txt":
+                self._send(200, "Café roadmap notes".encode("latin-1"), "text/plain; charset=latin-1")
+            else:
+                self._send(404, b"missing", "text/plain")
+        finally:
+            with Handler.lock:
+                Handler.active -= 1
+
+    def _send(self, status, body, content_type, etag=None, location=None):
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    Handler.requests, Handler.hosts, Handler.active, Handler.max_active = [], [], 0, 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_html_page_becomes_parsed_document(server):
+    fetched = LinkFetcher(allow_private_addresses=True).fetch_all([f"{server}/strategy", f"{server}/notes.txt", f"{server}/gone"])
+    strategy, notes, gone = [build_link_document(page) for page in fetched]
+
+    assert strategy.file_path == f"{server}/strategy"
+    assert strategy.content.splitlines()[:3] == [
+        "## Strategy 2025", "Our goal is to grow revenue by 20% in EMEA.", "## Initiatives"
+    ]
+    assert "Launch the partner portal" in strategy.content
+    assert "trackPageView" not in strategy.content and "About" not in strategy.content
+    assert strategy.tables[0]["headers"] == ["Initiative", "Priority"]
+    assert strategy.metadata.details["title"] == "Strategy 2025"
+    assert notes.content == "Café roadmap notes"
+    assert gone.file_type == "failed" and "404" in gone.validation_result.errors[0]
+
+
+def test_conditional_get_serves_304_from_cache(server, tmp_path):
+    cache = LinkResponseCache(str(tmp_path / "links"))
+    first = LinkFetcher(cache=cache, allow_private_addresses=True).fetch_all([f"{server}/strategy"])[0]
+    fetcher = LinkFetcher(cache=cache, allow_private_addresses=True)
+    second = fetcher.fetch_all([f"{server}/strategy"])[0]
+
+    assert first["status"] == 200 and second["status"] == 304
+    assert second["from_cache"] is True and second["body"] == STRATEGY_PAGE
+    assert Handler.requests[-1] == ("/strategy", '"v1"')
+    assert fetcher.stats["not_modified"] == 1
+    assert build_link_document(second).content == build_link_document(first).content
+
+
+def test_per_host_limit_bounds_concurrency(server):
+    urls = [f"{server}/slow/{i}" for i in range(12)]
+    fetcher = LinkFetcher(per_host_limit=3, allow_private_addresses=True)
+    results = fetcher.fetch_all(urls)
+
+    assert [result["url"] for result in results] == urls
+    assert all(result["status"] == 200 for result in results)
+    assert 1 < Handler.max_active <= 3
+
+
+def test_redirects_are_followed(server):
+    result = LinkFetcher(allow_private_addresses=True).fetch_all([f"{server}/moved"])[0]
+
+    assert result["status"] == 200 and result["body"] == STRATEGY_PAGE
+    assert result["url"] == f"{server}/moved" and result["final_url"] == f"{server}/strategy"
+
+
+def test_private_addresses_are_refused(server):
+    urls = [
+        f"{server}/strategy",
+        "http://10.1.2.3/internal",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[fd00::1]/",
+        "http://[::ffff:127.0.0.1]/",
+        "http://localhost/admin",
+    ]
+    results = LinkFetcher(timeout_seconds=2).fetch_all(urls)
+
+    assert all("non-public address" in result["error"] for result in results)
+    assert Handler.requests == []
+
+
+@pytest.fixture
+def loopback_is_public(monkeypatch):
+    # Let the test server pass as a public host; everything else is checked for real
+    is_public_address = link_fetcher.is_public_address
+    monkeypatch.setattr(link_fetcher, "is_public_address", lambda address: address.is_loopback or is_public_address(address))
+
+
+def test_redirect_to_private_address_is_refused(server, loopback_is_public):
+    result = LinkFetcher(timeout_seconds=2).fetch_all([f"{server}/metadata"])[0]
+
+    assert "169.254.169.254" in result["error"] and "non-public address" in result["error"]
+    assert [path for path, _ in Handler.requests] == ["/metadata"]
+
+
+def test_connection_goes_to_the_checked_address(server, loopback_is_public, monkeypatch):
+    # The name only exists in our resolver: the fetch succeeds only if the vetted address is dialled
+    async def resolve(self, host, port):
+        assert host == "roadmap.example"
+        return [ipaddress.ip_address("127.0.0.1")]
+
+    monkeypatch.setattr(LinkFetcher, "_resolve", resolve)
+    port = server.rsplit(":", 1)[1]
+    result = LinkFetcher(timeout_seconds=2).fetch_all([f"http://roadmap.example:{port}/strategy"])[0]
+
+    assert result["status"] == 200 and result["body"] == STRATEGY_PAGE
+    assert Handler.hosts == [f"roadmap.example:{port}"]
+
+
+def test_validators_are_not_sent_to_other_redirect_targets(server, tmp_path):
+    cache = LinkResponseCache(str(tmp_path / "links"))
+    cache.set(f"{server}/elsewhere", {
+        "final_url": f"{server}/elsewhere", "content_type": "text/html", "etag": '"v1"', "last_modified": None, "body": b"old"
+    })
+    result = LinkFetcher(cache=cache, allow_private_addresses=True).fetch_all([f"{server}/elsewhere"])[0]
+
+    assert Handler.requests == [("/elsewhere", '"v1"'), ("/strategy", None)]
+    assert result["status"] == 200 and result["body"] == STRATEGY_PAGE
+
+
+def test_corrupt_cache_entry_is_a_miss(server, tmp_path):
+    cache = LinkResponseCache(str(tmp_path / "links"))
+    cache.store.set(f"{server}/strategy", b"\x28\xb5\x2f\xfdgarbage")
+    assert cache.get(f"{server}/strategy") is None
+
+    result = LinkFetcher(cache=cache, allow_private_addresses=True).fetch_all([f"{server}/strategy"])[0]
+    assert result["status"] == 200 and cache.get(f"{server}/strategy")["etag"] == '"v1"'
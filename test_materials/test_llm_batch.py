@@ -0,0 +1,189 @@
+# test_materials/test_llm_batch.py
+
+import json
+import threading
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import llm_utils
+from brain.cognitive_pipeline.utils.llm_batch import (
+    BatchJournal, BatchLLMFn, LLMBatchError, LLMBatchPending, LLMBatchRunner
+)
+from brain.cognitive_pipeline.utils.llm_cache import LLMResponseCache
+
+
+class BatchServerHandler(BaseHTTPRequestHandler):
+    """Stand-in for the OpenAI Batch and Anthropic Message Batches APIs; a batch ends after POLLS_TO_FINISH polls."""
+
+    protocol_version = "HTTP/1.1"
+    POLLS_TO_FINISH = 2
+    files = {}
+    batches = {}
+
+    def _send(self, payload, status=200):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers["Content-Length"]))
+
+    @staticmethod
+    def _answer(prompt):
+        return None if prompt == "fail" else f"answer to {prompt}"
+
+    def do_POST(self):
+        if self.path == "/v1/files":
+            # Multipart upload of the JSONL input file
+            message = BytesParser(policy=default_policy).parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + self._body()
+            )
+            content = next(part for part in message.iter_parts() if part.get_filename()).get_payload(decode=True)
+            file_id = f"file-{uuid.uuid4().hex}"
+            self.files[file_id] = content.decode()
+            return self._send({"id": file_id})
+        request = json.loads(self._body())
+        batch_id = f"batch-{uuid.uuid4().hex}"
+        if self.path == "/v1/batches":
+            lines = [json.loads(line) for line in self.files[request["input_file_id"]].splitlines()]
+            prompts = {line["custom_id"]: line["body"]["messages"][-1]["content"] for line in lines}
+            self.batches[batch_id] = {"provider": "openai", "prompts": prompts, "polls": 0}
+            return self._send({"id": batch_id, "status": "validating"})
+        if self.path == "/v1/messages/batches":
+            prompts = {item["custom_id"]: item["params"]["messages"][-1]["content"] for item in request["requests"]}
+            self.batches[batch_id] = {"provider": "anthropic", "prompts": prompts, "polls": 0}
+            return self._send({"id": batch_id, "processing_status": "in_progress"})
+        self._send({"error": "not found"}, 404)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[:2] == ["v1", "files"] and parts[-1] == "content":
+            return self._send(self.files[parts[2]])
+        if parts[:2] == ["v1", "batches"]:
+            batch = self.batches[parts[2]]
+            batch["polls"] += 1
+            if batch["polls"] < self.POLLS_TO_FINISH:
+                return self._send({"id": parts[2], "status": "in_progress"})
+            output_id = f"file-{uuid.uuid4().hex}"
+            self.files[output_id] = "".join(json.dumps(
+                {"custom_id": custom_id, "response": {"status_code": 200, "body": {"choices": [{"message": {"content": self._answer(prompt)}}]}}, "error": None}
+                if self._answer(prompt) else
+                {"custom_id": custom_id, "response": {"status_code": 400, "body": {"error": "bad prompt"}}, "error": None}
+            ) + "\n" for custom_id, prompt in batch["prompts"].items())
+            return self._send({"id": parts[2], "status": "completed", "output_file_id": output_id})
+        if parts[:3] == ["v1", "messages", "batches"]:
+            batch = self.batches[parts[3]]
+            if parts[-1] == "results":
+                return self._send("".join(json.dumps({"custom_id": custom_id, "result": (
+                    {"type": "succeeded", "message": {"content": [{"type": "text", "text": self._answer(prompt)}]}}
+                    if self._answer(prompt) else {"type": "errored", "error": {"type": "invalid_request_error"}}
+                )}) + "\n" for custom_id, prompt in batch["prompts"].items()))
+            batch["polls"] += 1
+            ended = batch["polls"] >= self.POLLS_TO_FINISH
+            return self._send({
+                "id": parts[3],
+                "processing_status": "ended" if ended else "in_progress",
+                "results_url": f"http://{self.headers['Host']}/v1/messages/batches/{parts[3]}/results" if ended else None
+            })
+        self._send({"error": "not found"}, 404)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    BatchServerHandler.files = {}
+    BatchServerHandler.batches = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), BatchServerHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    monkeypatch.setattr(llm_utils, "OPENAI_BASE_URL", base_url)
+    monkeypatch.setattr(llm_utils, "ANTHROPIC_BASE_URL", base_url)
+    yield BatchServerHandler.batches
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def runner(tmp_path):
+    return LLMBatchRunner(
+        journal=BatchJournal(str(tmp_path / "batches")),
+        cache=LLMResponseCache(str(tmp_path / "responses")),
+        poll_interval=0.01
+    )
+
+
+def test_prompts_go_out_as_one_batch_in_input_order(server, runner):
+    llm_fn = BatchLLMFn("openai", api_key="test", runner=runner)
+    outputs = llm_fn.batch(["goals", "kpis", "goals", "fail"])
+
+    assert outputs[:3] == ["answer to goals", "answer to kpis", "answer to goals"]
+    assert isinstance(outputs[3], LLMBatchError)
+    # Identical prompts are submitted once
+    assert len(server) == 1 and len(next(iter(server.values()))["prompts"]) == 3
+    assert runner.stats["polls"] == BatchServerHandler.POLLS_TO_FINISH
+
+    # Answered prompts now come from the response cache; only the failed one is resubmitted
+    assert llm_fn.batch(["kpis", "goals", "fail"])[:2] == ["answer to kpis", "answer to goals"]
+    assert len(server) == 2 and runner.stats["cache_hits"] == 2
+
+
+def test_unfinished_batch_is_resumed_not_resubmitted(server, runner, tmp_path):
+    runner.max_wait_seconds = 0
+    llm_fn = BatchLLMFn("openai", api_key="test", runner=runner)
+    outputs = llm_fn.batch(["roadmap", "risks"])
+    assert all(isinstance(output, LLMBatchPending) for output in outputs)
+
+    # A later run (e.g. after a restart) collects the same batch
+    resumed = LLMBatchRunner(
+        journal=BatchJournal(str(tmp_path / "batches")),
+        cache=LLMResponseCache(str(tmp_path / "responses")),
+        poll_interval=0.01
+    )
+    assert BatchLLMFn("openai", api_key="test", runner=resumed).batch(["risks", "roadmap"]) == [
+        "answer to risks", "answer to roadmap"
+    ]
+    assert len(server) == 1
+    assert (resumed.stats["batches_resumed"], resumed.stats["batches_submitted"]) == (1, 0)
+    # Collected batches leave the journal
+    assert resumed.journal.store.total_bytes() == 0
+
+
+def test_anthropic_message_batches(server, runner):
+    llm_fn = BatchLLMFn("anthropic", api_key="test", runner=runner)
+
+    assert llm_fn("relationships") == "answer to relationships"
+    with pytest.raises(LLMBatchError):
+        llm_fn("fail")
+    assert [batch["provider"] for batch in server.values()] == ["anthropic", "anthropic"]
+
+
+class SyncLLMFn:
+    def __init__(self):
+        self.prompts = []
+
+    def batch(self, prompts):
+        self.prompts.extend(prompts)
+        return [f"sync answer to {prompt}" for prompt in prompts]
+
+
+def test_unfinished_prompts_fall_back_to_sync_calls(server, runner):
+    fallback = SyncLLMFn()
+    llm_fn = BatchLLMFn("openai", api_key="test", runner=runner, fallback=fallback)
+    assert llm_fn.batch(["goals"]) == ["answer to goals"]
+    assert fallback.prompts == []
+
+    runner.max_wait_seconds = 0
+    assert llm_fn.batch(["goals", "roadmap", "risks"]) == [
+        "answer to goals", "sync answer to roadmap", "sync answer to risks"
+    ]
+    assert fallback.prompts == ["roadmap", "risks"]
+    assert runner.stats["batches_pending"] == 1
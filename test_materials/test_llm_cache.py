@@ -0,0 +1,110 @@
+# test_materials/test_llm_cache.py
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import llm_cache, llm_utils
+from brain.cognitive_pipeline.utils.llm_cache import LLMResponseCache, configure_llm_cache, llm_cache_stats
+from brain.cognitive_pipeline.utils.llm_gateway import GatewayLLMFn, LLMGateway, ProviderLimits
+
+
+class CountingChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    calls = 0
+
+    def do_POST(self):
+        CountingChatHandler.calls += 1
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({
+            "choices": [{"message": {"content": f"echo: {request['messages'][-1]['content']}"}}],
+            "usage": {"total_tokens": 10}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    CountingChatHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), CountingChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm_utils, "OPENAI_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+    yield
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_cache_configured", False)
+    cache = LLMResponseCache(str(tmp_path))
+    configure_llm_cache(cache)
+    return cache
+
+
+def test_repeated_prompt_is_served_from_cache(server, cache):
+    first = llm_utils.llm_fn_openai("summarise the roadmap", api_key="test")
+    again = llm_utils.llm_fn_openai("summarise the roadmap", api_key="other-key")
+    llm_utils.llm_fn_openai("summarise the roadmap", api_key="test", max_tokens=1000)
+
+    assert first == again == "echo: summarise the roadmap"
+    # A different max_tokens is a different request; the API key is not part of the key
+    assert CountingChatHandler.calls == 2
+    stats = llm_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"]) == (1, 2, 2)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
+
+
+def test_cache_persists_across_instances(server, cache, tmp_path):
+    llm_utils.llm_fn_openai("persisted", api_key="test")
+    configure_llm_cache(LLMResponseCache(str(tmp_path)))
+
+    assert llm_utils.llm_fn_openai("persisted", api_key="test") == "echo: persisted"
+    assert CountingChatHandler.calls == 1
+
+
+def test_expired_entries_are_refetched(server, cache, monkeypatch):
+    llm_utils.llm_fn_openai("stale", api_key="test")
+    now = llm_cache.time.time()
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now + cache.ttl_seconds + 1)
+
+    llm_utils.llm_fn_openai("stale", api_key="test")
+    assert CountingChatHandler.calls == 2
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), max_bytes=500)
+    keys = [cache.key_for("openai", {"model": "gpt-4", "max_tokens": 10, "prompt": str(i)}) for i in range(3)]
+    cache.set(keys[0], "a" * 150)
+    cache.set(keys[1], "b" * 150)
+    assert cache.get(keys[0]) is not None  # Now more recent than keys[1]
+    cache.set(keys[2], "c" * 150)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "a" * 150 and cache.get(keys[2]) == "c" * 150
+    assert cache.store.total_bytes() <= 500
+
+
+def test_gateway_answers_cached_prompts_without_calling(server, tmp_path):
+    gateway = LLMGateway({"openai": ProviderLimits(max_concurrency=4)}, cache=LLMResponseCache(str(tmp_path)))
+    llm_fn = GatewayLLMFn("openai", api_key="test", gateway=gateway)
+    try:
+        assert llm_fn.batch(["x", "y"]) == ["echo: x", "echo: y"]
+        assert llm_fn.batch(["y", "z", "x"]) == ["echo: y", "echo: z", "echo: x"]
+    finally:
+        gateway.close()
+
+    assert CountingChatHandler.calls == 3
+    assert gateway.stats()["openai"]["cache_hits"] == 2
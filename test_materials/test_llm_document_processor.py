@@ -0,0 +1,124 @@
+# brain/cognitive_pipeline/utils/test_llm_document_processor.py
+
+import threading
+import time
+
+from brain.cognitive_pipeline.utils.llm_document_processor import LLMDocumentProcessor
+from brain.cognitive_pipeline.utils.parse_cache import ParseCache
+
+STRATEGY_TEXT = "Product roadmap: strategy, goals and priorities for the next timeline milestone. " * 3
+
+
+class SlowAnalysisProcessor(LLMDocumentProcessor):
+    """Stands in for the provider with a fixed-latency analysis call."""
+
+    def __init__(self, latency, **kwargs):
+        super().__init__(anthropic_api_key="test-key", max_workers=1, **kwargs)
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _get_llm_content_analysis(self, content, file_type):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        return {"content_summary": f"summary of {file_type}"}
+
+
+def make_strategy_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"strategy_{i}.txt"
+        path.write_text(f"Document {i}\n{STRATEGY_TEXT}", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_enhancements_run_concurrently_up_to_the_cap(tmp_path):
+    paths = make_strategy_files(tmp_path, 6)
+    processor = SlowAnalysisProcessor(latency=0.2, llm_concurrency=3)
+
+    start = time.perf_counter()
+    documents = processor.process_files(paths)
+    elapsed = time.perf_counter() - start
+
+    assert [doc.file_path for doc in documents] == paths
+    assert all(doc.validation_result.processing_method == "hybrid_llm_enhanced" for doc in documents)
+    assert processor.max_in_flight == 3
+    stats = processor.get_processing_stats()
+    assert stats["llm_enhancements"] == 6
+    assert stats["stage_latency_ms"]["enhancement"]["count"] == 6
+    assert stats["stage_latency_ms"]["enhancement"]["min_ms"] >= 200
+    assert elapsed < 6 * 0.2
+
+
+def test_failed_analysis_keeps_traditional_result(tmp_path):
+    paths = make_strategy_files(tmp_path, 2)
+    processor = SlowAnalysisProcessor(latency=0)
+    processor._get_llm_content_analysis = lambda content, file_type: None
+
+    documents = processor.process_files(paths)
+    assert all(doc.validation_result.processing_method == "traditional" for doc in documents)
+    assert processor.get_processing_stats()["llm_enhancements"] == 0
+
+
+def test_failed_parse_goes_through_fallback_stage(tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"%PDF-1.4 truncated")
+    processor = SlowAnalysisProcessor(latency=0)
+    processor._get_llm_fallback_analysis = lambda content, ext: {"extracted_content": "recovered", "confidence_level": 0.6}
+
+    document = processor.process_files([str(broken)])[0]
+    stats = processor.get_processing_stats()
+    assert document.validation_result.processing_method == "llm_fallback"
+    assert stats["traditional_failures"] == 1
+    assert stats["llm_fallbacks"] == 1
+    assert len(stats["errors"]) == 1
+    assert stats["stage_latency_ms"]["fallback"]["count"] == 1
+    assert stats["stage_latency_ms"]["parse"]["count"] == 1
+
+
+def test_each_file_is_hashed_once_per_run(tmp_path, monkeypatch):
+    paths = make_strategy_files(tmp_path, 3)
+    hashed = []
+    content_digest = ParseCache.content_digest
+    monkeypatch.setattr(ParseCache, "content_digest", staticmethod(lambda path: hashed.append(path) or content_digest(path)))
+    processor = SlowAnalysisProcessor(latency=0, cache=ParseCache(str(tmp_path / "cache")))
+
+    processor.process_files(paths)
+    assert hashed == paths
+    stats = processor.get_processing_stats()
+    assert (stats["enhanced_cache_misses"], stats["cache_misses"]) == (3, 3)
+
+    hashed.clear()
+    processor.process_files(paths)
+    assert hashed == paths
+    assert processor.get_processing_stats()["enhanced_cache_hits"] == 3
+
+
+def test_cache_hits_count_in_file_stats(tmp_path):
+    paths = make_strategy_files(tmp_path, 2)
+    cache = ParseCache(str(tmp_path / "cache"))
+    SlowAnalysisProcessor(latency=0, cache=cache).process_files(paths)
+
+    processor = SlowAnalysisProcessor(latency=0, cache=cache)
+    processor.process_files(paths)
+    stats = processor.get_processing_stats()
+    assert stats["enhanced_cache_hits"] == 2
+    assert stats["files_processed"] == 2
+    assert set(stats["file_timings_ms"]) == set(paths)
+
+
+def test_unreadable_bundle_member_falls_through_to_parsing(tmp_path):
+    bundle = tmp_path / "bundle.zip"
+    bundle.write_bytes(b"PK\x03\x04 not really a zip")
+    member = f"{bundle}!/notes.txt"
+    processor = SlowAnalysisProcessor(latency=0, cache=ParseCache(str(tmp_path / "cache")))
+
+    documents = processor.process_files([member])
+    assert [doc.file_path for doc in documents] == [member]
+    assert processor.get_processing_stats()["files_processed"] == 1
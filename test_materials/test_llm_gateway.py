@@ -0,0 +1,118 @@
+# test_materials/test_llm_gateway.py
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import llm_utils
+from brain.cognitive_pipeline.utils.llm_gateway import (
+    GatewayLLMFn, LLMGateway, LLMRequest, ProviderLimits, TokenBucket
+)
+
+CALL_SECONDS = 0.2
+
+
+class SlowChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request["messages"][-1]["content"]
+        time.sleep(CALL_SECONDS)
+        if prompt == "fail":
+            status, body = 500, b'{"error": "boom"}'
+        else:
+            status, body = 200, json.dumps({
+                "choices": [{"message": {"content": f"echo: {prompt}"}}],
+                "usage": {"total_tokens": 10}
+            }).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ChatServer(ThreadingHTTPServer):
+    request_queue_size = 256  # Accept a whole batch of connections at once
+
+
+@pytest.fixture
+def server(monkeypatch):
+    httpd = ChatServer(("127.0.0.1", 0), SlowChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm_utils, "OPENAI_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+    yield
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_batch_runs_concurrently_in_input_order(server):
+    gateway = LLMGateway({"openai": ProviderLimits(max_concurrency=20)})
+    llm_fn = GatewayLLMFn("openai", api_key="test", gateway=gateway)
+    prompts = [f"document {i}" for i in range(40)]
+    try:
+        start = time.perf_counter()
+        outputs = llm_fn.batch(prompts)
+        elapsed = time.perf_counter() - start
+    finally:
+        gateway.close()
+
+    assert outputs == [f"echo: {prompt}" for prompt in prompts]
+    # 40 sequential calls would take 8s; two waves of 20 take about 0.4s
+    assert elapsed < 40 * CALL_SECONDS / 4
+    stats = gateway.stats()["openai"]
+    assert stats["requests"] == 40 and stats["max_in_flight"] == 20
+    assert stats["tokens_used"] == 400
+
+
+def test_failures_are_returned_in_place(server):
+    gateway = LLMGateway({"openai": ProviderLimits(max_concurrency=4)})
+    llm_fn = GatewayLLMFn("openai", api_key="test", gateway=gateway)
+    try:
+        outputs = llm_fn.batch(["a", "fail", "b"])
+        with pytest.raises(Exception):
+            llm_fn("fail")
+    finally:
+        gateway.close()
+
+    assert outputs[0] == "echo: a" and outputs[2] == "echo: b"
+    assert isinstance(outputs[1], Exception)
+    assert gateway.stats()["openai"]["errors"] == 2
+
+
+def test_requests_per_minute_budget_spaces_calls(server):
+    # A 120 RPM budget allows a burst of 120, then one request every 0.5s
+    gateway = LLMGateway({"openai": ProviderLimits(max_concurrency=100, requests_per_minute=120)})
+    try:
+        start = time.perf_counter()
+        outputs = gateway.complete_all([LLMRequest("openai", f"p {i}", api_key="test") for i in range(123)])
+        elapsed = time.perf_counter() - start
+    finally:
+        gateway.close()
+
+    assert outputs == [f"echo: p {i}" for i in range(123)]
+    assert elapsed >= 1.2
+    assert gateway.stats()["openai"]["rate_limit_wait_ms"] > 0
+
+
+def test_token_bucket_refill_and_refund():
+    now = [0.0]
+    bucket = TokenBucket(per_minute=600, clock=lambda: now[0])
+
+    assert asyncio.run(bucket.acquire(600)) == 0.0
+    assert bucket.delay_for(100) == pytest.approx(10.0)
+    now[0] = 5.0
+    assert bucket.delay_for(100) == pytest.approx(5.0)
+    bucket.refund(50)
+    assert bucket.delay_for(100) == pytest.approx(0.0)
+    # Larger than the bucket can ever hold: waits for a full bucket instead of forever
+    assert bucket.delay_for(10_000) == pytest.approx(bucket.delay_for(600))
@@ -0,0 +1,86 @@
+# test_materials/test_llm_http.py
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import llm_cache, llm_http, llm_utils
+from brain.cognitive_pipeline.utils.llm_http import LLMHttpClient, get_llm_client, llm_http_stats
+
+
+class ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    connections = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with ChatHandler.lock:
+            ChatHandler.connections.add(self.client_address)
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({
+            "choices": [{"message": {"content": f"echo: {request['messages'][-1]['content']}"}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ChatHandler.connections = set()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fresh_clients(monkeypatch):
+    monkeypatch.setattr(llm_http, "_clients", {})
+    monkeypatch.setattr(llm_http, "_clients_pid", None)
+    # Every prompt must reach the server
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_cache_configured", True)
+
+
+def test_sequential_prompts_reuse_one_connection(server, fresh_clients, monkeypatch):
+    monkeypatch.setattr(llm_utils, "OPENAI_BASE_URL", server)
+    replies = [llm_utils.llm_fn_openai(f"prompt {i}", api_key="test") for i in range(5)]
+
+    assert replies == [f"echo: prompt {i}" for i in range(5)]
+    assert len(ChatHandler.connections) == 1
+    stats = llm_http_stats()["openai"]
+    assert (stats["requests"], stats["connections_opened"], stats["connections_reused"]) == (5, 1, 4)
+    assert stats["latency"]["count"] == 5
+
+
+def test_concurrent_callers_are_bounded_by_pool(server):
+    client = LLMHttpClient("test", pool_size=3)
+    payload = {"messages": [{"role": "user", "content": "hi"}]}
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        statuses = list(executor.map(lambda _: client.post(f"{server}/chat", json=payload).status_code, range(30)))
+
+    assert statuses == [200] * 30
+    assert client.stats()["connections_opened"] <= 3
+    assert client.stats()["connections_reused"] >= 27
+
+
+def test_one_client_per_provider_per_process(fresh_clients, monkeypatch):
+    first = get_llm_client("anthropic")
+    assert get_llm_client("anthropic") is first
+    assert get_llm_client("openai") is not first
+    assert first.timeout == (LLMHttpClient.CONNECT_TIMEOUT_SECONDS, LLMHttpClient.READ_TIMEOUT_SECONDS)
+
+    # A forked child must not reuse the parent's sockets
+    monkeypatch.setattr(llm_http.os, "getpid", lambda: -1)
+    assert get_llm_client("anthropic") is not first
@@ -0,0 +1,64 @@
+# brain/cognitive_pipeline/utils/test_parse_cache.py
+
+from brain.cognitive_pipeline.utils.disk_cache import DiskCache
+from brain.cognitive_pipeline.utils.document_processor import DocumentProcessor
+from brain.cognitive_pipeline.utils.parse_cache import ParseCache
+
+
+def test_identical_upload_is_served_from_cache(tmp_path):
+    text = "Quarterly strategy: grow revenue, launch the partner portal, reduce churn. " * 3
+    first = tmp_path / "deck_v1.txt"
+    second = tmp_path / "deck_v1_copy.txt"
+    first.write_text(text, encoding="utf-8")
+    second.write_text(text, encoding="utf-8")
+    cache = ParseCache(str(tmp_path / "cache"))
+
+    processor = DocumentProcessor(max_workers=1, cache=cache)
+    processor.process_files([str(first)])
+    cached = processor.process_files([str(second)])[0]
+
+    stats = processor.get_processing_stats()
+    assert stats["cache_misses"] == 1
+    assert stats["cache_hits"] == 1
+    assert cached.file_path == str(second)
+    assert cached.metadata.file_path == str(second)
+    assert cached.content == text
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    store = DiskCache(str(tmp_path / "lru.sqlite3"), max_bytes=25)
+    store.set("a", b"x" * 10)
+    store.set("b", b"x" * 10)
+    store.get("a")
+    store.set("c", b"x" * 10)
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.total_bytes() == 20
+
+
+def test_cached_documents_are_stored_compressed(tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_text("Roadmap theme: expand the analytics platform for enterprise customers.\n" * 200, encoding="utf-8")
+    processor = DocumentProcessor(max_workers=1, cache=ParseCache(str(tmp_path / "cache")))
+    processor.process_files([str(path)])
+
+    compression = processor.get_processing_stats()["cache_compression"]
+    assert compression["stored_bytes"] < compression["raw_bytes"] / 4
+    assert compression["bytes_saved"] == compression["raw_bytes"] - compression["stored_bytes"]
+    assert processor.process_files([str(path)])[0].content == path.read_text(encoding="utf-8")
+
+
+def test_corrupt_entry_is_a_cache_miss(tmp_path):
+    path = tmp_path / "plan.txt"
+    path.write_text("Roadmap theme: expand the analytics platform for enterprise customers.\n" * 20, encoding="utf-8")
+    cache = ParseCache(str(tmp_path / "cache"))
+    processor = DocumentProcessor(max_workers=1, cache=cache)
+    key = cache.key_for(str(path), processor._cache_namespace())
+    cache.store.set(key, b"\x28\xb5\x2f\xfd truncated frame")
+    cache.store.set(cache.parts_key_for("org-1", "plan.pdf", "traditional"), b"\x28\xb5\x2f\xfd truncated frame")
+
+    assert cache.get(key, str(path)) is None
+    assert cache.get_parts(cache.parts_key_for("org-1", "plan.pdf", "traditional")) == {}
+    document = processor.process_files([str(path)])[0]
+    assert document.file_type == "txt"
+    assert processor.get_processing_stats()["cache_misses"] == 1
@@ -1,5 +1,6 @@
 # brain/cognitive_pipeline/nodes/test_perception_node.py
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 from brain.cognitive_pipeline.logic.perception_logic import parse_documents_logic
 from brain.cognitive_pipeline.schema import GraphState
@@ -27,7 +28,7 @@ def test_llm_vs_non_llm():
         run,
         state,
         select_processor=lambda: (MagicMock(), "hybrid_llm"),
-        process_files=lambda p, f, r, m: ([], {}),
+        process_files=lambda p, f, r, m, on_document: ([], {}),
         process_links=lambda r, links: [],
         validate_processing_results=lambda r, d: {"overall_valid": True, "document_count": 0, "valid_documents": 0, "file_types": [], "quality_score": None, "hybrid_processing": True},
         log_info_event=lambda *a, **k: None,
@@ -44,7 +45,7 @@ def test_file_only():
         run,
         state,
         select_processor=lambda: (MagicMock(), "traditional_only"),
-        process_files=lambda p, f, r, m: ([], {}),
+        process_files=lambda p, f, r, m, on_document: ([], {}),
         process_links=lambda r, links: [],
         validate_processing_results=lambda r, d: {"overall_valid": True, "document_count": 0, "valid_documents": 0, "file_types": [], "quality_score": None, "hybrid_processing": False},
         log_info_event=lambda *a, **k: None,
@@ -60,7 +61,7 @@ def test_links_only():
         run,
         state,
         select_processor=lambda: (MagicMock(), "traditional_only"),
-        process_files=lambda p, f, r, m: ([], {}),
+        process_files=lambda p, f, r, m, on_document: ([], {}),
         process_links=lambda r, links: [],
         validate_processing_results=lambda r, d: {"overall_valid": True, "document_count": 0, "valid_documents": 0, "file_types": [], "quality_score": None, "hybrid_processing": False},
         log_info_event=lambda *a, **k: None,
@@ -68,3 +69,49 @@ def test_links_only():
     )
     assert result.llm_used is False
     assert result.document_validation_summary is not None
+
+def test_on_document_receives_each_parsed_document():
+    run = DummyRun()
+    state = make_state(files=["file1.txt"], links=["http://example.com"])
+    file_doc = SimpleNamespace(file_path="file1.txt", content="")
+    link_doc = SimpleNamespace(file_path="http://example.com", content="")
+    seen = []
+
+    def process_files(p, f, r, m, on_document):
+        on_document(file_doc)
+        return ([file_doc], {})
+
+    parse_documents_logic(
+        run,
+        state,
+        select_processor=lambda: (MagicMock(), "traditional_only"),
+        process_files=process_files,
+        process_links=lambda r, links: [link_doc],
+        validate_processing_results=lambda r, d: {"overall_valid": True, "document_count": 2, "valid_documents": 2, "file_types": [], "quality_score": None, "hybrid_processing": False},
+        log_info_event=lambda *a, **k: None,
+        log_validation_event=lambda *a, **k: None,
+        on_document=seen.append
+    )
+    assert seen == [file_doc, link_doc]
+
+
+def test_documents_stream_without_a_consumer():
+    run = DummyRun()
+    state = make_state(files=["file1.txt"], links=["http://example.com"])
+    file_doc = SimpleNamespace(file_path="file1.txt", content="")
+
+    def process_files(p, f, r, m, on_document):
+        on_document(file_doc)
+        return ([file_doc], {})
+
+    result = parse_documents_logic(
+        run,
+        state,
+        select_processor=lambda: (MagicMock(), "traditional_only"),
+        process_files=process_files,
+        process_links=lambda r, links: [],
+        validate_processing_results=lambda r, d: {"overall_valid": True, "document_count": 1, "valid_documents": 1, "file_types": [], "quality_score": None, "hybrid_processing": False},
+        log_info_event=lambda *a, **k: None,
+        log_validation_event=lambda *a, **k: None
+    )
+    assert result.document_validation_summary.document_count == 1
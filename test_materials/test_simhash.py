@@ -0,0 +1,45 @@
+# test_materials/test_simhash.py
+
+import tracemalloc
+
+from brain.cognitive_pipeline.utils.simhash import (
+    NEAR_DUPLICATE_MAX_DISTANCE, from_signed64, hamming_distance, simhash, simhash_bands, to_signed64
+)
+
+BASE_TEXT = " ".join(
+    f"Initiative {i} improves supplier onboarding and reduces churn for segment {i % 7}." for i in range(200)
+)
+
+
+def test_small_edits_stay_within_near_duplicate_distance():
+    edited = BASE_TEXT.replace("Initiative 150 improves", "Initiative 150 greatly improves")
+    unrelated = " ".join(f"Quarterly revenue table row {i} for region {i % 5}" for i in range(200))
+
+    assert simhash(BASE_TEXT) == simhash(BASE_TEXT.upper())
+    assert hamming_distance(simhash(BASE_TEXT), simhash(edited)) <= NEAR_DUPLICATE_MAX_DISTANCE
+    assert hamming_distance(simhash(BASE_TEXT), simhash(unrelated)) > NEAR_DUPLICATE_MAX_DISTANCE
+    assert simhash("") == 0
+
+
+def test_bands_and_signed_storage_round_trip():
+    fingerprint = simhash(BASE_TEXT) | (1 << 63)
+    bands = simhash_bands(fingerprint)
+
+    assert len(bands) == 4 and all(0 <= band < 1 << 16 for band in bands)
+    assert sum(band << (16 * (3 - i)) for i, band in enumerate(bands)) == fingerprint
+    assert to_signed64(fingerprint) < 0
+    assert from_signed64(to_signed64(fingerprint)) == fingerprint
+
+
+def test_large_text_is_fingerprinted_in_bounded_memory():
+    text = " ".join(f"Roadmap item {i} for segment {i % 13} ships in quarter {i % 4}." for i in range(30000))
+    tracemalloc.start()
+    try:
+        fingerprint = simhash(text)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert fingerprint != 0
+    # One lowercased copy of the text plus a token batch, not a string per shingle and bit
+    assert peak < len(text) + 4 * 1024 * 1024
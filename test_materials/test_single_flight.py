@@ -0,0 +1,118 @@
+# test_materials/test_single_flight.py
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from brain.cognitive_pipeline.utils import llm_cache, llm_utils
+from brain.cognitive_pipeline.utils.llm_gateway import GatewayLLMFn, LLMGateway, ProviderLimits
+from brain.cognitive_pipeline.utils.single_flight import SingleFlight
+
+
+class SlowChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    calls = 0
+
+    def do_POST(self):
+        SlowChatHandler.calls += 1
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(0.3)
+        body = json.dumps({
+            "choices": [{"message": {"content": f"analysis of {request['messages'][-1]['content']}"}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    SlowChatHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), SlowChatHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm_utils, "OPENAI_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+    # Without a response cache, only coalescing can save calls
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_cache_configured", True)
+    monkeypatch.setattr(llm_utils, "_in_flight", SingleFlight())
+    yield
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+    barrier = threading.Barrier(6)
+
+    def work(key):
+        barrier.wait()
+        return flight.do(key, lambda: executions.append(key) or time.sleep(0.2) or f"result {key}")
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(work, ["a"] * 5 + ["b"]))
+
+    assert results == ["result a"] * 5 + ["result b"]
+    assert sorted(executions) == ["a", "b"]
+    assert flight.stats() == {"calls": 2, "coalesced": 4, "in_flight": 0}
+    # Finished calls are not remembered
+    assert flight.do("a", lambda: "fresh") == "fresh"
+
+
+def test_failure_reaches_every_waiter():
+    flight = SingleFlight()
+    barrier = threading.Barrier(4)
+
+    def fail():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    def work(_):
+        barrier.wait()
+        try:
+            flight.do("k", fail)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert list(executor.map(work, range(4))) == ["upstream down"] * 4
+    assert flight.stats()["calls"] == 1
+
+
+def test_concurrent_runs_send_one_upstream_request(server):
+    barrier = threading.Barrier(8)
+
+    def analyse(_):
+        barrier.wait()
+        return llm_utils.llm_fn_openai("same deck", api_key="test")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(analyse, range(8)))
+
+    assert results == ["analysis of same deck"] * 8
+    assert SlowChatHandler.calls == 1
+    assert llm_utils.llm_coalescing_stats()["coalesced"] == 7
+
+
+def test_gateway_coalesces_identical_prompts_in_flight(server):
+    gateway = LLMGateway({"openai": ProviderLimits(max_concurrency=8)})
+    llm_fn = GatewayLLMFn("openai", api_key="test", gateway=gateway)
+    try:
+        outputs = llm_fn.batch(["deck"] * 5 + ["notes"])
+    finally:
+        gateway.close()
+
+    assert outputs == ["analysis of deck"] * 5 + ["analysis of notes"]
+    assert SlowChatHandler.calls == 2
+    stats = gateway.stats()["openai"]
+    assert stats["coalesced"] == 4 and stats["requests"] == 2